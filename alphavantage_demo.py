@@ -113,10 +113,11 @@ def smart_signal_generation():
         
         results = []
         
-        for symbol in test_stocks:
+        # Tek bot, toplu ön yükleme; sonuçlar tamamlandıkça gelir
+        framework = UniversalTradingBot(provider, AssetType.STOCKS)
+        for analysis in framework.analyze_many(test_stocks):
+            symbol = analysis['symbol']
             try:
-                framework = UniversalTradingBot(provider, AssetType.STOCKS)
-                analysis = framework.analyze_symbol(symbol)
                 
                 # ERROR CHECK - Veri eksikliği kontrolü
                 if 'error' in analysis:
@@ -168,8 +169,6 @@ def smart_signal_generation():
                       f"Sentiment: {sentiment_emoji}{sentiment_score:>+.3f} | "
                       f"Haberler: {news_count:>2} | {strength_stars}")
                 
-                time.sleep(1)  # Reduced rate limiting
-                
             except Exception as e:
                 print(f"❌ {symbol:5} | Analiz hatası: {str(e)[:30]}...")
                 
@@ -225,11 +224,12 @@ def multi_asset_analysis():
             print("-" * 50)
             
             framework = UniversalTradingBot(provider, group['type'])
+            start_time = time.time()
             
-            for symbol in group['symbols']:
+            # Grup tek seferde ön yüklenir; süre grup başından itibaren (sonuç gelene kadar)
+            for analysis in framework.analyze_many(group['symbols']):
+                symbol = analysis['symbol']
                 try:
-                    start_time = time.time()
-                    analysis = framework.analyze_symbol(symbol)
                     analysis_time = time.time() - start_time
                     
                     # ERROR CHECK - Veri eksikliği kontrolü
@@ -278,8 +278,6 @@ def multi_asset_analysis():
                           f"Korel: {corr_emoji}{correlation_signal.upper():>4}"
                           f"{sentiment_info} | {analysis_time*1000:.0f}ms")
                     
-                    time.sleep(0.5)  # Reduced rate limiting
-                    
                 except Exception as e:
                     print(f"❌ {symbol:7} | Analiz hatası: {str(e)[:35]}...")
             
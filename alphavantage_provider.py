@@ -21,14 +21,17 @@ from alpha_vantage.timeseries import TimeSeries
 from alpha_vantage.cryptocurrencies import CryptoCurrencies
 from alpha_vantage.techindicators import TechIndicators
 from universal_trading_framework import DataProvider, AssetType, Signal
+from bar_pyramid import BarPyramid
+from rate_budget import RateBudget
+from market_calendar import get_market_calendar
+from profiling import count
 import logging
 import json
 import os
 from typing import Dict, List, Optional, Tuple
-from sqlalchemy import func
 
 # Import for dynamic correlations  
-from constants import CORRELATION_CONFIG, API_CONFIG
+from constants import CORRELATION_CONFIG, API_CONFIG, SIGNAL_CONFIG, PYRAMID_CONFIG, MARKET_CALENDAR_CONFIG
 
 # Lazy import için app context
 from functools import wraps
@@ -52,7 +55,8 @@ class AlphaVantageProvider(DataProvider):
     - Multi-timeframe analysis
     """
     
-    def __init__(self, api_key: str = None, use_cache: bool = True, is_premium: bool = False):
+    def __init__(self, api_key: str = None, use_cache: bool = True, is_premium: bool = False,
+                 rate_budget: RateBudget = None):
         self.logger = logging.getLogger(__name__)
         
         # API Key
@@ -72,6 +76,10 @@ class AlphaVantageProvider(DataProvider):
         # Cache sistemi - Plan tipine göre ayarla
         self.use_cache = use_cache
         self.cache = {}
+        # (veri tipi, sembol) -> son yazılan cache girdisi - zaman kovasından bağımsız (kapalı piyasa kontrolü)
+        self._latest_entries: Dict[tuple, Dict] = {}
+        # Sembol başına taban bar serisi + türetilmiş periyotlar (cache'teki 'bars' girdisi tazeliğini işaretler)
+        self.pyramids: Dict[str, BarPyramid] = {}
         self.max_cache_size = 1000  # Maximum cache entries to prevent memory leaks
         
         if self.is_premium:
@@ -83,8 +91,11 @@ class AlphaVantageProvider(DataProvider):
             self.call_interval = 12   # Free: 12 saniye ara (5 calls/min için güvenli)
             plan_info = "Free Plan (25 calls/day, 5/min)"
         
-        # Rate limiting
-        self.last_call_time = 0
+        # Rate limiting: slot rezervasyonu - fetch thread'leri kota içinde eşzamanlı istek atabilir
+        self.rate_budget = rate_budget or RateBudget(60 / self.call_interval)
+        
+        # Seans takvimi: kapalı piyasada son kapanıştan sonra çekilmiş veri yeniden indirilmez
+        self.calendar = get_market_calendar()
         
         # Database-driven sembol mapping (artık statik değil)
         
@@ -160,21 +171,13 @@ class AlphaVantageProvider(DataProvider):
             return None
         
     def _rate_limit(self):
-        """Dynamic Rate limiting - Plan tipine göre"""
-        current_time = time.time()
-        time_since_last = current_time - self.last_call_time
-        
-        if time_since_last < self.call_interval:
-            sleep_time = self.call_interval - time_since_last
-            if sleep_time > 0.1:  # Sadece 100ms'den fazla beklemeler için log
-                plan_type = "Premium" if self.is_premium else "Free"
-                self.logger.debug(f"⏱️ {plan_type} rate limit - {sleep_time:.1f}s bekleniyor...")
-            
-            # Maximum sleep time protection (avoid infinite waits)
-            sleep_time = min(sleep_time, 30.0)  # Max 30 seconds wait
-            time.sleep(sleep_time)
-            
-        self.last_call_time = time.time()
+        """Dynamic Rate limiting - Plan tipine göre (her çağrı bir API isteğinden önce gelir)"""
+        wait = self.rate_budget.acquire()
+        if wait > 0.1:  # Sadece 100ms'den fazla beklemeler için log
+            plan_type = "Premium" if self.is_premium else "Free"
+            self.logger.debug(f"⏱️ {plan_type} rate limit - {wait:.1f}s beklendi")
+        count('network_calls')
+        count('rate_limit_wait_ms', wait * 1000)
         
     def _get_cache_key(self, data_type: str, symbols: str = 'global') -> str:
         """Cache anahtarı - Collision-resistant format"""
@@ -185,24 +188,48 @@ class AlphaVantageProvider(DataProvider):
         
     def _is_cache_valid(self, key: str) -> bool:
         """Cache geçerli mi"""
-        return key in self.cache and time.time() - self.cache[key]['timestamp'] < self.cache_duration
+        valid = key in self.cache and time.time() - self.cache[key]['timestamp'] < self.cache_duration
+        count('cache_hits' if valid else 'cache_misses')
+        return valid
+    
+    def _store_cache(self, cache_key: str, data_type: str, symbol: str, data):
+        """Cache'e yazar ve girdiyi (veri tipi, sembol) için son girdi olarak işaretler"""
+        self._cleanup_cache()  # Prevent memory leaks
+        entry = {'data': data, 'timestamp': time.time()}
+        self.cache[cache_key] = entry
+        self._latest_entries[(data_type, symbol)] = entry
     
+    def _unchanged_while_closed(self, cache_key: str, data_type: str, symbol: str, symbol_info: Dict) -> bool:
+        """
+        Süresi dolmuş son girdi hâlâ geçerli mi: piyasa kapalı ve girdi son kapanıştan
+        sonra çekilmiş (veri değişmiş olamaz). Öyleyse girdi tazelenip güncel zaman kovasının
+        anahtarına (cache_key) yazılır, API çağrılmaz.
+        """
+        entry = self._latest_entries.get((data_type, symbol))
+        if not (self.use_cache and entry and MARKET_CALENDAR_CONFIG['enabled']):
+            return False
+        if not self.calendar.for_asset(symbol_info['type']).unchanged_since(entry['timestamp']):
+            return False
+        entry['timestamp'] = time.time()
+        self.cache[cache_key] = entry
+        return True
+        
     def _cleanup_cache(self):
         """Cache cleanup to prevent memory leaks"""
         if len(self.cache) > self.max_cache_size:
             current_time = time.time()
             # Remove expired entries first
-            expired_keys = [k for k, v in self.cache.items() 
+            expired_keys = [k for k, v in list(self.cache.items()) 
                           if current_time - v['timestamp'] > self.cache_duration]
             for key in expired_keys:
-                del self.cache[key]
+                self.cache.pop(key, None)
             
             # If still too many entries, remove oldest ones
             if len(self.cache) > self.max_cache_size:
-                sorted_items = sorted(self.cache.items(), key=lambda x: x[1]['timestamp'])
+                sorted_items = sorted(list(self.cache.items()), key=lambda x: x[1]['timestamp'])
                 excess_count = len(self.cache) - self.max_cache_size + 100  # Keep some buffer
                 for key, _ in sorted_items[:excess_count]:
-                    del self.cache[key]
+                    self.cache.pop(key, None)
                 self.logger.debug(f"🧹 Cache cleanup: Removed {excess_count} old entries")
         
     def get_current_price(self, symbol: str) -> float:
@@ -216,6 +243,9 @@ class AlphaVantageProvider(DataProvider):
         symbol_info = self._get_asset_info(symbol)
         if not symbol_info:
             raise ValueError(f"❌ {symbol} desteklenmiyor veya database'de bulunamadı")
+        
+        if self._unchanged_while_closed(cache_key, 'price', symbol, symbol_info):
+            return self.cache[cache_key]['data']
             
         self._rate_limit()
         
@@ -268,11 +298,7 @@ class AlphaVantageProvider(DataProvider):
                 
             # Cache'e kaydet
             if self.use_cache:
-                self._cleanup_cache()  # Prevent memory leaks
-                self.cache[cache_key] = {
-                    'data': price,
-                    'timestamp': time.time()
-                }
+                self._store_cache(cache_key, 'price', symbol, price)
                 
             data_type = "real-time" if self.is_premium else "delayed"
             self.logger.debug(f"💰 {symbol}: {price} ({data_type})")
@@ -451,20 +477,16 @@ class AlphaVantageProvider(DataProvider):
         """
         try:
             # Lazy import to avoid circular imports
-            from web_app import app, CorrelationCache
+            from web_app import app, db
+            from correlation_store import load_snapshot
             
             correlation_score = 0
             correlation_count = 0
             
-            # 1. Veritabanından dinamik korelasyonları çek
+            # 1. Süreç cache'indeki korelasyon snapshot'ından eşik üstü partnerler (satır dilimi)
             with app.app_context():
-                # primary_symbol'ün hem symbol_1 hem de symbol_2 olabileceği durumları sorgula
-                correlations = CorrelationCache.query.filter(
-                    (CorrelationCache.symbol_1 == primary_symbol) | 
-                    (CorrelationCache.symbol_2 == primary_symbol)
-                ).filter(
-                    func.abs(CorrelationCache.correlation_value) >= CORRELATION_CONFIG['correlation_threshold']
-                ).all()
+                snapshot = load_snapshot(db.session)
+            correlations = snapshot.partners(primary_symbol) if snapshot is not None else []
 
             if not correlations:
                 self.logger.debug(f"🔍 {primary_symbol} için anlamlı korelasyon verisi bulunamadı (threshold: {CORRELATION_CONFIG['correlation_threshold']})")
@@ -472,11 +494,7 @@ class AlphaVantageProvider(DataProvider):
                 return self._sentiment_only_signal(primary_symbol)
 
             # 2. Korelasyon skorunu hesapla
-            for corr_pair in correlations:
-                # Diğer sembolü ve korelasyon değerini al
-                other_symbol = corr_pair.symbol_2 if corr_pair.symbol_1 == primary_symbol else corr_pair.symbol_1
-                corr_value = corr_pair.correlation_value
-                
+            for other_symbol, corr_value in correlations:
                 # Diğer sembolün trend'ini al
                 other_trend = self._get_cached_price_trend(other_symbol)
                 correlation_score += corr_value * other_trend
@@ -498,12 +516,14 @@ class AlphaVantageProvider(DataProvider):
             # 4. Final karar (dinamik korelasyon + sentiment)
             if correlation_count > 0:
                 avg_correlation = correlation_score / correlation_count
-                # Korelasyona %70, sentiment'a %30 ağırlık ver
-                combined_score = (avg_correlation * 0.7) + (sentiment_score * 0.3)
+                # Korelasyona %70, sentiment'a %30 ağırlık ver (SIGNAL_CONFIG)
+                correlation_weight = SIGNAL_CONFIG['correlation_score_weight']
+                combined_score = (avg_correlation * correlation_weight) + (sentiment_score * (1 - correlation_weight))
                 
-                if combined_score > 0.25:
+                threshold = SIGNAL_CONFIG['correlation_signal_threshold']
+                if combined_score > threshold:
                     return Signal.BUY
-                elif combined_score < -0.25:
+                elif combined_score < -threshold:
                     return Signal.SELL
                 else:
                     return Signal.HOLD
@@ -602,70 +622,137 @@ class AlphaVantageProvider(DataProvider):
             return 0.0
             
     def get_historical_data(self, symbol: str, timeframe: str, limit: int) -> pd.DataFrame:
-        """Historik veri al - Premium real-time"""
-        cache_key = self._get_cache_key(f'hist_{timeframe}_{limit}', symbol)
+        """
+        Historik veri al - Premium real-time
+        
+        Tüm periyotlar sembolün bar piramidinden dilimlenir: taban seri (1m, kripto 1d)
+        cache süresi dolunca güncellenir, 5m/15m/1h/1d toplamları ondan türetilir.
+        Tabandan ince periyot istenirse (ör. kripto 1m) taban seri döner.
+        """
+        cache_key = self._get_cache_key('bars', symbol)
         
         if self.use_cache and self._is_cache_valid(cache_key):
-            return self.cache[cache_key]['data']
-            
-        # Database'den asset bilgilerini al
-        symbol_info = self._get_asset_info(symbol)
-        if not symbol_info:
-            raise ValueError(f"❌ {symbol} desteklenmiyor veya database'de bulunamadı")
+            pyramid = self.cache[cache_key]['data']
+        else:
+            # Database'den asset bilgilerini al
+            symbol_info = self._get_asset_info(symbol)
+            if not symbol_info:
+                raise ValueError(f"❌ {symbol} desteklenmiyor veya database'de bulunamadı")
             
+            try:
+                if self._unchanged_while_closed(cache_key, 'bars', symbol, symbol_info):
+                    pyramid = self.cache[cache_key]['data']
+                else:
+                    pyramid = self._refresh_bars(symbol, symbol_info)
+            except Exception as e:
+                self.logger.error(f"❌ {symbol} historik veri hatası: {e}")
+                # Premium plan - no fallback, real data only
+                raise
+        
+        # Salt okunur görünüm: kopya yok, tüketicinin eklediği kolonlar piramide sızmaz
+        timeframe = timeframe if pyramid.can_derive(timeframe) else pyramid.base_timeframe
+        return pyramid.frame(timeframe, limit)
+    
+    def _refresh_bars(self, symbol: str, symbol_info: Dict) -> BarPyramid:
+        """
+        Sembol piramidine yeni barları ekler: mevcut seri varsa compact indirme
+        (son barlar) birleştirilir; ilk yüklemede veya örtüşme yoksa full indirilir.
+        """
+        base_timeframe = '1d' if symbol_info['type'] == 'crypto' else '1m'
+        pyramid = self.pyramids.get(symbol)
+        if pyramid is None or pyramid.base_timeframe != base_timeframe:
+            pyramid = self.pyramids[symbol] = BarPyramid(base_timeframe, PYRAMID_CONFIG['max_base_bars'])
+        
+        full = len(pyramid) == 0
         self._rate_limit()
+        data = self._download_history(symbol_info, full=full)
+        if data.empty:
+            raise ValueError("Veri bulunamadı")
+        
+        if full:
+            pyramid.reset(data)
+        elif not pyramid.update(data):
+            # Son güncellemeden beri compact penceresinden fazla bar geçmiş: boşluk bırakılmaz
+            self.logger.debug(f"📈 {symbol} bar serisi örtüşmüyor, tam geçmiş indiriliyor")
+            self._rate_limit()
+            pyramid.reset(self._download_history(symbol_info, full=True))
+        self.logger.debug(f"📈 {symbol} historik veri: {len(pyramid)} taban bar ({base_timeframe})")
+        
+        if self.use_cache:
+            self._store_cache(self._get_cache_key('bars', symbol), 'bars', symbol, pyramid)
+        return pyramid
+    
+    def _download_history(self, symbol_info: Dict, full: bool = False) -> pd.DataFrame:
+        """Tek API çağrısı - standart OHLCV frame (full: intraday için tüm geçmiş, yoksa son 100 bar)"""
+        outputsize = 'full' if full else 'compact'
+        if symbol_info['type'] == 'forex':
+            # Forex için intraday data (Volume yok)
+            data, _ = self.fx.get_currency_exchange_intraday(
+                from_symbol=symbol_info['from'],
+                to_symbol=symbol_info['to'],
+                interval='1min',
+                outputsize=outputsize
+            )
+            # Forex standardizasyonu: Volume ekle
+            return self._standardize_forex_data(data)
+            
+        elif symbol_info['type'] == 'stock':
+            # Stock için intraday data (Volume var)
+            data, _ = self.ts.get_intraday(
+                symbol=symbol_info['symbol'],
+                interval='1min',
+                outputsize=outputsize
+            )
+            # Stock standardizasyonu
+            return self._standardize_stock_data(data)
+            
+        elif symbol_info['type'] == 'crypto':
+            # Crypto için günlük data (Alpha Vantage intraday crypto yok)
+            data, _ = self.crypto.get_digital_currency_daily(
+                symbol=symbol_info['symbol'],
+                market=symbol_info['market']
+            )
+            # Crypto standardizasyonu
+            return self._standardize_crypto_data(data)
+        
+        raise ValueError(f"Bilinmeyen tip: {symbol_info['type']}")
+    
+    def prefetch(self, symbols: List[str], history: List[Tuple[str, int]] = (),
+                 sentiment: bool = True) -> Dict[str, str]:
+        """
+        Toplu ön yükleme - analyze_many CPU aşamalarından önce cache'i doldurur
         
-        try:
-            if symbol_info['type'] == 'forex':
-                # Forex için intraday data (Volume yok)
-                data, _ = self.fx.get_currency_exchange_intraday(
-                    from_symbol=symbol_info['from'],
-                    to_symbol=symbol_info['to'],
-                    interval='1min',
-                    outputsize='compact'
-                )
-                # Forex standardizasyonu: Volume ekle
-                data = self._standardize_forex_data(data)
-                
-            elif symbol_info['type'] == 'stock':
-                # Stock için intraday data (Volume var)
-                data, _ = self.ts.get_intraday(
-                    symbol=symbol_info['symbol'],
-                    interval='1min',
-                    outputsize='compact'
-                )
-                # Stock standardizasyonu
-                data = self._standardize_stock_data(data)
+        Fiyat, bar piramidi (history verilmişse) ve (hisseler için) haber sentiment'i.
+        Tüm periyotlar piramitten dilimlendiği için sembol başına tek indirme bütün
+        geçmiş isteklerini karşılar. Hatalar sembolle sınırlı kalır.
+        
+        Returns: {sembol: hata mesajı} (başarısız olanlar)
+        """
+        errors = {}
+        for symbol in symbols:
+            try:
+                self.get_current_price(symbol)
+                symbol_info = self._get_asset_info(symbol)
+                if not symbol_info:
+                    raise ValueError(f"❌ {symbol} desteklenmiyor veya database'de bulunamadı")
                 
-            elif symbol_info['type'] == 'crypto':
-                # Crypto için günlük data (Alpha Vantage intraday crypto yok)
-                data, _ = self.crypto.get_digital_currency_daily(
-                    symbol=symbol_info['symbol'],
-                    market=symbol_info['market']
-                )
-                # Crypto standardizasyonu
-                data = self._standardize_crypto_data(data)
+                # Tüm periyotlar tek taban seriden türetilir: sembol başına en fazla bir indirme
+                # (piyasa kapalıysa son kapanıştan sonra indirilmiş seri yeterli)
+                bars_key = self._get_cache_key('bars', symbol)
+                if history and not (self.use_cache and self._is_cache_valid(bars_key)) \
+                        and not self._unchanged_while_closed(bars_key, 'bars', symbol, symbol_info):
+                    self._refresh_bars(symbol, symbol_info)
                 
-            # Son N kayıt
-            if not data.empty:
-                data = data.head(limit)
+                # Korelasyon / sentiment sinyali aynı cache anahtarını okur
+                # (NEWS_SENTIMENT 'tickers' filtresi VE mantığıyla çalışır, toplu sorgu sembol başına sonuç vermez)
+                if sentiment and symbol_info['type'] == 'stock':
+                    self.get_news_sentiment([symbol], limit=15)
                     
-                # Cache'e kaydet
-                if self.use_cache:
-                    self.cache[cache_key] = {
-                        'data': data.copy(),
-                        'timestamp': time.time()
-                    }
-                    
-                self.logger.debug(f"📈 {symbol} historik veri: {len(data)} kayıt")
-                return data
-            else:
-                raise ValueError("Veri bulunamadı")
-                
-        except Exception as e:
-            self.logger.error(f"❌ {symbol} historik veri hatası: {e}")
-            # Premium plan - no fallback, real data only
-            raise
+            except Exception as e:
+                self.logger.warning(f"⚠️ {symbol} ön yükleme hatası: {e}")
+                errors[symbol] = str(e)
+        
+        return errors
             
     def _standardize_forex_data(self, data: pd.DataFrame) -> pd.DataFrame:
         """Forex data standardizasyonu (Volume ekle)"""
@@ -725,7 +812,10 @@ class AlphaVantageProvider(DataProvider):
         return self.spreads.get(symbol, 2.0)
         
     def get_market_depth(self, symbol: str) -> Dict:
-        """Market derinliği (simülasyon)"""
+        """
+        Market derinliği (simülasyon) - Alpha Vantage L2 defter sağlamaz;
+        sadece spread'den tek seviyeli (N, 2) dizi formatında defter döner
+        """
         current_price = self.get_current_price(symbol)
         spread = self.get_spread(symbol)
         
@@ -733,8 +823,8 @@ class AlphaVantageProvider(DataProvider):
         ask = current_price + spread/2
         
         return {
-            'bids': [[bid, 100.0]],
-            'asks': [[ask, 100.0]]
+            'bids': np.array([[bid, 100.0]]),
+            'asks': np.array([[ask, 100.0]])
         }
         
     def get_available_symbols(self) -> List[str]:
@@ -760,9 +850,12 @@ class AlphaVantageProvider(DataProvider):
             'is_premium': self.is_premium,
             'api_key': self.api_key[:8] + '...' if self.api_key else 'None',
             'cache_size': len(self.cache),
+            'bar_pyramids': len(self.pyramids),
             'cache_duration': f'{self.cache_duration}s',
             'supported_symbols': len(self.get_available_symbols()),
             'rate_limit': f'{self.call_interval}s interval',
+            'rate_budget': self.rate_budget.get_stats(),
+            'market_sessions': self.calendar.get_status(),
             'daily_limit': daily_limit,
             'features': [
                 'Real-time prices',
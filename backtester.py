@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+📉 Alpha Vantage Trading Framework - Vektörel Backtest Motoru
+TechnicalAnalyzer sinyal serisini ve RiskManager'ın ATR bazlı stop/target ve
+pozisyon büyüklüğü kurallarını geçmiş barlar üzerinde yeniden oynatır.
+
+- Sembol başına vektörel: sinyal/indikatörler tek geçişte, çıkışlar blok taramayla
+- Çok sembol: process pool ile paralel (listing_status.csv'deki binlerce sembol)
+- Rapor: P&L, drawdown, isabet oranı, turnover
+"""
+
+import argparse
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from universal_trading_framework import TechnicalAnalyzer, RiskManager, Signal
+
+logger = logging.getLogger(__name__)
+
+# Çıkış arama blok boyutu (pozisyon süresi kadar tarama, veri sonuna kadar değil)
+_SCAN_BLOCK = 256
+
+
+def load_listing_symbols(path: str = 'listing_status.csv', asset_type: str = 'Stock',
+                         exchanges: Iterable[str] = ('NYSE', 'NASDAQ')) -> List[str]:
+    """listing_status.csv'den aktif sembolleri okur"""
+    df = pd.read_csv(path)
+    df = df[(df['status'] == 'Active') & (df['assetType'] == asset_type)]
+    if exchanges:
+        df = df[df['exchange'].isin(list(exchanges))]
+    return df['symbol'].dropna().astype(str).tolist()
+
+
+class CsvBarLoader:
+    """`{directory}/{symbol}.csv` dosyalarından OHLCV okur (process pool'a gönderilebilir)"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def __call__(self, symbol: str) -> pd.DataFrame:
+        path = os.path.join(self.directory, f"{symbol}.csv")
+        if not os.path.exists(path):
+            return pd.DataFrame()
+        return pd.read_csv(path, index_col=0, parse_dates=True).sort_index()
+
+
+class Backtester:
+    """Tek sembol backtest'i - sinyal değişiminde giriş, ATR stop/target veya ters sinyalde çıkış"""
+
+    def __init__(self, initial_balance: float = 10000.0, fee_rate: float = 0.0,
+                 risk_manager: RiskManager = None, technical_analyzer: TechnicalAnalyzer = None):
+        self.initial_balance = initial_balance
+        self.fee_rate = fee_rate  # İşlem başına notional oranı (her bacak için)
+        self.risk_manager = risk_manager or RiskManager()
+        self.technical_analyzer = technical_analyzer or TechnicalAnalyzer()
+
+    def prepare(self, df: pd.DataFrame) -> Dict[str, np.ndarray]:
+        """İndikatörleri ve sinyal serisini bir kez hesaplar"""
+        frame = self.technical_analyzer.calculate_indicators(
+            df, outputs=TechnicalAnalyzer.SIGNAL_INPUTS + ['ATR'])
+        signals = self.technical_analyzer.generate_signal_series(frame)
+        atr = frame['ATR'].to_numpy(dtype=float) if 'ATR' in frame.columns else np.full(len(frame), np.nan)
+        return {
+            'high': frame['High'].to_numpy(dtype=float),
+            'low': frame['Low'].to_numpy(dtype=float),
+            'close': frame['Close'].to_numpy(dtype=float),
+            'atr': atr,
+            'signal': signals['Signal'].to_numpy()
+        }
+
+    def run(self, df: pd.DataFrame, symbol: str = None) -> Dict:
+        """Tek sembolü backtest eder ve metrikleri döndürür"""
+        if df is None or df.empty:
+            return {'symbol': symbol, 'error': 'Veri yok', 'error_type': 'DATA_UNAVAILABLE'}
+        return self.simulate(self.prepare(df), symbol)
+
+    def simulate(self, data: Dict[str, np.ndarray], symbol: str = None) -> Dict:
+        """Hazırlanmış diziler üzerinde işlem simülasyonu"""
+        high, low, close, atr, signal = data['high'], data['low'], data['close'], data['atr'], data['signal']
+        n = len(close)
+
+        balance = self.initial_balance
+        realized = np.zeros(n)     # Çıkış barında gerçekleşen P&L
+        unrealized = np.zeros(n)   # Açık pozisyonun bar sonu değeri
+        trades = []
+        traded_notional = 0.0
+        bars_in_market = 0
+
+        # Aday girişler: sinyalin değiştiği ve sıfır olmadığı barlar
+        changes = np.flatnonzero((signal != 0) & (np.concatenate(([0], signal[:-1])) != signal))
+        i = int(changes[0]) if len(changes) else n
+
+        while i < n - 1:
+            direction = int(signal[i])
+            entry = close[i]
+            bar_atr = atr[i] if np.isfinite(atr[i]) and atr[i] > 0 else None
+            trade_signal = Signal.BUY if direction > 0 else Signal.SELL
+            stop_loss, take_profit = self.risk_manager.calculate_levels(entry, trade_signal, bar_atr)
+            size = self.risk_manager.calculate_position_size(balance, entry, stop_loss)
+
+            if size <= 0 or not np.isfinite(size):
+                i = self._next_entry(changes, i + 1, n)
+                continue
+
+            exit_index, exit_price, reason = self._find_exit(
+                i, direction, stop_loss, take_profit, high, low, close, signal)
+
+            fees = self.fee_rate * size * (entry + exit_price)
+            pnl = direction * (exit_price - entry) * size - fees
+            balance += pnl
+            realized[exit_index] += pnl
+            unrealized[i:exit_index] = direction * (close[i:exit_index] - entry) * size
+            traded_notional += size * (entry + exit_price)
+            bars_in_market += exit_index - i
+            trades.append((i, exit_index, direction, entry, exit_price, size, pnl, reason))
+
+            # Ters sinyalle çıkışta aynı barda yeni yön açılır
+            i = exit_index if reason == 'reverse' else self._next_entry(changes, exit_index + 1, n)
+
+        equity = self.initial_balance + np.cumsum(realized) + unrealized
+        return self._summarize(symbol, n, trades, equity, balance, traded_notional, bars_in_market)
+
+    @staticmethod
+    def _next_entry(changes: np.ndarray, start: int, n: int) -> int:
+        position = np.searchsorted(changes, start)
+        return int(changes[position]) if position < len(changes) else n
+
+    @staticmethod
+    def _find_exit(i: int, direction: int, stop_loss: float, take_profit: float,
+                   high: np.ndarray, low: np.ndarray, close: np.ndarray, signal: np.ndarray) -> tuple:
+        """Stop, target veya ters sinyalin ilk gerçekleştiği barı blok blok arar"""
+        n = len(close)
+        start = i + 1
+        block = _SCAN_BLOCK
+        while start < n:
+            end = min(n, start + block)
+            if direction > 0:
+                stop_hit = low[start:end] <= stop_loss
+                target_hit = high[start:end] >= take_profit
+            else:
+                stop_hit = high[start:end] >= stop_loss
+                target_hit = low[start:end] <= take_profit
+            reverse = signal[start:end] == -direction
+            events = stop_hit | target_hit | reverse
+            if events.any():
+                k = int(np.argmax(events))
+                index = start + k
+                # Aynı barda stop ve target -> muhafazakâr varsayım: önce stop
+                if stop_hit[k]:
+                    return index, stop_loss, 'stop'
+                if target_hit[k]:
+                    return index, take_profit, 'target'
+                return index, close[index], 'reverse'
+            start = end
+            block *= 2
+        return n - 1, close[n - 1], 'end'
+
+    def _summarize(self, symbol, n, trades, equity, balance, traded_notional, bars_in_market) -> Dict:
+        pnls = np.array([trade[6] for trade in trades]) if trades else np.zeros(0)
+        wins = int((pnls > 0).sum())
+        peak = np.maximum.accumulate(equity) if n else equity
+        drawdown = float(np.max((peak - equity) / peak)) if n else 0.0
+
+        return {
+            'symbol': symbol,
+            'bars': n,
+            'trades': len(trades),
+            'wins': wins,
+            'losses': len(trades) - wins,
+            'hit_rate': round(wins / len(trades), 4) if trades else 0.0,
+            'total_pnl': round(float(pnls.sum()), 2),
+            'return_pct': round((balance / self.initial_balance - 1) * 100, 4),
+            'max_drawdown_pct': round(drawdown * 100, 4),
+            'turnover': round(traded_notional / self.initial_balance, 4),
+            'exposure_pct': round(bars_in_market / n * 100, 2) if n else 0.0,
+            'avg_trade_pnl': round(float(pnls.mean()), 4) if trades else 0.0,
+            'final_balance': round(balance, 2),
+            'exit_reasons': {reason: sum(1 for t in trades if t[7] == reason)
+                             for reason in ('stop', 'target', 'reverse', 'end')}
+        }
+
+
+def _backtest_symbol(symbol: str, loader: Callable[[str], pd.DataFrame], options: Dict) -> Dict:
+    """Process pool görevi - hata sembolle sınırlı kalır (analyze_symbol gibi)"""
+    try:
+        return Backtester(**options).run(loader(symbol), symbol)
+    except Exception as e:
+        return {'symbol': symbol, 'error': str(e), 'error_type': 'BACKTEST_ERROR'}
+
+
+def run_backtests(symbols: Iterable[str], loader: Callable[[str], pd.DataFrame],
+                  processes: Optional[int] = None, **options) -> Iterator[Dict]:
+    """
+    Sembolleri process pool'a dağıtır; sonuçlar tamamlandıkça döner.
+    loader picklable olmalı (ör. CsvBarLoader). processes=1 -> aynı süreçte çalışır.
+    """
+    symbols = list(symbols)
+    if processes == 1:
+        for symbol in symbols:
+            yield _backtest_symbol(symbol, loader, options)
+        return
+
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        futures = [executor.submit(_backtest_symbol, symbol, loader, options) for symbol in symbols]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def summarize_backtests(results: List[Dict]) -> Dict:
+    """Sembol sonuçlarını portföy özetine indirger"""
+    valid = [r for r in results if 'error' not in r]
+    trades = sum(r['trades'] for r in valid)
+    wins = sum(r['wins'] for r in valid)
+    return {
+        'symbols': len(results),
+        'failed': len(results) - len(valid),
+        'bars': sum(r['bars'] for r in valid),
+        'trades': trades,
+        'hit_rate': round(wins / trades, 4) if trades else 0.0,
+        'total_pnl': round(sum(r['total_pnl'] for r in valid), 2),
+        'avg_return_pct': round(float(np.mean([r['return_pct'] for r in valid])), 4) if valid else 0.0,
+        'worst_drawdown_pct': max((r['max_drawdown_pct'] for r in valid), default=0.0),
+        'avg_turnover': round(float(np.mean([r['turnover'] for r in valid])), 4) if valid else 0.0
+    }
+
+
+def main():
+    """Komut satırından toplu backtest"""
+    parser = argparse.ArgumentParser(description='Vektörel backtest (TechnicalAnalyzer + RiskManager)')
+    parser.add_argument('--bars-dir', required=True, help='{SYMBOL}.csv OHLCV dosyalarının dizini')
+    parser.add_argument('--symbols', nargs='*', help='Semboller (varsayılan: listing_status.csv)')
+    parser.add_argument('--limit', type=int, default=None, help='En fazla sembol sayısı')
+    parser.add_argument('--processes', type=int, default=None, help='Process sayısı (varsayılan: CPU)')
+    parser.add_argument('--balance', type=float, default=10000.0)
+    parser.add_argument('--fee-rate', type=float, default=0.0)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    symbols = args.symbols or load_listing_symbols()
+    if args.limit:
+        symbols = symbols[:args.limit]
+
+    print(f"📉 {len(symbols)} sembol backtest ediliyor...")
+    started = time.time()
+    results = []
+    for result in run_backtests(symbols, CsvBarLoader(args.bars_dir), args.processes,
+                                initial_balance=args.balance, fee_rate=args.fee_rate):
+        results.append(result)
+        if 'error' not in result:
+            print(f"  {result['symbol']:6s} | P&L {result['total_pnl']:>12,.2f} | "
+                  f"DD %{result['max_drawdown_pct']:6.2f} | Hit {result['hit_rate']:.2%} | "
+                  f"{result['trades']} işlem")
+
+    summary = summarize_backtests(results)
+    print(f"\n✅ {time.time() - started:.1f}s - Özet: {summary}")
+
+
+if __name__ == '__main__':
+    main()
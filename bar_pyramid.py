@@ -0,0 +1,245 @@
+"""
+🔺 Alpha Vantage Trading Framework - Çoklu Periyot Bar Piramidi
+Sembol başına tek taban seri (ör. 1m veya kripto için 1d) tutulur; 5m/15m/1h/1d
+OHLCV toplamları istendiğinde türetilir ve saklanır.
+
+- Yeni taban barları eklendiğinde her periyot sadece son (yarım kalmış) kovadan itibaren güncellenir
+- Toplama vektörel (ufunc.reduceat) - pandas resample yok
+- frame(): Hazır dizilerin son `limit` satırına salt okunur görünüm (kopya yok)
+"""
+
+import threading
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+TIMEFRAME_SECONDS = {
+    '1m': 60, '5m': 300, '15m': 900, '30m': 1800,
+    '1h': 3600, '4h': 14400, '1d': 86400
+}
+
+COLUMNS = ('Open', 'High', 'Low', 'Close', 'Volume')
+_OPEN, _HIGH, _LOW, _CLOSE, _VOLUME = range(5)
+
+
+class _BarSeries:
+    """
+    Büyüyebilen OHLCV tamponu - [0:length] geçerli.
+    Dışarı verilen dilimler tamponu paylaşır; verilmiş satırların üzerine yazmadan
+    önce tampon kopyalanır (copy-on-write), eklemeler her zaman güvenlidir.
+    """
+
+    def __init__(self, capacity: int = 256):
+        self.times = np.empty(capacity, dtype=np.int64)
+        self.values = np.empty((len(COLUMNS), capacity))
+        self.length = 0
+        self.exported = False
+
+    def _reallocate(self, capacity: int):
+        times = np.empty(capacity, dtype=np.int64)
+        values = np.empty((len(COLUMNS), capacity))
+        times[:self.length] = self.times[:self.length]
+        values[:, :self.length] = self.values[:, :self.length]
+        self.times, self.values = times, values
+        self.exported = False
+
+    def append(self, times: np.ndarray, values: np.ndarray):
+        count = len(times)
+        if self.length + count > len(self.times):
+            self._reallocate(max(2 * len(self.times), self.length + count))
+        self.times[self.length:self.length + count] = times
+        self.values[:, self.length:self.length + count] = values
+        self.length += count
+
+    def truncate(self, length: int):
+        """Sondaki satırları atar - yerlerine yazılacağı için paylaşılmışsa önce kopyalar"""
+        if length >= self.length:
+            return
+        if self.exported:
+            self._reallocate(len(self.times))
+        self.length = length
+
+    def drop_front(self, count: int):
+        """Baştaki `count` satırı atar (yeni tampon - eski görünümler etkilenmez)"""
+        keep = self.length - count
+        times = np.empty(max(256, 2 * keep), dtype=np.int64)
+        values = np.empty((len(COLUMNS), len(times)))
+        times[:keep] = self.times[count:self.length]
+        values[:, :keep] = self.values[:, count:self.length]
+        self.times, self.values, self.length = times, values, keep
+        self.exported = False
+
+    def frame(self, limit: Optional[int], tz=None, index_name=None, unit: str = 'ns') -> pd.DataFrame:
+        start = max(0, self.length - limit) if limit else 0
+        self.exported = True
+        index = pd.DatetimeIndex(self.times[start:self.length].view('datetime64[ns]'), name=index_name)
+        if unit != 'ns':
+            index = index.as_unit(unit)  # Kaynak frame'in zaman çözünürlüğü korunur
+        if tz is not None:
+            index = index.tz_localize('UTC').tz_convert(tz)
+        columns = {}
+        for position, column in enumerate(COLUMNS):
+            view = self.values[position, start:self.length]
+            view.flags.writeable = False
+            columns[column] = view
+        # copy=False: kolonlar tampon görünümü olarak kalır (frame_views.freeze_frame ile aynı kural)
+        return pd.DataFrame(columns, index=index, columns=list(COLUMNS), copy=False)
+
+
+def aggregate_bars(times: np.ndarray, values: np.ndarray, step_ns: int) -> tuple:
+    """
+    Sıralı taban barlarını `step_ns` kovalarına toplar: (kova başlangıç zamanları, OHLCV)
+    Open ilk, High en yüksek, Low en düşük, Close son, Volume toplam.
+    """
+    if not len(times):
+        return times[:0], values[:, :0]
+    buckets = times // step_ns
+    starts = np.concatenate(([0], np.flatnonzero(buckets[1:] != buckets[:-1]) + 1))
+    ends = np.append(starts[1:], len(times))
+    aggregated = np.empty((len(COLUMNS), len(starts)))
+    aggregated[_OPEN] = values[_OPEN, starts]
+    aggregated[_HIGH] = np.maximum.reduceat(values[_HIGH], starts)
+    aggregated[_LOW] = np.minimum.reduceat(values[_LOW], starts)
+    aggregated[_CLOSE] = values[_CLOSE, ends - 1]
+    aggregated[_VOLUME] = np.add.reduceat(values[_VOLUME], starts)
+    return buckets[starts] * step_ns, aggregated
+
+
+class BarPyramid:
+    """Tek sembolün taban serisi ve ondan türetilen periyotlar (thread-safe)"""
+
+    def __init__(self, base_timeframe: str = '1m', max_bars: int = None):
+        if base_timeframe not in TIMEFRAME_SECONDS:
+            raise ValueError(f"Bilinmeyen periyot: {base_timeframe}")
+        self.base_timeframe = base_timeframe
+        self.max_bars = max_bars
+        self.base = _BarSeries()
+        self.levels: Dict[str, _BarSeries] = {}
+        # Periyot başına: bu taban indeksinden sonrası henüz toplanmadı
+        self._dirty: Dict[str, int] = {}
+        self.tz = None
+        self.unit = 'ns'
+        self.index_name = None
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self.base.length
+
+    @property
+    def last_timestamp(self) -> Optional[pd.Timestamp]:
+        if not self.base.length:
+            return None
+        timestamp = pd.Timestamp(int(self.base.times[self.base.length - 1]))
+        return timestamp.tz_localize('UTC').tz_convert(self.tz) if self.tz is not None else timestamp
+
+    def can_derive(self, timeframe: str) -> bool:
+        """Periyot taban çözünürlüğün katı mı (daha ince periyot türetilemez)"""
+        seconds = TIMEFRAME_SECONDS.get(timeframe)
+        base_seconds = TIMEFRAME_SECONDS[self.base_timeframe]
+        return seconds is not None and seconds >= base_seconds and seconds % base_seconds == 0
+
+    def _normalize(self, df: pd.DataFrame) -> tuple:
+        """Frame -> (int64 ns zamanlar, (5, N) OHLCV) - sıralı, tekrarlanan zamanda son değer"""
+        index = pd.DatetimeIndex(df.index)
+        if self.base.length == 0:
+            self.tz = index.tz
+            self.unit = index.unit
+            self.index_name = df.index.name
+        times = index.as_unit('ns').asi8
+        values = np.vstack([df[column].to_numpy(dtype=float) for column in COLUMNS])
+        if len(times) > 1 and not np.all(times[1:] > times[:-1]):
+            order = np.argsort(times, kind='stable')
+            times, values = times[order], values[:, order]
+            keep = np.append(times[1:] != times[:-1], True)
+            times, values = times[keep], values[:, keep]
+        return times, values
+
+    def reset(self, df: pd.DataFrame):
+        """Seriyi bu frame ile baştan kurar (ilk yükleme / boşluk sonrası)"""
+        with self._lock:
+            self.base = _BarSeries()
+            self.levels.clear()
+            self._dirty.clear()
+            if not df.empty:
+                self.base.append(*self._normalize(df))
+                self._trim()
+
+    def update(self, df: pd.DataFrame) -> bool:
+        """
+        Yeni taban barlarını ekler. Frame mevcut seriyle örtüşmeli (ilk zamanı <= son bar):
+        örtüşen kısımda değişen barlar (oluşmakta olan son bar, revizyon) yeniden yazılır.
+
+        Returns: False -> örtüşme yok (arada kaçan barlar olabilir), seri değiştirilmedi
+        """
+        if df.empty:
+            return True
+        if not self.base.length:
+            self.reset(df)
+            return True
+
+        with self._lock:
+            times, values = self._normalize(df)
+            base = self.base
+            if times[0] > base.times[base.length - 1]:
+                return False
+
+            # Örtüşen kısım: ilk farklı bardan itibaren yeniden yazılır
+            position = int(np.searchsorted(base.times[:base.length], times[0]))
+            overlap = min(base.length - position, len(times))
+            same = (base.times[position:position + overlap] == times[:overlap]) & \
+                np.all(base.values[:, position:position + overlap] == values[:, :overlap], axis=0)
+            first_change = overlap if same.all() else int(np.argmin(same))
+            changed_at = position + first_change
+
+            if changed_at < base.length:
+                base.truncate(changed_at)
+            if first_change < len(times):
+                base.append(times[first_change:], values[:, first_change:])
+            for timeframe in self._dirty:
+                self._dirty[timeframe] = min(self._dirty[timeframe], changed_at)
+            self._trim()
+        return True
+
+    def _trim(self):
+        """Taban seri max_bars'ı %25 aşınca baştan kırpılır; periyotlar sonraki istekte yeniden kurulur"""
+        if self.max_bars and self.base.length > self.max_bars * 1.25:
+            self.base.drop_front(self.base.length - self.max_bars)
+            self.levels.clear()
+            self._dirty.clear()
+
+    def _sync_level(self, timeframe: str) -> _BarSeries:
+        """Periyodu, değişen ilk taban barının kovasından itibaren yeniden toplar"""
+        level = self.levels.get(timeframe)
+        if level is None:
+            level = self.levels[timeframe] = _BarSeries()
+            self._dirty[timeframe] = 0
+        dirty = self._dirty[timeframe]
+        base = self.base
+        if dirty >= base.length:
+            return level
+
+        step = TIMEFRAME_SECONDS[timeframe] * 10**9
+        bucket_start = base.times[dirty] // step * step
+        level.truncate(int(np.searchsorted(level.times[:level.length], bucket_start)))
+        start = int(np.searchsorted(base.times[:base.length], bucket_start))
+        level.append(*aggregate_bars(base.times[start:base.length], base.values[:, start:base.length], step))
+        self._dirty[timeframe] = base.length
+        return level
+
+    def frame(self, timeframe: str = None, limit: int = None) -> pd.DataFrame:
+        """Periyodun son `limit` barı - taban ya da türetilmiş dizilerin salt okunur dilimi"""
+        timeframe = timeframe or self.base_timeframe
+        if not self.can_derive(timeframe):
+            raise ValueError(f"{timeframe} periyodu {self.base_timeframe} tabanından türetilemez")
+        with self._lock:
+            series = self.base if timeframe == self.base_timeframe else self._sync_level(timeframe)
+            return series.frame(limit, self.tz, self.index_name, self.unit)
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {
+                'base_timeframe': self.base_timeframe,
+                'base_bars': self.base.length,
+                'levels': {timeframe: level.length for timeframe, level in self.levels.items()}
+            }
@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+⏱️ Alpha Vantage Trading Framework - Benchmark Paketi
+Analiz ve worker sıcak yollarını deterministik sentetik veriyle (API/ağ olmadan) ölçer.
+
+- Sonuçlar makine bilgisiyle JSON'a yazılır
+- --compare: önceki bir sonuç dosyasına göre eşiği aşan yavaşlamaları işaretler (çıkış kodu 1)
+
+Kullanım:
+    python benchmarks.py --output bench.json
+    python benchmarks.py --compare bench.json --threshold 0.2
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from synthetic_market import SyntheticMarket
+from universal_trading_framework import (
+    TechnicalAnalyzer, PredictionEngine, UniversalTradingBot, MockDataProvider, AssetType
+)
+
+logger = logging.getLogger(__name__)
+
+
+def machine_info() -> Dict:
+    """Sonuçların karşılaştırılabilirliği için ortam bilgisi"""
+    return {
+        'platform': platform.platform(),
+        'processor': platform.processor() or platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'python': sys.version.split()[0],
+        'numpy': np.__version__,
+        'pandas': pd.__version__
+    }
+
+
+def measure(func: Callable[[], object], repeats: int = 5, number: int = 1, warmup: int = 1) -> Dict:
+    """`number` çağrılık turları `repeats` kez ölçer; çağrı başına ms döndürür"""
+    for _ in range(warmup):
+        func()
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        for _ in range(number):
+            func()
+        timings.append((time.perf_counter() - started) / number * 1000)
+    return {
+        'median_ms': round(statistics.median(timings), 4),
+        'min_ms': round(min(timings), 4),
+        'mean_ms': round(statistics.fmean(timings), 4),
+        'repeats': repeats,
+        'number': number
+    }
+
+
+class BenchmarkSuite:
+    """Benchmark tanımları - her biri (isim -> ölçüm fonksiyonu)"""
+
+    def __init__(self, symbols: int = 50, bars: int = 500, repeats: int = 5, seed: int = 42):
+        self.symbol_count = symbols
+        self.bars = bars
+        self.repeats = repeats
+        self.seed = seed
+        self.market = SyntheticMarket(seed=seed, history_bars=max(bars, 2000))
+        self.symbols = [f'SYN{i:04d}' for i in range(symbols)]
+        self.frame = self.market.frame(self.symbols[0], '1m', bars)
+
+    @property
+    def benchmarks(self) -> Dict[str, Callable[[], Dict]]:
+        return {
+            'calculate_indicators': self.bench_calculate_indicators,
+            'generate_signal': self.bench_generate_signal,
+            'predict_price': self.bench_predict_price,
+            'analyze_symbol': self.bench_analyze_symbol,
+            'calculate_smart_scores': self.bench_smart_scores,
+            'correlation_matrix': self.bench_correlation_matrix,
+            'blocked_correlation': self.bench_blocked_correlation,
+            'update_cycle': self.bench_update_cycle
+        }
+
+    def run(self, only: Optional[List[str]] = None) -> Dict:
+        results = {}
+        for name, bench in self.benchmarks.items():
+            if only and name not in only:
+                continue
+            logger.info(f"⏱️ {name}...")
+            try:
+                results[name] = bench()
+            except Exception as e:
+                logger.error(f"❌ {name} benchmark hatası: {e}")
+                results[name] = {'error': str(e)}
+        return {
+            'created': datetime.now().isoformat(),
+            'machine': machine_info(),
+            'config': {'symbols': self.symbol_count, 'bars': self.bars,
+                       'repeats': self.repeats, 'seed': self.seed},
+            'results': results
+        }
+
+    # ------------------------------------------------------------------ analiz
+    def bench_calculate_indicators(self) -> Dict:
+        analyzer = TechnicalAnalyzer()  # Streaming store yok: tam hesaplama
+        return measure(lambda: analyzer.calculate_indicators(self.frame), self.repeats, number=5)
+
+    def bench_generate_signal(self) -> Dict:
+        analyzer = TechnicalAnalyzer()
+        frame = analyzer.calculate_indicators(self.frame)
+        return measure(lambda: analyzer.generate_signal(frame), self.repeats, number=200)
+
+    def bench_predict_price(self) -> Dict:
+        engine = PredictionEngine()
+        frame = self.frame.tail(100)
+        return measure(lambda: engine.predict_price(frame), self.repeats, number=200)
+
+    def bench_analyze_symbol(self) -> Dict:
+        """Soğuk analiz: her çağrıda yeni bot (boş indikatör cache'i)"""
+        provider = MockDataProvider(self.market)
+        symbols = iter(self.symbols * (self.repeats * 5 + 5))
+        return measure(
+            lambda: UniversalTradingBot(provider, AssetType.STOCKS).analyze_symbol(next(symbols)),
+            self.repeats, number=5)
+
+    # ------------------------------------------------------------------ worker
+    def bench_smart_scores(self) -> Dict:
+        worker = self._import_worker()
+        bot = UniversalTradingBot(MockDataProvider(self.market), AssetType.STOCKS)
+        analyses = [bot.analyze_symbol(symbol) for symbol in self.symbols[:10]]
+        return measure(lambda: [worker.calculate_smart_scores(a, a['symbol']) for a in analyses],
+                       self.repeats, number=20)
+
+    def bench_correlation_matrix(self) -> Dict:
+        worker = self._import_worker()
+        price_data = {symbol: self.market.frame(symbol, '15m', 2000)['Close'] for symbol in self.symbols}
+        result = measure(lambda: worker.compute_correlation_matrix(price_data), self.repeats)
+        result['symbols'] = len(price_data)
+        return result
+
+    def bench_blocked_correlation(self, memory_limit_mb: float = 16) -> Dict:
+        """
+        Bloklu korelasyon (eksik barlı, pairwise yol) - süre ve tracemalloc tepe belleği.
+        within_budget: tepe bellek memory_limit_mb altında mı (değilse main çıkış kodu 1)
+        """
+        from blocked_correlation import blocked_correlation
+        rng = np.random.default_rng(self.seed)
+        count, periods = max(self.symbol_count, 500), 2000
+        index = pd.date_range('2024-01-01', periods=periods, freq='15min')
+        common = rng.normal(0, 1e-3, periods)
+        closes = {}
+        for position in range(count):
+            returns = common * rng.uniform(-1, 1) + rng.normal(0, 1e-3, periods)
+            series = pd.Series(100 * np.exp(np.cumsum(returns)), index=index)
+            closes[f'SYN{position:04d}'] = series[rng.random(periods) > 0.05]  # %5 eksik bar
+
+        run = lambda: blocked_correlation(closes, memory_limit_mb=memory_limit_mb, processes=1, keep_matrix=False)
+        result = measure(run, repeats=max(1, self.repeats // 2))
+        tracemalloc.start()
+        try:
+            baseline = tracemalloc.get_traced_memory()[0]
+            run()
+            peak = tracemalloc.get_traced_memory()[1] - baseline
+        finally:
+            tracemalloc.stop()
+        result.update({
+            'symbols': count,
+            'periods': periods,
+            'memory_limit_mb': memory_limit_mb,
+            'peak_mb': round(peak / 2**20, 1),
+            'within_budget': peak <= memory_limit_mb * 2**20
+        })
+        return result
+
+    def bench_update_cycle(self) -> Dict:
+        """Tam update_data_for_all_users döngüsü - geçici SQLite DB ve sahte provider ile"""
+        worker = self._import_worker()
+        from web_app import app, db, Asset
+
+        with app.app_context():
+            db.create_all()
+            if not Asset.query.filter(Asset.symbol.in_(self.symbols)).count():
+                db.session.add_all([Asset(symbol=symbol, name=symbol, exchange='SYNTH', asset_type='stock')
+                                    for symbol in self.symbols])
+                db.session.commit()
+
+        def cycle():
+            # Her döngüde piyasa bir bar ilerler: streaming/cache yolları gerçekçi çalışır
+            self.market.advance(1)
+            worker.update_data_for_all_users(provider=MockDataProvider(self.market), scheduled=False)
+
+        result = measure(cycle, repeats=max(1, self.repeats // 2), warmup=1)
+        result['symbols'] = self.symbol_count
+        result['symbols_per_minute'] = round(self.symbol_count / result['median_ms'] * 60000, 1)
+        return result
+
+    _worker = None
+
+    def _import_worker(self):
+        """worker/web_app import'u: DB ve durum dosyaları geçici dizine yönlendirilir"""
+        if BenchmarkSuite._worker is None:
+            workdir = tempfile.mkdtemp(prefix='bench_')
+            os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+            os.chdir(workdir)  # instance/*.json durum dosyaları burada yazılır
+            logging.getLogger('worker').setLevel(logging.WARNING)
+            import worker
+            BenchmarkSuite._worker = worker
+        return BenchmarkSuite._worker
+
+
+def compare_results(current: Dict, baseline: Dict, threshold: float = 0.2) -> List[Dict]:
+    """Medyan süresi baseline'dan `threshold` oranından fazla artan benchmark'lar"""
+    rows = []
+    for name, result in current['results'].items():
+        base = baseline.get('results', {}).get(name)
+        if not base or 'median_ms' not in base or 'median_ms' not in result:
+            continue
+        change = result['median_ms'] / base['median_ms'] - 1 if base['median_ms'] else 0.0
+        rows.append({
+            'name': name,
+            'baseline_ms': base['median_ms'],
+            'current_ms': result['median_ms'],
+            'change_pct': round(change * 100, 1),
+            'regression': change > threshold
+        })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Analiz / worker sıcak yol benchmark paketi')
+    parser.add_argument('--output', default='benchmark_results.json', help='Sonuç JSON dosyası')
+    parser.add_argument('--compare', help='Karşılaştırılacak önceki sonuç dosyası')
+    parser.add_argument('--threshold', type=float, default=0.2, help='Yavaşlama eşiği (0.2 = %%20)')
+    parser.add_argument('--only', nargs='*', help='Sadece bu benchmark\'lar')
+    parser.add_argument('--symbols', type=int, default=50)
+    parser.add_argument('--bars', type=int, default=500)
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    # Worker logları benchmark çıktısını boğmasın
+    logging.getLogger('universal_trading_framework').setLevel(logging.ERROR)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    output = os.path.abspath(args.output)  # Worker benchmark'ı çalışma dizinini değiştirir
+
+    suite = BenchmarkSuite(symbols=args.symbols, bars=args.bars, repeats=args.repeats, seed=args.seed)
+    report = suite.run(args.only)
+
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    print(f"\n⏱️ Benchmark sonuçları ({report['machine']['processor']}, {report['machine']['cpu_count']} CPU)")
+    for name, result in report['results'].items():
+        if 'error' in result:
+            print(f"  ❌ {name:24s} HATA: {result['error']}")
+        else:
+            print(f"  {name:26s} {result['median_ms']:>12.3f} ms (min {result['min_ms']:.3f})")
+    print(f"💾 {output}")
+
+    over_budget = [name for name, result in report['results'].items() if result.get('within_budget') is False]
+    for name in over_budget:
+        result = report['results'][name]
+        print(f"  🔴 {name}: tepe bellek {result['peak_mb']} MB > bütçe {result['memory_limit_mb']} MB")
+
+    if baseline is not None:
+        rows = compare_results(report, baseline, args.threshold)
+        regressions = [row for row in rows if row['regression']]
+        print(f"\n📊 Karşılaştırma ({args.compare}, eşik %{args.threshold * 100:.0f})")
+        for row in rows:
+            flag = '🔴 YAVAŞLAMA' if row['regression'] else '✅'
+            print(f"  {row['name']:26s} {row['baseline_ms']:>10.3f} -> {row['current_ms']:>10.3f} ms "
+                  f"({row['change_pct']:+.1f}%) {flag}")
+        if regressions:
+            sys.exit(1)
+    if over_budget:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
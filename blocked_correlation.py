@@ -0,0 +1,249 @@
+"""
+🧱 Alpha Vantage Trading Framework - Bellek Sınırlı Bloklu Korelasyon
+Binlerce sembollük evrende (listing_status.csv ~12.000 satır) korelasyon matrisi
+geniş bir DataFrame ve pandas corr() ile kurulamaz. Bu modül:
+
+- Getirileri bir kez standartlaştırır ve sembol başına bitişik float32 satırlar olarak
+  diskteki memmap dosyalarına yazar (bellekte tam T×N DataFrame yok)
+- Matrisi satır şeritleri x kolon blokları halinde BLAS matris çarpımıyla hesaplar;
+  blok boyutu memory_limit_mb / süreç sayısına göre seçilir
+- Eksik barlarda çift bazlı (pairwise) sonuç pandas corr ile aynıdır: maske matrisleriyle
+  ortak bar sayısı ve ortak barlardaki toplamlar da çarpımla bulunur
+- Her blok doğrudan komşu indeksine (ve istenirse çıktı memmap'ine) yazılır;
+  şeritler ayrı süreçlere dağıtılır (girdi/çıktı dosya üzerinden paylaşılır)
+"""
+
+import logging
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from constants import CORRELATION_CONFIG
+from neighbor_index import NeighborIndex
+
+logger = logging.getLogger(__name__)
+
+_ITEM = 4  # float32 bayt
+
+
+def strip_bytes(block: int, periods: int, symbols: int, k: int, has_gaps: bool = True) -> int:
+    """
+    _correlate_strip'in en yüksek ara bellek ihtiyacı (bayt):
+    - girdiler: şerit ve kolon bloğu (z; eksik barda + maske ve kare)
+    - blok x blok ara sonuçlar: eksik barda 5 float32 (sayı, iki ortalama, kovaryans, geçici)
+      + 2 bool maske; eksiksizde korelasyon + bool maske
+    - komşu birleştirme (satır parçalı, NeighborIndex.merge_bytes) ve şeridin komşu dizileri
+    """
+    inputs = (6 if has_gaps else 2) * block * periods * _ITEM
+    temporaries = block * block * ((5 * _ITEM + 2) if has_gaps else (_ITEM + 1))
+    merge = NeighborIndex.merge_bytes(block, k) + 4 * symbols * k * _ITEM
+    return inputs + temporaries + merge
+
+
+def choose_block_size(symbols: int, periods: int, memory_limit_mb: float, processes: int,
+                      k: int = None, has_gaps: bool = True) -> int:
+    """Süreç başına bütçeye (memory_limit_mb / süreç) strip_bytes'ı sığan en büyük blok"""
+    k = CORRELATION_CONFIG['neighbor_k'] if k is None else k
+    budget = memory_limit_mb * 2**20 / max(1, processes)
+    block = 4096
+    while block > 32 and strip_bytes(min(block, symbols), periods, symbols, k, has_gaps) > budget:
+        block //= 2
+    if strip_bytes(min(block, symbols), periods, symbols, k, has_gaps) > budget:
+        logger.warning(f"⚠️ Bloklu korelasyon en küçük blokta bile {memory_limit_mb:.0f} MB bütçeyi aşıyor "
+                       f"({symbols} sembol x {periods} bar, {processes} süreç)")
+    return max(1, min(block, symbols))
+
+
+def _union_times(closes: Dict[str, pd.Series], chunk: int = 256) -> np.ndarray:
+    """
+    Getiri zamanlarının birleşimi (int64 ns, her serinin ilk barı hariç) - parça parça,
+    tüm indeksler aynı anda kopyalanmaz
+    """
+    times = np.empty(0, dtype=np.int64)
+    series = list(closes.values())
+    for start in range(0, len(series), chunk):
+        part = np.concatenate([pd.DatetimeIndex(item.index[1:]).as_unit('ns').asi8
+                               for item in series[start:start + chunk]])
+        times = np.union1d(times, part)
+    return times
+
+
+def _write_inputs(closes: Dict[str, pd.Series], directory: str) -> Tuple[List[str], int, bool]:
+    """
+    Sembol başına kendi barları arasındaki getiriyi ortak zaman eksenine hizalayıp
+    standartlaştırır ve memmap'e yazar: z.npy (NaN -> 0) ve mask.npy (bar var = 1).
+    Her sembol bitişik bir satırdır.
+
+    Returns: (semboller, zaman sayısı, maskeli (pairwise) hesap gerekli mi)
+    """
+    closes = {symbol: series for symbol, series in closes.items() if len(series) > 1}
+    symbols = list(closes)
+    times = _union_times(closes)
+    z = np.lib.format.open_memmap(os.path.join(directory, 'z.npy'), mode='w+',
+                                  dtype=np.float32, shape=(len(symbols), len(times)))
+    mask = np.lib.format.open_memmap(os.path.join(directory, 'mask.npy'), mode='w+',
+                                     dtype=np.float32, shape=(len(symbols), len(times)))
+    has_gaps = False
+    for row, symbol in enumerate(symbols):
+        series = closes[symbol]
+        values = np.full(len(times), np.nan)
+        positions = np.searchsorted(times, pd.DatetimeIndex(series.index[1:]).as_unit('ns').asi8)
+        values[positions] = series.pct_change(fill_method=None).to_numpy(dtype=float)[1:]
+        present = np.isfinite(values)
+        std = values[present].std() if present.any() else 0.0
+        if std > 0:
+            # Tek seferlik standartlaştırma - korelasyon sembol başına doğrusal dönüşüme duyarsız
+            values = (values - values[present].mean()) / std
+        else:
+            present[:] = False  # Sabit seri: tüm çiftleri NaN (pandas corr ile aynı)
+        has_gaps = has_gaps or not present.all()
+        z[row] = np.where(present, values, 0.0)
+        mask[row] = present
+    z.flush()
+    mask.flush()
+    return symbols, len(times), has_gaps
+
+
+def _pairwise_block(strip: np.ndarray, strip_mask: np.ndarray, strip_square: np.ndarray,
+                    other: np.ndarray, other_mask: np.ndarray, min_periods: int) -> np.ndarray:
+    """
+    Eksik barlı blok: sadece ortak barlar üzerinden (pandas corr ile aynı) korelasyon.
+    Ara sonuçlar yerinde hesaplanır - aynı anda en fazla 5 blok x blok float32 dizi.
+    """
+    count = strip_mask @ other_mask.T
+    too_few = count < min_periods
+    np.maximum(count, 1.0, out=count)
+    mean_x = strip @ other_mask.T
+    mean_x /= count
+    mean_y = strip_mask @ other.T
+    mean_y /= count
+    correlation = strip @ other.T                 # Kovaryans
+    correlation /= count
+    scratch = np.multiply(mean_x, mean_y)
+    correlation -= scratch
+    np.square(mean_x, out=mean_x)
+    np.matmul(strip_square, other_mask.T, out=scratch)
+    scratch /= count
+    scratch -= mean_x                             # x varyansı
+    np.square(mean_y, out=mean_y)
+    other_square = other * other
+    np.matmul(strip_mask, other_square.T, out=mean_x)
+    del other_square
+    mean_x /= count
+    mean_x -= mean_y                              # y varyansı
+    scratch *= mean_x
+    with np.errstate(invalid='ignore', divide='ignore'):
+        np.sqrt(scratch, out=scratch)
+        correlation /= scratch
+    correlation[too_few] = np.nan
+    return correlation
+
+
+def _correlate_strip(task: Dict) -> Tuple[int, int, Dict[str, np.ndarray]]:
+    """
+    Tek satır şeridinin tüm kolon bloklarıyla korelasyonu (alt süreçte çalışır).
+    Bloklar çıktı memmap'ine ve şeridin komşu dizilerine yazılır.
+    """
+    directory, start, stop = task['directory'], task['start'], task['stop']
+    z = np.load(os.path.join(directory, 'z.npy'), mmap_mode='r')
+    mask = np.load(os.path.join(directory, 'mask.npy'), mmap_mode='r')
+    output = np.load(os.path.join(directory, 'matrix.npy'), mmap_mode='r+') if task['keep_matrix'] else None
+    symbols, block, periods = z.shape[0], task['block'], z.shape[1]
+    neighbors = NeighborIndex(task['symbols'], task['k'])
+
+    strip = np.array(z[start:stop])
+    if task['has_gaps']:
+        strip_mask = np.array(mask[start:stop])
+        strip_square = strip * strip
+    for column in range(0, symbols, block):
+        other = np.array(z[column:column + block])
+        if not task['has_gaps']:
+            # Eksiksiz veri: standart seriler üzerinde tek çarpım
+            correlation = strip @ other.T
+            correlation /= periods
+        else:
+            correlation = _pairwise_block(strip, strip_mask, strip_square, other,
+                                          np.array(mask[column:column + block]), task['min_periods'])
+        np.clip(correlation, -1.0, 1.0, out=correlation)
+        correlation[~np.isfinite(correlation)] = np.nan
+        neighbors.merge(start, column, correlation)
+        if output is not None:
+            output[start:stop, column:column + block] = correlation
+        del correlation, other
+    if output is not None:
+        output.flush()
+    arrays = {name: values[start:stop] for name, values in neighbors.to_arrays().items()}
+    return start, stop, arrays
+
+
+def blocked_correlation(closes: Dict[str, pd.Series], memory_limit_mb: float = None,
+                        processes: int = None, k: int = None, keep_matrix: bool = None) -> Dict:
+    """
+    Kapanış serilerinden (sembol -> zaman indeksli seri) getiri korelasyonunun komşu
+    indeksi ve (keep_matrix ise) tam float32 matris.
+
+    memory_limit_mb: Tüm süreçler için blok ara sonuçlarının toplam bütçesi
+    processes: Şeritlerin dağıtıldığı süreç sayısı (1 -> bu süreçte)
+    keep_matrix: None -> sembol sayısı snapshot_matrix_max_symbols'u aşmıyorsa
+
+    Returns: {'symbols', 'neighbors': NeighborIndex, 'matrix': ndarray | None, 'stats'}
+    """
+    config = CORRELATION_CONFIG
+    memory_limit_mb = memory_limit_mb or config['blocked_memory_limit_mb']
+    processes = max(1, processes or config['blocked_processes'] or os.cpu_count() or 1)
+    k = config['neighbor_k'] if k is None else k
+    started = time.perf_counter()
+
+    directory = tempfile.mkdtemp(prefix='correlation-')
+    try:
+        symbols, periods, has_gaps = _write_inputs(closes, directory)
+        if keep_matrix is None:
+            keep_matrix = len(symbols) <= config['snapshot_matrix_max_symbols']
+        if keep_matrix:
+            np.lib.format.open_memmap(os.path.join(directory, 'matrix.npy'), mode='w+',
+                                      dtype=np.float32, shape=(len(symbols), len(symbols)))
+        # Çıktı matrisi ve toplanan komşu dizileri bütçeden düşülür, kalanı bloklara
+        reserved = (len(symbols) ** 2 * _ITEM if keep_matrix else 0) + 4 * len(symbols) * k * _ITEM
+        block = choose_block_size(len(symbols), periods, max(memory_limit_mb - reserved / 2**20, 1.0),
+                                  processes, k, has_gaps)
+        tasks = [{
+            'directory': directory, 'start': start, 'stop': min(start + block, len(symbols)),
+            'block': block, 'symbols': symbols, 'k': k, 'has_gaps': has_gaps,
+            'min_periods': config['min_data_points'], 'keep_matrix': keep_matrix
+        } for start in range(0, len(symbols), block)]
+
+        neighbors = NeighborIndex(symbols, k)
+        processes = min(processes, len(tasks))
+        if processes == 1:
+            results = list(map(_correlate_strip, tasks))
+        else:
+            with ProcessPoolExecutor(max_workers=processes) as executor:
+                results = list(executor.map(_correlate_strip, tasks))
+        for start, stop, arrays in results:
+            for name, values in neighbors.to_arrays().items():
+                values[start:stop] = arrays[name]
+
+        matrix = None
+        if keep_matrix:
+            matrix = np.array(np.load(os.path.join(directory, 'matrix.npy'), mmap_mode='r'))
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    stats = {
+        'symbols': len(symbols),
+        'periods': periods,
+        'block': block,
+        'strips': len(tasks),
+        'processes': processes,
+        'pairwise_gaps': has_gaps,
+        'seconds': round(time.perf_counter() - started, 3)
+    }
+    logger.info(f"🧱 Bloklu korelasyon: {stats['symbols']} sembol x {periods} bar, blok {block}, "
+                f"{stats['strips']} şerit / {processes} süreç, {stats['seconds']:.1f}s")
+    return {'symbols': symbols, 'neighbors': neighbors, 'matrix': matrix, 'stats': stats}
@@ -0,0 +1,100 @@
+"""
+📥 Alpha Vantage Trading Framework - Toplu Upsert
+Bir grup satırı tek ifadeyle yazar: PostgreSQL ve SQLite'ta
+INSERT ... ON CONFLICT DO UPDATE, diğer veritabanlarında mevcut anahtarları tek
+sorguda okuyup executemany INSERT + UPDATE.
+
+Tüm fonksiyonlar çalıştırdıkları ifade (DB round-trip) sayısını döndürür - commit
+çağıranın işidir.
+"""
+
+from typing import Dict, Iterable, List, Sequence, Tuple, Union
+
+from sqlalchemy import bindparam, select, tuple_, update
+
+# Bağlama parametresi sınırı (SQLite varsayılanı 32766) - çok satırlı VALUES bu kadar parametreyle bölünür
+MAX_PARAMETERS = 30000
+
+
+def dialect_insert(session, table):
+    """Sunucunun ON CONFLICT destekli insert'i - yoksa None"""
+    dialect = session.get_bind().dialect.name
+    if dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        return None
+    return insert(table)
+
+
+def _group_by_columns(rows: Iterable[Dict]) -> List[List[Dict]]:
+    """Aynı kolon kümesine sahip satırlar tek ifadede yazılabilir"""
+    groups = {}
+    for row in rows:
+        groups.setdefault(tuple(sorted(row)), []).append(row)
+    return list(groups.values())
+
+
+def _key_columns(key: Union[str, Sequence[str]]) -> Tuple[str, ...]:
+    return (key,) if isinstance(key, str) else tuple(key)
+
+
+def upsert_rows(session, table, rows: List[Dict], key: Union[str, Sequence[str]] = 'symbol') -> int:
+    """
+    Satırları `key` benzersiz kolonuna (ya da bileşik anahtar kolonlarına) göre ekler ya da
+    günceller (satırdaki tüm kolonlar yazılır). Bir batch'te aynı anahtar birden fazla varsa sonuncusu kazanır.
+    """
+    keys = _key_columns(key)
+    rows = list({tuple(row[column] for column in keys): row for row in rows}.values())
+    if not rows:
+        return 0
+    statements = 0
+    for group in _group_by_columns(rows):
+        insert = dialect_insert(session, table)
+        if insert is None:
+            statements += _upsert_fallback(session, table, group, keys)
+            continue
+        chunk = max(1, MAX_PARAMETERS // len(group[0]))
+        for start in range(0, len(group), chunk):
+            stmt = insert.values(group[start:start + chunk])
+            stmt = stmt.on_conflict_do_update(
+                index_elements=list(keys),
+                set_={column: stmt.excluded[column] for column in group[0] if column not in keys}
+            )
+            session.execute(stmt)
+            statements += 1
+    return statements
+
+
+def _upsert_fallback(session, table, rows: List[Dict], keys: Tuple[str, ...]) -> int:
+    """ON CONFLICT olmayan dialect: anahtar okuma + executemany insert/update (en fazla 3 ifade)"""
+    key_columns = [table.c[column] for column in keys]
+    values = [tuple(row[column] for column in keys) for row in rows]
+    if len(keys) == 1:
+        condition = key_columns[0].in_([value for value, in values])
+    else:
+        condition = tuple_(*key_columns).in_(values)
+    existing = set(tuple(found) for found in session.execute(select(*key_columns).where(condition)))
+    statements = 1
+    new_rows = [row for row, value in zip(rows, values) if value not in existing]
+    if new_rows:
+        session.execute(table.insert(), new_rows)
+        statements += 1
+    changed = [row for row, value in zip(rows, values) if value in existing]
+    if changed:
+        statements += update_rows(session, table, changed, keys)
+    return statements
+
+
+def update_rows(session, table, rows: List[Dict], key: Union[str, Sequence[str]] = 'symbol') -> int:
+    """Sadece mevcut satırları günceller (olmayan anahtar atlanır) - kolon kümesi başına tek executemany"""
+    keys = _key_columns(key)
+    statements = 0
+    for group in _group_by_columns(rows):
+        # bindparam adları kolon adlarıyla çakışamaz: 'b_' öneki
+        stmt = update(table).where(*(table.c[column] == bindparam(f'b_{column}') for column in keys)).values(
+            {column: bindparam(f'b_{column}') for column in group[0] if column not in keys})
+        session.execute(stmt, [{f'b_{column}': value for column, value in row.items()} for row in group])
+        statements += 1
+    return statements
@@ -34,19 +34,30 @@ AVAILABLE_ASSETS = {
 
 # Korelasyon hesaplama konfigürasyonu
 CORRELATION_CONFIG = {
-    'update_interval_hours': 24,  # Günde bir korelasyon güncelleme
+    'update_interval_hours': 24,  # Günde bir tam hesap (arada kayan motor her döngü günceller)
     'historical_days': 90,        # 90 günlük veri ile korelasyon hesapla
     'min_data_points': 50,        # Minimum veri noktası
     'timeframe': '15m',           # 15 dakikalık periyot
-    'correlation_threshold': 0.3  # Minimum anlamlı korelasyon
+    'correlation_threshold': 0.3, # Minimum anlamlı korelasyon
+    'rolling_max_lag_hours': 96,  # Bu kadar geride kalan sembol kayan motorun ekleme ufkunu tutmaz (hafta sonu < 96s)
+    'bar_store_hours': 192,       # Paylaşılan bar kuyruğu tablosunda tutulan süre (worker'lar yazar, lider okur)
+    'snapshot_check_seconds': 30, # Okuyucular yeni snapshot sürümünü en fazla bu sıklıkla sorgular
+    'snapshot_keep_versions': 2,  # Saklanan son snapshot sürümü sayısı
+    'neighbor_k': 16,             # Sembol başına komşu indeksindeki pozitif / negatif partner sayısı
+    'blocked_min_symbols': 1500,  # Bu sayıdan fazla sembolde tam hesap bloklu (kayan motor kapalı)
+    'blocked_memory_limit_mb': 512,      # Bloklu hesabın ara sonuç bütçesi (tüm süreçler)
+    'blocked_processes': None,    # Bloklu hesap süreç sayısı (None -> CPU sayısı)
+    'snapshot_matrix_max_symbols': 2000  # Üstünde snapshot'a sadece komşu indeksi yazılır
 }
 
 # API ve Worker konfigürasyonu
 API_CONFIG = {
     'timeout': 20,                # API request timeout (seconds)
     'max_retries': 3,            # Maximum retry attempts
-    'rate_limit_sleep': 1.5,     # Sleep between rate limited requests
-    'batch_commit_size': 10,     # Database batch commit size
+    'batch_commit_size': 50,     # Pipeline persist grubu - grup başına tek upsert ifadesi + commit
+    'analysis_workers': 4,       # analyze_many / pipeline analyze thread sayısı (sadece I/O örtüşür - GIL)
+    'fetch_workers': 4,          # Pipeline fetch thread sayısı (eşzamanlılığı rate budget sınırlar)
+    'pipeline_queue_size': 32,   # Aşamalar arası kuyruk sınırı (geri basınç)
     'max_cache_size': 1000,      # Maximum cache entries
     'worker_sleep_interval': 60   # Worker sleep interval (1 minute) - Hızlı test için
 }
@@ -56,5 +67,83 @@ SIGNAL_CONFIG = {
     'buy_threshold': 2,           # Minimum signals for BUY
     'sell_threshold': 2,          # Minimum signals for SELL
     'correlation_weight': 0.5,    # Correlation signal weight
-    'sentiment_threshold': 0.3    # Sentiment signal threshold
-} 
\ No newline at end of file
+    'sentiment_threshold': 0.3,   # Sentiment signal threshold
+    
+    # Teknik sinyal eşikleri (TechnicalAnalyzer.generate_signal) - parametre taramasıyla ayarlanır
+    'technical_buy_threshold': 0.3,    # Toplam oy >= bu ise BUY
+    'technical_sell_threshold': -0.3,  # Toplam oy <= bu ise SELL
+    'rsi_oversold': 30,           # Güçlü alım
+    'rsi_weak_buy': 40,           # Zayıf alım bölgesi
+    'rsi_weak_sell': 60,          # Zayıf satım bölgesi
+    'rsi_overbought': 70,         # Güçlü satım
+    
+    # Korelasyon sinyali (AlphaVantageProvider.get_correlation_signal)
+    'correlation_signal_threshold': 0.25,  # |birleşik skor| eşiği
+    'correlation_score_weight': 0.7        # Korelasyon ağırlığı (sentiment = 1 - bu)
+} 
+# İndikatör konfigürasyonu (streaming durum + frame cache)
+STREAMING_CONFIG = {
+    'history_size': 500,          # Saklanan son bar çıktısı (en büyük frame limiti kadar)
+    'state_path': 'instance/indicator_state.json',  # Worker restart'larında korunan durum (sharding'de worker_id eklenir)
+    'indicator_cache_size': 500   # Maksimum indikatör frame cache girdisi
+}
+
+# Bar piramidi (AlphaVantageProvider - tek taban seriden türetilen periyotlar)
+PYRAMID_CONFIG = {
+    'max_base_bars': 12000        # Sembol başına saklanan taban bar (1m: ~8 gün 24s piyasa)
+}
+
+# Online tahmin modeli (PredictionEngine - RLS)
+PREDICTION_CONFIG = {
+    'online_enabled': False,      # Kapalıyken worker toplu (vektörel) regresyon tahminini kullanır
+    'state_path': 'instance/prediction_state.json',  # İndikatör durumunun yanında saklanır
+    'forgetting_factor': 0.995,   # RLS unutma katsayısı (yakın barlara daha çok ağırlık)
+    'initial_covariance': 100.0,  # Başlangıç P = delta * I
+    'error_smoothing': 0.05,      # Hata varyansı EWMA katsayısı (güven hesabı)
+    'min_updates': 50             # Bu kadar eğitim barından önce trend tahminine düşülür
+}
+
+# Sinyal geçmişi (append-only, gün parçalı)
+SIGNAL_HISTORY_CONFIG = {
+    'enabled': True,
+    'full_resolution_days': 7,     # Bu kadar gün her döngünün satırı tutulur
+    'downsample_seconds': 3600,    # Daha eskisi kova başına (saatlik) son satıra seyreltilir
+    'retention_days': 365,         # Daha eski günler silinir
+    'retention_interval_hours': 24
+}
+
+# Piyasa takvimi (kapalı piyasada yenileme atlanır)
+MARKET_CALENDAR_CONFIG = {
+    'enabled': True,
+    'post_close_delay': 120       # Kapanıştan bu kadar sonra tek son yenileme (son bar oturur)
+}
+
+# Öncelikli yenileme zamanlayıcısı (worker - sembol başına yenileme aralığı)
+SCHEDULER_CONFIG = {
+    'enabled': True,
+    'base_interval': 300,         # Değer=1 olan sembolün yenileme aralığı (saniye)
+    'min_interval': 60,           # En sık yenileme (worker döngüsü kadar)
+    'max_interval': 3600,         # En seyrek yenileme
+    'watcher_weight': 1.0,        # log(1 + watchlist sayısı) katsayısı
+    'volatility_weight': 1.0,     # ATR/fiyat katsayısı
+    'volatility_reference': 0.002,  # Bu ATR/fiyat oranı 1 puan sayılır (1m barlar)
+    'volatility_cap': 3.0,        # Volatilite puanı üst sınırı
+    'signal_change_weight': 2.0,  # Sinyal değişim oranı katsayısı
+    'signal_change_smoothing': 0.2,  # Sinyal değişim EWMA katsayısı
+    'max_backoff': 1800,          # Hata sonrası en uzun bekleme
+    'cycle_seconds': 60,          # Döngü başına API bütçesi bu süreye göre hesaplanır
+    'default_calls_per_symbol': 3  # İlk döngüde sembol başına tahmini API çağrısı
+}
+
+# Aşama profilleme (analyze_symbol 'timings' + worker döngü özeti)
+PROFILING_CONFIG = {
+    'enabled': False,             # Kapalıyken ek maliyet ihmal edilebilir
+    'slowest_symbols': 5          # Döngü özetinde listelenen en yavaş sembol sayısı
+}
+
+# Çok süreçli / çok dyno'lu worker: semboller DB lease'leriyle paylaştırılır
+SHARDING_CONFIG = {
+    'enabled': True,              # Tek worker'da da zararsız - tüm semboller ona düşer
+    'lease_seconds': 600,         # Heartbeat ve sembol lease süresi - ölen worker'ın sembolleri en geç bu kadar sonra devralınır
+    'virtual_nodes': 64           # Worker başına hash halkası noktası (dağılım dengesi)
+}
@@ -0,0 +1,90 @@
+"""
+🧵 Alpha Vantage Trading Framework - Paylaşılan Korelasyon Bar Kuyrukları
+Sharding'de her worker'ın bar piramitleri sadece kendi sembollerinin yeni barlarını görür;
+kayan korelasyon motoru ise lider worker'da tüm evren üzerinde çalışır. Kuyruklar bu
+yüzden veritabanından paylaşılır (CorrelationBar):
+
+- Yazım: her worker döngü sonunda işlediği sembollerin 15m kapanışlarını, tablodaki son
+  barından itibaren upsert eder (oluşmakta olan son bar sonraki döngüde yeniden yazılır)
+- Okuma: lider motorun last_timestamp'indeki ya da ondan önceki son bardan itibaren -
+  sembol başına tek sorguda (ilk getiri hesaplanabilsin, kısa boşluk tam hesaba düşmez)
+- Retention: motorun son satırından bar_store_hours'tan eskisi silinir
+
+Zamanlar naive epoch saniyedir (provider frame'leri gibi); tz'li index UTC'ye çevrilir.
+"""
+
+import logging
+from typing import Dict, Iterable
+
+import pandas as pd
+from sqlalchemy import delete, func, select
+
+from bulk_upsert import upsert_rows
+from web_app import CorrelationBar
+
+logger = logging.getLogger(__name__)
+
+
+def _epoch_seconds(index: pd.DatetimeIndex):
+    index = pd.DatetimeIndex(index)
+    if index.tz is not None:
+        index = index.tz_convert('UTC').tz_localize(None)
+    return (index - pd.Timestamp(0)) // pd.Timedelta(seconds=1)
+
+
+def _to_epoch(timestamp: pd.Timestamp) -> int:
+    return int(_epoch_seconds(pd.DatetimeIndex([timestamp]))[0])
+
+
+def save_bars(session, closes: Dict[str, pd.Series], keep: pd.Timedelta) -> int:
+    """
+    Sembol başına kapanış serilerini yazar: tablodaki son bardan (dahil) sonrası; tabloda hiç
+    barı olmayan sembolün son `keep` süresi. Commit çağıranın işidir.
+    Returns: Yazılan satır sayısı
+    """
+    closes = {symbol: series for symbol, series in closes.items() if len(series)}
+    if not closes:
+        return 0
+    table = CorrelationBar.__table__
+    latest = dict(session.execute(select(table.c.symbol, func.max(table.c.ts))
+                                  .where(table.c.symbol.in_(list(closes)))
+                                  .group_by(table.c.symbol)).all())
+    rows = []
+    for symbol, series in closes.items():
+        times = _epoch_seconds(series.index).to_numpy()
+        start = latest.get(symbol, int(times[-1]) - int(keep.total_seconds()))
+        new = times >= start
+        rows.extend({'symbol': symbol, 'ts': int(ts), 'close': float(close)}
+                    for ts, close in zip(times[new], series.to_numpy(dtype=float)[new]))
+    upsert_rows(session, table, rows, key=('symbol', 'ts'))
+    return len(rows)
+
+
+def load_bars(session, symbols: Iterable[str], since: pd.Timestamp) -> Dict[str, pd.Series]:
+    """
+    Sembol başına `since`teki ya da ondan önceki son bardan itibaren kapanışlar (tek sorgu).
+    Tabloda since'ten önce barı olmayan sembolün tüm barları döner; hiç barı yoksa boş seri.
+    """
+    symbols = list(symbols)
+    table = CorrelationBar.__table__
+    since_ts = _to_epoch(since)
+    anchors = (select(table.c.symbol, func.max(table.c.ts).label('anchor'))
+               .where(table.c.symbol.in_(symbols), table.c.ts <= since_ts)
+               .group_by(table.c.symbol).subquery())
+    rows = session.execute(
+        select(table.c.symbol, table.c.ts, table.c.close)
+        .outerjoin(anchors, anchors.c.symbol == table.c.symbol)
+        .where(table.c.symbol.in_(symbols), table.c.ts >= func.coalesce(anchors.c.anchor, since_ts + 1))
+        .order_by(table.c.symbol, table.c.ts)).all()
+    frame = pd.DataFrame(rows, columns=['symbol', 'ts', 'close'])
+    bars = {symbol: pd.Series(group['close'].to_numpy(), index=pd.to_datetime(group['ts'].to_numpy(), unit='s'))
+            for symbol, group in frame.groupby('symbol', sort=False)}
+    return {symbol: bars.get(symbol, pd.Series(dtype=float)) for symbol in symbols}
+
+
+def prune_bars(session, before: pd.Timestamp) -> int:
+    """`before`dan eski barları siler (commit dahil). Returns: Silinen satır sayısı"""
+    table = CorrelationBar.__table__
+    deleted = session.execute(delete(table).where(table.c.ts < _to_epoch(before))).rowcount
+    session.commit()
+    return deleted
@@ -0,0 +1,204 @@
+"""
+🧊 Alpha Vantage Trading Framework - İkili Korelasyon Snapshot'ı
+Korelasyon matrisi N²/2 ORM satırı yerine tek sürümlü ikili artefakt olarak saklanır:
+float32 N×N matris + sembol dizini (npz) -> CorrelationSnapshot tablosunda tek BLOB satırı.
+Büyük evrende (bloklu hesap, snapshot_matrix_max_symbols üstü) matris saklanmaz, sadece
+komşu indeksi yazılır.
+
+- Yazım: tek INSERT (yeni sürüm) + eski sürümlerin silinmesi, aynı transaction'da
+  (okuyucu ya eski ya yeni sürümü görür - yarım matris yok)
+- Okuma: süreç başına sürüm cache'i; en yüksek sürüm numarası en fazla
+  snapshot_check_seconds'ta bir sorgulanır, sadece değiştiyse BLOB yüklenir
+- "X'in eşik üstü partnerleri" snapshot'la birlikte kurulan komşu indeksinden O(k)
+  (top-k pozitif / negatif partner), indeks yoksa matris satırının dilimi
+"""
+
+import io
+import logging
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import delete, func, select
+from sqlalchemy.exc import IntegrityError
+
+from constants import CORRELATION_CONFIG
+from neighbor_index import NeighborIndex
+from web_app import CorrelationSnapshot
+
+logger = logging.getLogger(__name__)
+
+
+class CorrelationMatrix:
+    """
+    Yüklenmiş snapshot - salt okunur float32 matris, sembol -> satır dizini ve komşu indeksi.
+    matrix None olabilir (sadece komşu indeksi): değerler ve çift özetleri indeksten gelir.
+    """
+
+    def __init__(self, symbols: List[str], matrix: Optional[np.ndarray], version: int = 0,
+                 neighbors: NeighborIndex = None):
+        self.version = version
+        self.symbols = list(symbols)
+        self.index = {symbol: position for position, symbol in enumerate(self.symbols)}
+        self.matrix = None
+        if matrix is not None:
+            self.matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+            self.matrix.flags.writeable = False
+        self.neighbors = neighbors
+
+    @classmethod
+    def from_frame(cls, frame: pd.DataFrame, version: int = 0) -> 'CorrelationMatrix':
+        symbols, matrix = list(frame.columns), frame.to_numpy(dtype=np.float32)
+        neighbors = NeighborIndex.from_matrix(symbols, matrix, CORRELATION_CONFIG['neighbor_k'])
+        return cls(symbols, matrix, version, neighbors)
+
+    @classmethod
+    def decode(cls, data: bytes, version: int = 0) -> 'CorrelationMatrix':
+        with np.load(io.BytesIO(data), allow_pickle=False) as archive:
+            symbols = archive['symbols'].tolist()
+            neighbors = NeighborIndex.from_arrays(symbols, archive) \
+                if 'neighbor_positive_index' in archive.files else None
+            matrix = archive['matrix'] if 'matrix' in archive.files else None
+            return cls(symbols, matrix, version, neighbors)
+
+    def encode(self) -> bytes:
+        buffer = io.BytesIO()
+        arrays = self.neighbors.to_arrays() if self.neighbors is not None else {}
+        if self.matrix is not None:
+            arrays['matrix'] = self.matrix
+        np.savez(buffer, symbols=np.array(self.symbols, dtype=str), **arrays)
+        return buffer.getvalue()
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    def value(self, symbol_1: str, symbol_2: str) -> Optional[float]:
+        if self.matrix is None:
+            # Sadece komşu indeksi: çift top-k içindeyse bilinir
+            return dict(self.neighbors.partners(symbol_1) if self.neighbors else []).get(symbol_2)
+        first, second = self.index.get(symbol_1), self.index.get(symbol_2)
+        if first is None or second is None or not np.isfinite(self.matrix[first, second]):
+            return None
+        return float(self.matrix[first, second])
+
+    def partners(self, symbol: str, threshold: float = None) -> List[Tuple[str, float]]:
+        """
+        |ρ| >= eşik olan partnerler, güçlüden zayıfa - komşu indeksinden O(k)
+        (en güçlü k pozitif + k negatif), indeks yoksa satır dilimi üzerinde vektörel
+        """
+        threshold = CORRELATION_CONFIG['correlation_threshold'] if threshold is None else threshold
+        if self.neighbors is not None:
+            return self.neighbors.partners(symbol, threshold)
+        position = self.index.get(symbol)
+        if position is None:
+            return []
+        row = self.matrix[position]
+        with np.errstate(invalid='ignore'):
+            hits = np.flatnonzero(np.abs(row) >= threshold)
+        hits = hits[hits != position]
+        hits = hits[np.argsort(-np.abs(row[hits]), kind='stable')]
+        return [(self.symbols[other], float(row[other])) for other in hits]
+
+    def significant_pairs(self, threshold: float = None) -> int:
+        """Eşik üstü benzersiz çift sayısı (üst üçgen; matris yoksa komşu indeksindeki çiftler)"""
+        threshold = CORRELATION_CONFIG['correlation_threshold'] if threshold is None else threshold
+        if self.matrix is None:
+            return len(self._neighbor_pairs(threshold))
+        with np.errstate(invalid='ignore'):
+            return int(np.count_nonzero(np.triu(np.abs(self.matrix) >= threshold, k=1)))
+
+    def top_pairs(self, limit: int = 5) -> List[Tuple[str, str, float]]:
+        """En yüksek korelasyonlu çiftler (üst üçgen)"""
+        if self.matrix is None:
+            pairs = self._neighbor_pairs(-np.inf)
+            return sorted(((a, b, value) for (a, b), value in pairs.items()), key=lambda pair: -pair[2])[:limit]
+        first, second = np.triu_indices(len(self.symbols), k=1)
+        values = self.matrix[first, second]
+        order = np.argsort(np.where(np.isfinite(values), -values, np.inf), kind='stable')[:limit]
+        return [(self.symbols[first[i]], self.symbols[second[i]], float(values[i]))
+                for i in order if np.isfinite(values[i])]
+
+    def _neighbor_pairs(self, threshold: float) -> Dict[Tuple[str, str], float]:
+        """Komşu indeksindeki benzersiz çiftler (sıralı sembol çifti -> ρ)"""
+        pairs = {}
+        for symbol in (self.symbols if self.neighbors is not None else []):
+            for other, value in self.neighbors.partners(symbol, threshold):
+                pairs[tuple(sorted((symbol, other)))] = value
+        return pairs
+
+
+def save_snapshot(session, frame) -> CorrelationMatrix:
+    """
+    Matrisi (DataFrame ya da hazır CorrelationMatrix) yeni sürüm olarak yazar ve
+    snapshot_keep_versions'tan eskilerini siler - tek commit.
+    Yazan süreçte okuyucu cache'i de yeni sürüme geçer (yeniden yükleme yok).
+    Aynı sürümü eşzamanlı yazan başka süreç varsa (unique version) sonraki sürümle yeniden denenir.
+    """
+    snapshot = frame if isinstance(frame, CorrelationMatrix) else CorrelationMatrix.from_frame(frame)
+    data = snapshot.encode()
+    for attempt in range(3):
+        snapshot.version = (session.execute(select(func.max(CorrelationSnapshot.version))).scalar() or 0) + 1
+        try:
+            session.execute(CorrelationSnapshot.__table__.insert().values(
+                version=snapshot.version, symbol_count=len(snapshot), data=data))
+            session.execute(delete(CorrelationSnapshot).where(
+                CorrelationSnapshot.version <= snapshot.version - CORRELATION_CONFIG['snapshot_keep_versions']))
+            session.commit()
+            break
+        except IntegrityError:
+            session.rollback()
+            if attempt == 2:
+                raise
+            logger.warning(f"⚠️ Korelasyon snapshot v{snapshot.version} başka süreçte yazıldı - yeniden deneniyor")
+    _reader.publish(snapshot)
+    return snapshot
+
+
+class _SnapshotReader:
+    """Süreç başına snapshot cache'i - sürüm değişmedikçe BLOB yeniden okunmaz"""
+
+    def __init__(self):
+        self.snapshot: Optional[CorrelationMatrix] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def publish(self, snapshot: CorrelationMatrix):
+        with self._lock:
+            self.snapshot = snapshot
+            self._checked_at = time.monotonic()
+
+    def get(self, session) -> Optional[CorrelationMatrix]:
+        with self._lock:
+            if time.monotonic() - self._checked_at < CORRELATION_CONFIG['snapshot_check_seconds']:
+                return self.snapshot
+            self._checked_at = time.monotonic()
+            latest = session.execute(select(func.max(CorrelationSnapshot.version))).scalar()
+            if latest is None or (self.snapshot is not None and self.snapshot.version == latest):
+                return self.snapshot
+            data = session.execute(select(CorrelationSnapshot.data)
+                                   .where(CorrelationSnapshot.version == latest)).scalar()
+            if data is not None:
+                self.snapshot = CorrelationMatrix.decode(data, latest)
+                logger.debug(f"🧊 Korelasyon snapshot v{latest} yüklendi ({len(self.snapshot)} sembol)")
+            return self.snapshot
+
+    def get_stats(self) -> Dict:
+        snapshot = self.snapshot
+        return {
+            'version': snapshot.version if snapshot else None,
+            'symbols': len(snapshot) if snapshot else 0
+        }
+
+
+_reader = _SnapshotReader()
+
+
+def load_snapshot(session) -> Optional[CorrelationMatrix]:
+    """Güncel korelasyon snapshot'ı (süreç cache'inden; henüz hesaplanmadıysa None)"""
+    return _reader.get(session)
+
+
+def get_reader_stats() -> Dict:
+    return _reader.get_stats()
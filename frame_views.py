@@ -0,0 +1,46 @@
+"""
+🔒 Alpha Vantage Trading Framework - Salt Okunur Frame Yardımcıları
+Cache'lerde paylaşılan DataFrame'lerin tüketiciler tarafından bozulmasını önler.
+
+- freeze_frame: Veriyi bir kez salt okunur NumPy dizilerine taşır (cache'e yazarken)
+- readonly_view: Aynı tamponları paylaşan yeni bir frame kabı döndürür (kopya yok)
+- overlay_frame: Türetilmiş kolonları ayrı bir katman olarak salt okunur tabanın üstüne ekler
+"""
+
+from typing import Dict
+
+import pandas as pd
+
+
+def freeze_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Her kolonu salt okunur bir diziye kopyalar - cache'e yazarken bir kez çağrılır"""
+    columns = {}
+    for column in df.columns:
+        values = df[column].to_numpy(copy=True)
+        values.flags.writeable = False
+        columns[column] = values
+    # copy=False: diziler konsolide edilmez, salt okunur bayrağı korunur
+    return pd.DataFrame(columns, index=df.index, columns=df.columns, copy=False)
+
+
+def readonly_view(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Donmuş bir frame için yeni kap döndürür (veri kopyalanmaz).
+
+    Tüketicinin eklediği kolonlar sadece bu kapta kalır; paylaşılan tamponlara
+    yerinde yazma denemesi hata verir (veya Copy-on-Write ile kopyalanır).
+    """
+    return df.copy(deep=False)
+
+
+def overlay_frame(base: pd.DataFrame, derived: Dict[str, pd.Series]) -> pd.DataFrame:
+    """
+    Taban frame + türetilmiş kolon katmanı.
+
+    Taban kolonları kopyalanmaz; türetilmiş kolonlar sadece dönen kapta yaşar,
+    böylece aynı cache girdisini okuyan diğer tüketiciler etkilenmez.
+    """
+    view = readonly_view(base)
+    for column, values in derived.items():
+        view[column] = values
+    return view
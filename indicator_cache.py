@@ -0,0 +1,79 @@
+"""
+🧮 Alpha Vantage Trading Framework - İndikatör Frame Cache'i
+(sembol, periyot, son bar zamanı, bar sayısı) anahtarıyla hesaplanmış
+indikatör frame'lerini saklar. Değişmemiş veri için tekrar analiz tek bir
+sözlük okumasına iner.
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+import pandas as pd
+
+from constants import STREAMING_CONFIG
+from frame_views import freeze_frame, readonly_view
+from profiling import count
+
+
+class IndicatorCache:
+    """LRU indikatör frame cache'i - döndürülen frame'ler salt okunurdur"""
+
+    def __init__(self, max_entries: int = None):
+        self.max_entries = max_entries or STREAMING_CONFIG['indicator_cache_size']
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self.logger = logging.getLogger(__name__)
+
+    @staticmethod
+    def make_key(symbol: str, interval: str, df: pd.DataFrame) -> Optional[tuple]:
+        """Cache anahtarı - boş frame için None"""
+        if df is None or df.empty:
+            return None
+        return (symbol, interval, df.index[-1], len(df))
+
+    def get(self, key: tuple) -> Optional[pd.DataFrame]:
+        if key is None:
+            return None
+        with self._lock:
+            frame = self.entries.get(key)
+            if frame is None:
+                self.misses += 1
+                count('cache_misses')
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+        count('cache_hits')
+        return readonly_view(frame)
+
+    def put(self, key: tuple, frame: pd.DataFrame) -> pd.DataFrame:
+        """Frame'i dondurup saklar ve salt okunur görünümünü döndürür"""
+        frozen = freeze_frame(frame)
+        if key is None:
+            return readonly_view(frozen)
+        with self._lock:
+            # Aynı sembol/periyot için eski son bara ait girdiler artık kullanılmaz
+            stale = [k for k in self.entries if k[:2] == key[:2] and k[2] != key[2]]
+            for stale_key in stale:
+                del self.entries[stale_key]
+            self.entries[key] = frozen
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        return readonly_view(frozen)
+
+    def clear(self):
+        with self._lock:
+            self.entries.clear()
+
+    def get_stats(self) -> Dict:
+        total = self.hits + self.misses
+        return {
+            'entries': len(self.entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / total, 3) if total else 0.0
+        }
@@ -0,0 +1,177 @@
+"""
+🕸️ Alpha Vantage Trading Framework - Bağımlılık Çözümlemeli İndikatörler
+Her indikatör, girdileri ve çıktıları olan isimli bir düğümdür. Tüketici
+sadece ihtiyaç duyduğu çıktıları ister; o çıktılar ve girdileri bir kez
+hesaplanıp paylaşılır. Yeni indikatörler mevcut çağıranlara maliyet eklemez.
+"""
+
+import logging
+from typing import Callable, Dict, Iterable, List
+
+import numpy as np
+import pandas as pd
+import ta
+
+
+class IndicatorNode:
+    """Tek bir hesaplama adımı: girdi kolonları -> çıktı kolonları"""
+
+    def __init__(self, name: str, outputs: List[str], inputs: List[str],
+                 func: Callable[[Dict[str, pd.Series]], Dict[str, pd.Series]]):
+        self.name = name
+        self.outputs = list(outputs)
+        self.inputs = list(inputs)
+        self.func = func
+
+    def __repr__(self):
+        return f'<IndicatorNode {self.name}: {self.inputs} -> {self.outputs}>'
+
+
+class IndicatorGraph:
+    """İndikatör düğümleri kaydı ve bağımlılık çözümleyici"""
+
+    def __init__(self):
+        self.nodes: Dict[str, IndicatorNode] = {}
+        self.producers: Dict[str, IndicatorNode] = {}  # çıktı kolonu -> düğüm
+        self.logger = logging.getLogger(__name__)
+
+    def register(self, node: IndicatorNode) -> IndicatorNode:
+        for output in node.outputs:
+            if output in self.producers and self.producers[output].name != node.name:
+                raise ValueError(f"{output} zaten {self.producers[output].name} tarafından üretiliyor")
+        self.nodes[node.name] = node
+        for output in node.outputs:
+            self.producers[output] = node
+        return node
+
+    def node(self, name: str, outputs: List[str], inputs: List[str]):
+        """Dekoratör: @graph.node('RSI', ['RSI'], ['Close'])"""
+        def decorator(func):
+            self.register(IndicatorNode(name, outputs, inputs, func))
+            return func
+        return decorator
+
+    @property
+    def outputs(self) -> List[str]:
+        return list(self.producers)
+
+    def resolve(self, outputs: Iterable[str], available: Iterable[str] = ()) -> List[IndicatorNode]:
+        """İstenen çıktılar için gereken düğümleri bağımlılık sırasıyla döndürür"""
+        available = set(available)
+        ordered: List[IndicatorNode] = []
+        visited = set()
+        visiting = set()
+
+        def visit(column: str):
+            if column in available:
+                return
+            node = self.producers.get(column)
+            if node is None:
+                return  # Taban kolon eksik (ör. forex'te Volume yok) - compute atlar
+            if node.name in visited:
+                return
+            if node.name in visiting:
+                raise ValueError(f"İndikatör bağımlılık döngüsü: {node.name}")
+            visiting.add(node.name)
+            for dependency in node.inputs:
+                visit(dependency)
+            visiting.discard(node.name)
+            visited.add(node.name)
+            ordered.append(node)
+
+        for output in outputs:
+            if output not in available and output not in self.producers:
+                raise KeyError(f"Bilinmeyen indikatör: {output}")
+            visit(output)
+        return ordered
+
+    def compute(self, df: pd.DataFrame, outputs: Iterable[str]) -> Dict[str, pd.Series]:
+        """
+        İstenen çıktıları (ve girdilerini) hesaplar.
+        Frame'de zaten olan kolonlar yeniden hesaplanmaz; girdisi eksik düğümler atlanır.
+        """
+        values: Dict[str, pd.Series] = {}
+        for node in self.resolve(outputs, df.columns):
+            missing = [c for c in node.inputs if c not in values and c not in df.columns]
+            if missing:
+                self.logger.debug(f"{node.name} atlandı - eksik girdi: {missing}")
+                continue
+            source = {c: values[c] if c in values else df[c] for c in node.inputs}
+            try:
+                values.update(node.func(source))
+            except Exception as e:
+                self.logger.error(f"İndikatör hesaplama hatası ({node.name}): {e}")
+        return values
+
+
+def wilder_atr(high: pd.Series, low: pd.Series, close: pd.Series, window: int = 14) -> pd.Series:
+    """
+    Vektörel Wilder ATR - `ta.volatility.AverageTrueRange` ile aynı tanım
+    (ilk window-1 bar 0, window'uncu bar ilk TR'lerin ortalaması), ama bar başına
+    Python döngüsü yerine EWM ile; yıllarca barlık backtest'lerde ta'dan çok daha hızlı.
+    """
+    if len(close) < window:
+        raise ValueError(f"ATR için en az {window} bar gerekli ({len(close)} var)")
+    prev_close = close.shift(1)
+    true_range = pd.concat([high - low, (high - prev_close).abs(), (low - prev_close).abs()],
+                           axis=1).max(axis=1).to_numpy(dtype=float)
+
+    seeded = true_range[window - 1:].copy()
+    seeded[0] = true_range[:window].mean()
+    smoothed = pd.Series(seeded).ewm(alpha=1.0 / window, adjust=False).mean().to_numpy()
+
+    atr = np.zeros(len(close))
+    atr[window - 1:] = smoothed
+    return pd.Series(atr, index=close.index)
+
+
+def build_default_graph() -> IndicatorGraph:
+    """TechnicalAnalyzer'ın standart indikatörleri"""
+    graph = IndicatorGraph()
+
+    # Hareketli ortalamalar
+    for window in (5, 13, 50, 200):
+        graph.register(IndicatorNode(
+            f'EMA_{window}', [f'EMA_{window}'], ['Close'],
+            lambda src, w=window: {f'EMA_{w}': ta.trend.EMAIndicator(close=src['Close'], window=w).ema_indicator()}
+        ))
+
+    # MACD - sinyal hattı MACD'nin 9'luk EMA'sı (ta.trend.MACD ile aynı formül)
+    @graph.node('MACD', ['MACD'], ['Close'])
+    def _macd(src):
+        return {'MACD': ta.trend.MACD(close=src['Close']).macd()}
+
+    @graph.node('MACD_Signal', ['MACD_Signal'], ['MACD'])
+    def _macd_signal(src):
+        return {'MACD_Signal': ta.trend.EMAIndicator(close=src['MACD'], window=9).ema_indicator()}
+
+    # RSI
+    @graph.node('RSI', ['RSI'], ['Close'])
+    def _rsi(src):
+        return {'RSI': ta.momentum.RSIIndicator(close=src['Close'], window=14).rsi()}
+
+    # Bollinger Bantları
+    @graph.node('Bollinger', ['BB_Upper', 'BB_Lower', 'BB_Middle'], ['Close'])
+    def _bollinger(src):
+        bb = ta.volatility.BollingerBands(close=src['Close'])
+        return {
+            'BB_Upper': bb.bollinger_hband(),
+            'BB_Lower': bb.bollinger_lband(),
+            'BB_Middle': bb.bollinger_mavg()
+        }
+
+    # ATR (Average True Range)
+    @graph.node('ATR', ['ATR'], ['High', 'Low', 'Close'])
+    def _atr(src):
+        return {'ATR': wilder_atr(src['High'], src['Low'], src['Close'], window=14)}
+
+    # Volume indikatörleri
+    @graph.node('Volume_SMA', ['Volume_SMA'], ['Volume'])
+    def _volume_sma(src):
+        return {'Volume_SMA': src['Volume'].rolling(window=20).mean()}
+
+    return graph
+
+
+# Paylaşılan varsayılan graf - yeni indikatörler buraya register edilebilir
+DEFAULT_INDICATOR_GRAPH = build_default_graph()
@@ -0,0 +1,222 @@
+"""
+📅 Alpha Vantage Trading Framework - Piyasa Takvimi
+Varlık sınıfı başına işlem seansları önceden epoch saniye aralıklarına çevrilir;
+"şu an açık mı / sonraki açılış / son kapanış" sorguları ikili arama ile yapılır.
+
+- NYSE/NASDAQ: 09:30-16:00 New York, yarım günler 13:00 kapanış, resmi tatiller
+- Forex: Pazar 17:00 - Cuma 17:00 New York (hafta sonu kapalı)
+- Kripto: 7/24 açık
+
+Worker zamanlayıcısı ve provider kapalı piyasada yenilemeyi atlar; kapanıştan
+sonra (post_close_delay kadar bekleyip) tek bir son yenileme yapılır.
+"""
+
+import bisect
+import threading
+import time
+from datetime import date, datetime, timedelta
+from typing import Dict, Optional
+from zoneinfo import ZoneInfo
+
+from constants import MARKET_CALENDAR_CONFIG
+
+NEW_YORK = ZoneInfo('America/New_York')
+
+
+def _easter(year: int) -> date:
+    """Gregoryen Paskalya tarihi (anonim algoritma)"""
+    a, b, c = year % 19, year // 100, year % 100
+    d, e = b // 4, b % 4
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = c // 4, c % 4
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month = (h + l - 7 * m + 114) // 31
+    day = (h + l - 7 * m + 114) % 31 + 1
+    return date(year, month, day)
+
+
+def _nth_weekday(year: int, month: int, weekday: int, n: int) -> date:
+    """Ayın n. `weekday` günü (n=-1 -> son)"""
+    if n > 0:
+        first = date(year, month, 1)
+        return first + timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+    last = date(year + (month == 12), month % 12 + 1, 1) - timedelta(days=1)
+    return last - timedelta(days=(last.weekday() - weekday) % 7)
+
+
+def _observed(day: date) -> date:
+    """Cumartesi -> Cuma, Pazar -> Pazartesi"""
+    if day.weekday() == 5:
+        return day - timedelta(days=1)
+    if day.weekday() == 6:
+        return day + timedelta(days=1)
+    return day
+
+
+def nyse_holidays(year: int) -> set:
+    """NYSE/NASDAQ tam gün tatilleri"""
+    holidays = {
+        _nth_weekday(year, 1, 0, 3),          # Martin Luther King Jr. Day
+        _nth_weekday(year, 2, 0, 3),          # Washington's Birthday
+        _easter(year) - timedelta(days=2),    # Good Friday
+        _nth_weekday(year, 5, 0, -1),         # Memorial Day
+        _observed(date(year, 7, 4)),          # Independence Day
+        _nth_weekday(year, 9, 0, 1),          # Labor Day
+        _nth_weekday(year, 11, 3, 4),         # Thanksgiving
+        _observed(date(year, 12, 25)),        # Christmas
+    }
+    # Yılbaşı Cumartesiye denk gelirse önceki Cuma telafi edilmez (NYSE kuralı)
+    new_year = date(year, 1, 1)
+    if new_year.weekday() != 5:
+        holidays.add(_observed(new_year))
+    if year >= 2022:
+        holidays.add(_observed(date(year, 6, 19)))  # Juneteenth
+    return holidays
+
+
+def nyse_half_days(year: int) -> set:
+    """13:00'te kapanan günler"""
+    half_days = {_nth_weekday(year, 11, 3, 4) + timedelta(days=1)}  # Şükran Günü ertesi
+    if date(year, 7, 4).weekday() in (1, 2, 3, 4):
+        half_days.add(date(year, 7, 3))
+    if date(year, 12, 24).weekday() in (0, 1, 2, 3):
+        half_days.add(date(year, 12, 24))
+    return half_days
+
+
+def _epoch(day: date, hour: int, minute: int = 0) -> float:
+    return datetime(day.year, day.month, day.day, hour, minute, tzinfo=NEW_YORK).timestamp()
+
+
+class SessionCalendar:
+    """Sıralı (açılış, kapanış) epoch aralıkları üzerinde sorgular"""
+
+    def __init__(self, name: str, builder=None):
+        self.name = name
+        self._builder = builder      # year -> [(open, close), ...]; None -> 7/24 açık
+        # (açılışlar, kapanışlar, (ilk yıl, son yıl)) - tek atamayla değiştirilir
+        self._sessions = ([], [], (0, -1))
+        self._lock = threading.Lock()
+
+    @property
+    def always_open(self) -> bool:
+        return self._builder is None
+
+    def _lookup(self, timestamp: float) -> tuple:
+        """Sorgu zamanını kapsayan (önceki yıl .. 2 yıl sonrası) aralıklar ve son açılış indeksi"""
+        opens, closes, (first_year, last_year) = self._sessions
+        year = datetime.fromtimestamp(timestamp, NEW_YORK).year
+        if not first_year < year < last_year:
+            with self._lock:
+                sessions = sorted(session for build_year in range(year - 1, year + 3)
+                                  for session in self._builder(build_year))
+                opens = [start for start, _ in sessions]
+                closes = [end for _, end in sessions]
+                self._sessions = (opens, closes, (year - 1, year + 2))
+        return opens, closes, bisect.bisect_right(opens, timestamp) - 1
+
+    def is_open(self, timestamp: float = None) -> bool:
+        if self.always_open:
+            return True
+        timestamp = time.time() if timestamp is None else timestamp
+        _, closes, index = self._lookup(timestamp)
+        return index >= 0 and timestamp < closes[index]
+
+    def next_open(self, timestamp: float = None) -> float:
+        """Açıksa timestamp, değilse sonraki seans açılışı"""
+        timestamp = time.time() if timestamp is None else timestamp
+        if self.always_open:
+            return timestamp
+        opens, closes, index = self._lookup(timestamp)
+        if index >= 0 and timestamp < closes[index]:
+            return timestamp
+        return opens[index + 1]
+
+    def previous_close(self, timestamp: float = None) -> Optional[float]:
+        """timestamp'ten önceki son kapanış (açık seans içindeyse bir önceki seansın)"""
+        if self.always_open:
+            return None
+        timestamp = time.time() if timestamp is None else timestamp
+        _, closes, index = self._lookup(timestamp)
+        if index >= 0 and timestamp < closes[index]:
+            index -= 1
+        return closes[index] if index >= 0 else None
+
+    def unchanged_since(self, fetched_at: float, now: float = None) -> bool:
+        """
+        Veri `fetched_at`'ten beri değişmiş olamaz mı: piyasa şu an kapalı ve veri son
+        kapanıştan (post_close_delay sonrası) sonra çekilmiş
+        """
+        if self.always_open:
+            return False
+        now = time.time() if now is None else now
+        if self.is_open(now):
+            return False
+        close = self.previous_close(now)
+        return close is not None and fetched_at >= close + MARKET_CALENDAR_CONFIG['post_close_delay']
+
+
+def _nyse_sessions(year: int) -> list:
+    holidays, half_days = nyse_holidays(year), nyse_half_days(year)
+    sessions = []
+    day = date(year, 1, 1)
+    while day.year == year:
+        if day.weekday() < 5 and day not in holidays:
+            sessions.append((_epoch(day, 9, 30), _epoch(day, 13 if day in half_days else 16)))
+        day += timedelta(days=1)
+    return sessions
+
+
+def _forex_sessions(year: int) -> list:
+    """Haftalık seans: Pazar 17:00 -> Cuma 17:00 (yıl içinde başlayan haftalar)"""
+    sunday = date(year, 1, 1) + timedelta(days=(6 - date(year, 1, 1).weekday()) % 7)
+    sessions = []
+    while sunday.year == year:
+        sessions.append((_epoch(sunday, 17), _epoch(sunday + timedelta(days=5), 17)))
+        sunday += timedelta(days=7)
+    return sessions
+
+
+class MarketCalendar:
+    """Varlık sınıfı -> seans takvimi"""
+
+    def __init__(self):
+        self.calendars: Dict[str, SessionCalendar] = {
+            'stocks': SessionCalendar('NYSE', _nyse_sessions),
+            'forex': SessionCalendar('FX', _forex_sessions),
+            'crypto': SessionCalendar('24/7')
+        }
+
+    def for_asset(self, asset_type) -> SessionCalendar:
+        """AssetType, 'stocks'/'stock', 'forex', 'crypto' kabul eder (bilinmeyen -> 7/24)"""
+        name = getattr(asset_type, 'value', asset_type)
+        name = {'stock': 'stocks'}.get(name, name)
+        return self.calendars.get(name, self.calendars['crypto'])
+
+    def is_open(self, asset_type, timestamp: float = None) -> bool:
+        return self.for_asset(asset_type).is_open(timestamp)
+
+    def get_status(self, now: float = None) -> Dict:
+        now = time.time() if now is None else now
+        return {
+            name: {
+                'open': calendar.is_open(now),
+                'next_open': None if calendar.always_open else datetime.fromtimestamp(
+                    calendar.next_open(now), NEW_YORK).isoformat()
+            }
+            for name, calendar in self.calendars.items()
+        }
+
+
+_default_calendar = None
+
+
+def get_market_calendar() -> MarketCalendar:
+    """Süreç başına tek takvim (seans aralıkları bir kez hesaplanır)"""
+    global _default_calendar
+    if _default_calendar is None:
+        _default_calendar = MarketCalendar()
+    return _default_calendar
@@ -0,0 +1,106 @@
+"""
+🧭 Alpha Vantage Trading Framework - Korelasyon Komşu İndeksi
+Sembol başına en güçlü k pozitif ve k negatif korelasyonlu partner sabit boyutlu
+dizilerde tutulur (N×k indeks + N×k katsayı). Korelasyon sinyali partner aramak için
+matris satırını taramaz: evren büyüklüğünden bağımsız O(k).
+
+Matris parça parça (blok) birleştirilebilir: her blok mevcut top-k ile
+argpartition üzerinden birleşir - tam N×N matrisin bellekte olması gerekmez.
+"""
+
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+# merge() satırları bu büyüklükte parçalarla işler: aday dizileri (skor, indeks, argpartition)
+# blok boyutunda değil MERGE_ROWS x (kolon + k) boyutunda kalır
+MERGE_ROWS = 256
+
+
+class NeighborIndex:
+    """Sembol -> top-k pozitif / negatif partner (indeks -1 ve NaN katsayı = boş slot)"""
+
+    def __init__(self, symbols: List[str], k: int):
+        self.symbols = list(symbols)
+        self.index = {symbol: position for position, symbol in enumerate(self.symbols)}
+        self.k = max(0, min(k, len(self.symbols) - 1))
+        shape = (len(self.symbols), self.k)
+        self.positive_index = np.full(shape, -1, dtype=np.int32)
+        self.positive_value = np.full(shape, np.nan, dtype=np.float32)
+        self.negative_index = np.full(shape, -1, dtype=np.int32)
+        self.negative_value = np.full(shape, np.nan, dtype=np.float32)
+
+    @classmethod
+    def from_matrix(cls, symbols: List[str], matrix: np.ndarray, k: int) -> 'NeighborIndex':
+        index = cls(symbols, k)
+        index.merge(0, 0, matrix)
+        return index
+
+    def _merge_side(self, rows: np.ndarray, columns: np.ndarray, scores: np.ndarray,
+                    index: np.ndarray, value: np.ndarray, sign: float):
+        """Tek yön (sign=1 pozitif, -1 negatif): skor = sign*ρ, büyük olan güçlü"""
+        current = np.where(index[rows] >= 0, sign * value[rows], -np.inf)
+        candidate_index = np.concatenate([index[rows], np.broadcast_to(columns, scores.shape)], axis=1)
+        candidate_score = np.concatenate([current, scores], axis=1)
+        top = np.argpartition(-candidate_score, self.k - 1, axis=1)[:, :self.k]
+        top_score = np.take_along_axis(candidate_score, top, axis=1)
+        order = np.argsort(-top_score, axis=1, kind='stable')
+        top = np.take_along_axis(top, order, axis=1)
+        top_score = np.take_along_axis(top_score, order, axis=1)
+        empty = ~np.isfinite(top_score)
+        index[rows] = np.where(empty, -1, np.take_along_axis(candidate_index, top, axis=1))
+        value[rows] = np.where(empty, np.nan, sign * top_score)
+
+    def merge(self, row_start: int, column_start: int, block: np.ndarray):
+        """
+        Matris bloğunu (satırlar row_start.., kolonlar column_start..) top-k dizilerine katar.
+        Köşegen ve NaN atlanır; simetrik matriste her blok sadece kendi satırlarını günceller.
+        Ara diziler MERGE_ROWS satırlık parçalarla sınırlıdır.
+        """
+        if not self.k or not block.size:
+            return
+        columns = np.arange(column_start, column_start + block.shape[1], dtype=np.int32)
+        for start in range(0, block.shape[0], MERGE_ROWS):
+            part = np.asarray(block[start:start + MERGE_ROWS], dtype=np.float32)
+            rows = np.arange(row_start + start, row_start + start + part.shape[0])
+            valid = np.isfinite(part) & (rows[:, None] != columns[None, :])
+            self._merge_side(rows, columns, np.where(valid & (part > 0), part, -np.inf),
+                             self.positive_index, self.positive_value, 1.0)
+            self._merge_side(rows, columns, np.where(valid & (part < 0), -part, -np.inf),
+                             self.negative_index, self.negative_value, -1.0)
+
+    @staticmethod
+    def merge_bytes(columns: int, k: int) -> int:
+        """merge() çağrısının en büyük ara bellek ihtiyacı (bayt): bir satır parçası, tek yön"""
+        candidates = MERGE_ROWS * (columns + k)
+        # valid + yön maskesi (bool), skor (f32), aday indeks/skor/negatif skor (i32/f32/f32), argpartition (i64)
+        return 2 * MERGE_ROWS * columns + 4 * MERGE_ROWS * columns + candidates * (4 + 4 + 4 + 8)
+
+    def partners(self, symbol: str, threshold: float = 0.0) -> List[Tuple[str, float]]:
+        """|ρ| >= eşik olan en fazla 2k partner, güçlüden zayıfa - O(k)"""
+        position = self.index.get(symbol)
+        if position is None or not self.k:
+            return []
+        indices = np.concatenate([self.positive_index[position], self.negative_index[position]])
+        values = np.concatenate([self.positive_value[position], self.negative_value[position]])
+        keep = (indices >= 0) & (np.abs(values) >= threshold)
+        indices, values = indices[keep], values[keep]
+        order = np.argsort(-np.abs(values), kind='stable')
+        return [(self.symbols[indices[i]], float(values[i])) for i in order]
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        return {
+            'neighbor_positive_index': self.positive_index,
+            'neighbor_positive_value': self.positive_value,
+            'neighbor_negative_index': self.negative_index,
+            'neighbor_negative_value': self.negative_value
+        }
+
+    @classmethod
+    def from_arrays(cls, symbols: List[str], arrays) -> 'NeighborIndex':
+        index = cls(symbols, arrays['neighbor_positive_index'].shape[1])
+        index.positive_index = arrays['neighbor_positive_index']
+        index.positive_value = arrays['neighbor_positive_value']
+        index.negative_index = arrays['neighbor_negative_index']
+        index.negative_value = arrays['neighbor_negative_value']
+        return index
@@ -0,0 +1,220 @@
+"""
+🧠 Alpha Vantage Trading Framework - Online Tahmin Modeli
+Sembol başına recursive least squares (RLS): her yeni barda katsayılar
+O(özellik²) ile güncellenir, geçmiş büyüdükçe maliyet sabit kalır.
+
+- Özellikler: son getiriler + 10 barlık trend eğimi ve ortalamadan sapma
+- Hedef: bir sonraki barın getirisi
+- Durum JSON'a serileştirilir (indikatör durumlarının yanında saklanır)
+"""
+
+import json
+import logging
+import math
+import os
+from collections import deque
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from constants import PREDICTION_CONFIG
+from streaming_indicators import _encode_timestamp, _decode_timestamp
+
+# Özellik hesabı için gereken son kapanış sayısı
+FEATURE_BARS = 11
+RETURN_LAGS = 5
+
+
+def bar_features(closes: np.ndarray) -> np.ndarray:
+    """Son FEATURE_BARS kapanıştan ölçekten bağımsız özellik vektörü"""
+    returns = closes[1:] / closes[:-1] - 1
+    trend = closes[-10:]
+    centered_x = np.arange(10) - 4.5
+    slope = (trend @ centered_x) / (centered_x @ centered_x)
+    last = closes[-1]
+    return np.concatenate((
+        [1.0],                       # Sabit terim
+        returns[::-1][:RETURN_LAGS],  # r_t, r_t-1, ...
+        [slope / last, (last - trend.mean()) / last]
+    ))
+
+
+FEATURE_COUNT = 1 + RETURN_LAGS + 2
+
+
+class OnlineTrendModel:
+    """Tek sembol için RLS regresyonu - bar bar güncellenir"""
+
+    def __init__(self, forgetting: float = None, delta: float = None):
+        self.forgetting = forgetting or PREDICTION_CONFIG['forgetting_factor']
+        delta = delta or PREDICTION_CONFIG['initial_covariance']
+        self.weights = np.zeros(FEATURE_COUNT)
+        self.covariance = np.eye(FEATURE_COUNT) * delta
+        self.error_variance = 0.0   # Tahmin hatası karesinin EWMA'sı
+        self.updates = 0
+        self.closes = deque(maxlen=FEATURE_BARS)
+        self.pending = None          # Son barın özellikleri (hedefi bir sonraki barda gelir)
+        self.last_timestamp = None
+        self.last_close = None
+
+    def update(self, timestamp, close: float):
+        """Yeni bar: bekleyen özellikleri gerçekleşen getiriyle eğitir, sonra yeni özellikleri hazırlar"""
+        if not math.isfinite(close) or close <= 0:
+            return
+        if self.pending is not None and self.last_close:
+            self._learn(self.pending, close / self.last_close - 1)
+
+        self.closes.append(close)
+        self.pending = bar_features(np.array(self.closes)) if len(self.closes) == FEATURE_BARS else None
+        self.last_timestamp = timestamp
+        self.last_close = close
+
+    def _learn(self, x: np.ndarray, target: float):
+        """RLS adımı - O(özellik²)"""
+        error = target - self.weights @ x
+        px = self.covariance @ x
+        gain = px / (self.forgetting + x @ px)
+        self.weights = self.weights + gain * error
+        self.covariance = (self.covariance - np.outer(gain, px)) / self.forgetting
+        self.covariance = (self.covariance + self.covariance.T) / 2  # Sayısal simetri
+        alpha = PREDICTION_CONFIG['error_smoothing']
+        self.error_variance = error * error if self.updates == 0 else \
+            (1 - alpha) * self.error_variance + alpha * error * error
+        self.updates += 1
+
+    def update_frame(self, df: pd.DataFrame):
+        for timestamp, close in zip(df.index, df['Close'].to_numpy(dtype=float)):
+            self.update(timestamp, close)
+
+    def find_new_bars(self, df: pd.DataFrame) -> Optional[pd.DataFrame]:
+        """StreamingIndicators.find_new_bars ile aynı kural - boşluk/revizyonda None"""
+        if self.last_timestamp is None or df.empty or not df.index.is_monotonic_increasing:
+            return None
+        position = df.index.get_indexer([self.last_timestamp])[0]
+        if position < 0 or df['Close'].iloc[position] != self.last_close:
+            return None
+        return df.iloc[position + 1:]
+
+    def _rebuild_window(self, df: pd.DataFrame):
+        """
+        Özellik penceresini frame'in eğitilmiş kısmından (<= last_timestamp) eğitmeden kurar.
+        Revize edilen son bar yeni kapanışıyla girer; eğitilmiş kısım frame'de yoksa pencere boşalır.
+        """
+        closes = df['Close'][df.index <= self.last_timestamp].to_numpy(dtype=float)
+        closes = closes[np.isfinite(closes) & (closes > 0)]
+        self.closes.clear()
+        self.closes.extend(closes[-FEATURE_BARS:])
+        self.pending = bar_features(np.array(self.closes)) if len(self.closes) == FEATURE_BARS else None
+        self.last_close = float(closes[-1]) if len(closes) else None
+
+    def sync(self, df: pd.DataFrame):
+        """
+        Frame'deki yeni barlarla eğitir. Boşluk / son bar revizyonunda pencere eğitmeden
+        yeniden kurulur ve sadece son eğitilen bardan sonraki barlar öğrenilir
+        (katsayılar korunur, aynı bar iki kez sayılmaz).
+        """
+        new_bars = self.find_new_bars(df)
+        if new_bars is None:
+            if self.last_timestamp is None or df.empty:
+                new_bars = df
+            else:
+                self._rebuild_window(df)
+                new_bars = df[df.index > self.last_timestamp]
+        self.update_frame(new_bars)
+
+    @property
+    def ready(self) -> bool:
+        return self.pending is not None and self.updates >= PREDICTION_CONFIG['min_updates']
+
+    def predict(self, periods: int = 1) -> Tuple[float, float]:
+        """(tahmini fiyat, güven 0..1) - hazır değilse güven 0"""
+        if self.pending is None:
+            return self.last_close, 0.0
+        expected_return = float(self.weights @ self.pending)
+        predicted = self.last_close * (1 + expected_return) ** periods
+        if not self.ready or self.error_variance <= 0:
+            return predicted, 0.0
+        confidence = min(1.0, abs(expected_return) / math.sqrt(self.error_variance))
+        return predicted, confidence
+
+    def to_dict(self) -> Dict:
+        return {
+            'forgetting': self.forgetting,
+            'weights': self.weights.tolist(),
+            # Simetrik matris - sadece üst üçgen saklanır
+            'covariance': self.covariance[np.triu_indices(FEATURE_COUNT)].tolist(),
+            'error_variance': self.error_variance,
+            'updates': self.updates,
+            'closes': list(self.closes),
+            'last_timestamp': _encode_timestamp(self.last_timestamp),
+            'last_close': self.last_close
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'OnlineTrendModel':
+        model = cls(forgetting=data['forgetting'])
+        model.weights = np.array(data['weights'], dtype=float)
+        upper = np.zeros((FEATURE_COUNT, FEATURE_COUNT))
+        upper[np.triu_indices(FEATURE_COUNT)] = data['covariance']
+        model.covariance = upper + np.triu(upper, 1).T
+        model.error_variance = data['error_variance']
+        model.updates = data['updates']
+        model.closes.extend(data['closes'])
+        model.last_timestamp = _decode_timestamp(data['last_timestamp'])
+        model.last_close = data['last_close']
+        if len(model.closes) == FEATURE_BARS:
+            model.pending = bar_features(np.array(model.closes))
+        return model
+
+
+class OnlineModelStore:
+    """Sembol/periyot anahtarına göre online modeller - worker restart'larında diske yazılır"""
+
+    def __init__(self):
+        self.models: Dict[str, OnlineTrendModel] = {}
+        self.logger = logging.getLogger(__name__)
+
+    def get(self, key: str) -> OnlineTrendModel:
+        model = self.models.get(key)
+        if model is None:
+            model = self.models[key] = OnlineTrendModel()
+        return model
+
+    def discard(self, key: str):
+        self.models.pop(key, None)
+
+    def to_dict(self) -> Dict:
+        return {key: model.to_dict() for key, model in self.models.items()}
+
+    def save(self, path: str = None):
+        """Modelleri atomik olarak JSON dosyasına yazar"""
+        path = path or PREDICTION_CONFIG['state_path']
+        try:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(self.to_dict(), f)
+            os.replace(tmp_path, path)
+            self.logger.debug(f"💾 {len(self.models)} tahmin modeli kaydedildi: {path}")
+        except Exception as e:
+            self.logger.warning(f"⚠️ Tahmin modelleri kaydedilemedi: {e}")
+
+    @classmethod
+    def load(cls, path: str = None) -> 'OnlineModelStore':
+        """Kaydedilmiş modelleri yükler; dosya yoksa veya bozuksa boş store döndürür"""
+        path = path or PREDICTION_CONFIG['state_path']
+        store = cls()
+        if not os.path.exists(path):
+            return store
+        try:
+            with open(path) as f:
+                data = json.load(f)
+            store.models = {key: OnlineTrendModel.from_dict(model) for key, model in data.items()}
+            store.logger.info(f"📂 {len(store.models)} tahmin modeli yüklendi: {path}")
+        except Exception as e:
+            store.logger.warning(f"⚠️ Tahmin modelleri okunamadı, sıfırdan başlanacak: {e}")
+            store.models = {}
+        return store
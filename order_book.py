@@ -0,0 +1,245 @@
+"""
+📚 Alpha Vantage Trading Framework - NumPy Tabanlı L2 Emir Defteri
+Her taraf bitişik fiyat/miktar dizileri olarak tutulur; dengesizlik, ağırlıklı
+orta fiyat, mesafeye göre derinlik ve eğim binlerce seviyede vektörel hesaplanır.
+
+- from_depth: Mevcut {'bids': [[fiyat, miktar], ...], 'asks': [...]} formatı (veya (N, 2) dizi)
+- apply_deltas: Seviye güncellemeleri (miktar 0 -> seviye silinir), sıralı diziye toplu ekleme
+"""
+
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+
+
+class BookSide:
+    """
+    Tek taraf: `keys` artan sıralı (bid için -fiyat), böylece iki taraf da
+    searchsorted ile aynı şekilde güncellenir. İndeks 0 her zaman en iyi seviyedir.
+    """
+
+    def __init__(self, is_bid: bool, prices: np.ndarray = None, sizes: np.ndarray = None):
+        self.is_bid = is_bid
+        self._sign = -1.0 if is_bid else 1.0
+        self.keys = np.empty(0)
+        self.sizes = np.empty(0)
+        self._cumulative = None
+        if prices is not None:
+            self.replace(prices, sizes)
+
+    @property
+    def prices(self) -> np.ndarray:
+        return self.keys * self._sign
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def top(self, levels: int = None) -> tuple:
+        """İlk `levels` seviyenin (fiyat, miktar) dizileri - sadece o dilim çevrilir"""
+        return self.keys[:levels] * self._sign, self.sizes[:levels]
+
+    def replace(self, prices: np.ndarray, sizes: np.ndarray):
+        """Snapshot: seviyeleri sıralar, aynı fiyatları birleştirir, boş seviyeleri atar"""
+        keys = np.asarray(prices, dtype=float) * self._sign
+        sizes = np.asarray(sizes, dtype=float)
+        valid = np.isfinite(keys) & np.isfinite(sizes) & (sizes > 0)
+        keys, sizes = keys[valid], sizes[valid]
+        if len(keys) and not np.all(keys[1:] > keys[:-1]):
+            keys, inverse = np.unique(keys, return_inverse=True)
+            sizes = np.bincount(inverse, weights=sizes, minlength=len(keys))
+        self.keys = np.ascontiguousarray(keys)
+        self.sizes = np.ascontiguousarray(sizes)
+        self._cumulative = None
+
+    def apply_deltas(self, prices: np.ndarray, sizes: np.ndarray):
+        """
+        Seviye güncellemeleri: mevcut fiyat -> miktar değişir (0 ise silinir),
+        yeni fiyat -> sıralı konuma eklenir. Aynı pakette tekrarlanan fiyatta son değer geçerlidir.
+        """
+        keys = np.asarray(prices, dtype=float).ravel() * self._sign
+        sizes = np.asarray(sizes, dtype=float).ravel()
+        if not len(keys):
+            return
+        # Son güncelleme kazanır: ters çevrilmiş dizide ilk görülen
+        keys, first = np.unique(keys[::-1], return_index=True)
+        sizes = sizes[::-1][first]
+
+        positions = np.searchsorted(self.keys, keys)
+        exists = positions < len(self.keys)
+        exists[exists] = self.keys[positions[exists]] == keys[exists]
+
+        # Mevcut seviyeler: yerinde güncelle, sıfırlananları sil
+        self.sizes = self.sizes.copy()
+        self.sizes[positions[exists]] = sizes[exists]
+        removed = positions[exists][sizes[exists] <= 0]
+        keep_keys, keep_sizes = self.keys, self.sizes
+        if len(removed):
+            mask = np.ones(len(keep_keys), dtype=bool)
+            mask[removed] = False
+            keep_keys, keep_sizes = keep_keys[mask], keep_sizes[mask]
+
+        # Yeni seviyeler: tek np.insert ile sıralı konumlara
+        new = ~exists & (sizes > 0)
+        if new.any():
+            insert_at = np.searchsorted(keep_keys, keys[new])
+            keep_keys = np.insert(keep_keys, insert_at, keys[new])
+            keep_sizes = np.insert(keep_sizes, insert_at, sizes[new])
+
+        self.keys = keep_keys
+        self.sizes = keep_sizes
+        self._cumulative = None
+
+    @property
+    def cumulative(self) -> np.ndarray:
+        """En iyi seviyeden itibaren kümülatif miktar (güncellemeye kadar önbellekli)"""
+        return self._padded_cumulative()[1:]
+
+    def _padded_cumulative(self) -> np.ndarray:
+        # Başında 0 olan kümülatif dizi: searchsorted sonucu doğrudan indekslenir
+        if self._cumulative is None:
+            self._cumulative = np.concatenate(([0.0], np.cumsum(self.sizes)))
+        return self._cumulative
+
+    def volume(self, levels: int = None) -> float:
+        """İlk `levels` seviyenin toplam miktarı (None -> tümü)"""
+        if not len(self.sizes):
+            return 0.0
+        count = len(self.sizes) if levels is None else min(levels, len(self.sizes))
+        return float(self.cumulative[count - 1]) if count else 0.0
+
+    def depth_within(self, distances: np.ndarray, reference: float) -> np.ndarray:
+        """Referans fiyattan `distances` (fiyat birimi) uzaklığa kadar kümülatif miktar"""
+        limits = (reference + self._sign * np.asarray(distances, dtype=float)) * self._sign
+        counts = np.searchsorted(self.keys, limits, side='right')
+        return self._padded_cumulative()[counts]
+
+
+class OrderBook:
+    """İki taraflı L2 emir defteri ve vektörel derinlik metrikleri"""
+
+    def __init__(self, bid_prices: np.ndarray = None, bid_sizes: np.ndarray = None,
+                 ask_prices: np.ndarray = None, ask_sizes: np.ndarray = None):
+        self.bids = BookSide(True, bid_prices, bid_sizes)
+        self.asks = BookSide(False, ask_prices, ask_sizes)
+
+    @classmethod
+    def from_depth(cls, depth_data: Dict) -> 'OrderBook':
+        """{'bids': [[fiyat, miktar], ...], 'asks': [...]} veya (N, 2) dizilerden"""
+        sides = []
+        for name in ('bids', 'asks'):
+            levels = np.asarray(depth_data.get(name, ()), dtype=float).reshape(-1, 2) \
+                if len(depth_data.get(name, ())) else np.empty((0, 2))
+            sides.extend((levels[:, 0], levels[:, 1]))
+        return cls(*sides)
+
+    def to_depth(self, levels: int = None) -> Dict:
+        """Mevcut sözlük formatına ((N, 2) dizi olarak) geri çevirir"""
+        return {
+            'bids': np.column_stack(self.bids.top(levels)),
+            'asks': np.column_stack(self.asks.top(levels))
+        }
+
+    def apply_deltas(self, bids: Iterable = None, asks: Iterable = None):
+        """[[fiyat, miktar], ...] seviye güncellemeleri (miktar 0 -> sil)"""
+        for side, deltas in ((self.bids, bids), (self.asks, asks)):
+            if deltas is not None and len(deltas):
+                levels = np.asarray(deltas, dtype=float).reshape(-1, 2)
+                side.apply_deltas(levels[:, 0], levels[:, 1])
+
+    @property
+    def is_valid(self) -> bool:
+        return len(self.bids) > 0 and len(self.asks) > 0
+
+    @property
+    def best_bid(self) -> float:
+        return float(-self.bids.keys[0]) if len(self.bids) else np.nan
+
+    @property
+    def best_ask(self) -> float:
+        return float(self.asks.keys[0]) if len(self.asks) else np.nan
+
+    @property
+    def mid(self) -> float:
+        return (self.best_bid + self.best_ask) / 2
+
+    @property
+    def spread(self) -> float:
+        return self.best_ask - self.best_bid
+
+    def weighted_mid(self, levels: int = 1) -> float:
+        """
+        Miktar ağırlıklı orta fiyat (levels=1 -> microprice): karşı tarafın
+        miktarı fazlaysa fiyat diğer tarafa çekilir
+        """
+        if not self.is_valid:
+            return np.nan
+        bid_volume = self.bids.volume(levels)
+        ask_volume = self.asks.volume(levels)
+        bid_prices, bid_sizes = self.bids.top(levels)
+        ask_prices, ask_sizes = self.asks.top(levels)
+        bid_vwap = float(bid_prices @ bid_sizes) / bid_volume
+        ask_vwap = float(ask_prices @ ask_sizes) / ask_volume
+        return (bid_vwap * ask_volume + ask_vwap * bid_volume) / (bid_volume + ask_volume)
+
+    def imbalance(self, levels: int = 20) -> float:
+        """(bid - ask) / (bid + ask) ilk `levels` seviyede, -1..1"""
+        bid_volume = self.bids.volume(levels)
+        ask_volume = self.asks.volume(levels)
+        total = bid_volume + ask_volume
+        return (bid_volume - ask_volume) / total if total else 0.0
+
+    def percentage_diff(self, levels: int = 20) -> float:
+        """(bid - ask) / ask * 100 - MarketDepthAnalyzer'ın sinyal metriği"""
+        ask_volume = self.asks.volume(levels)
+        return (self.bids.volume(levels) - ask_volume) / ask_volume * 100 if ask_volume else np.nan
+
+    def depth_at_distance(self, bps: Iterable[float] = (10, 25, 50, 100)) -> Dict[str, np.ndarray]:
+        """Orta fiyattan baz puan uzaklıklarına kadar kümülatif bid/ask miktarı"""
+        bps = np.asarray(list(bps), dtype=float)
+        if not self.is_valid:
+            zeros = np.zeros(len(bps))
+            return {'bps': bps, 'bids': zeros, 'asks': zeros}
+        mid = self.mid
+        distances = mid * bps / 10000
+        return {
+            'bps': bps,
+            'bids': self.bids.depth_within(distances, mid),
+            'asks': self.asks.depth_within(distances, mid)
+        }
+
+    def slope(self, levels: Optional[int] = None) -> Dict[str, float]:
+        """
+        Kümülatif miktarın orta fiyattan uzaklığa (bps) göre eğimi - taraf başına
+        kapalı form en küçük kareler (yüksek eğim = dik / likit defter)
+        """
+        result = {}
+        mid = self.mid if self.is_valid else np.nan
+        for name, side in (('bids', self.bids), ('asks', self.asks)):
+            count = len(side) if levels is None else min(levels, len(side))
+            if count < 2 or not np.isfinite(mid):
+                result[name] = 0.0
+                continue
+            x = np.abs(side.top(count)[0] - mid) / mid * 10000
+            y = side.cumulative[:count]
+            x_centered = x - x.mean()
+            sxx = float(x_centered @ x_centered)
+            result[name] = float(x_centered @ (y - y.mean())) / sxx if sxx > 0 else 0.0
+        return result
+
+    def metrics(self, levels: int = 20, bps: Iterable[float] = (10, 25, 50, 100)) -> Dict:
+        """Tek çağrıda tüm derinlik metrikleri"""
+        depth = self.depth_at_distance(bps)
+        return {
+            'best_bid': self.best_bid,
+            'best_ask': self.best_ask,
+            'mid': self.mid,
+            'spread': self.spread,
+            'weighted_mid': self.weighted_mid(),
+            'imbalance': self.imbalance(levels),
+            'percentage_diff': self.percentage_diff(levels),
+            'depth_bps': depth['bps'].tolist(),
+            'bid_depth': depth['bids'].tolist(),
+            'ask_depth': depth['asks'].tolist(),
+            'slope': self.slope(levels),
+            'levels': {'bids': len(self.bids), 'asks': len(self.asks)}
+        }
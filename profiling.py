@@ -0,0 +1,184 @@
+"""
+⏱️ Alpha Vantage Trading Framework - Aşama Profilleme
+analyze_symbol aşamalarının (fiyat, teknik, tahmin, derinlik, korelasyon, risk)
+duvar saati süresini ve ağ çağrısı / rate limit beklemesi / cache / DB sorgu sayılarını ölçer.
+
+- Profil thread'e bağlıdır: analyze_many havuzunda her analiz kendi profilini tutar
+- Profil kapalıyken count() ve stage() tek bir thread-local okumasına iner
+- StageSummary: bir worker döngüsündeki profilleri aşama bazında toplar
+"""
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+COUNTERS = ('network_calls', 'rate_limit_wait_ms', 'cache_hits', 'cache_misses', 'db_queries')
+
+_local = threading.local()
+_query_counter_installed = False
+
+
+def current_profile() -> Optional['StageProfile']:
+    return getattr(_local, 'profile', None)
+
+
+def count(counter: str, amount: float = 1):
+    """Aktif profilin o anki aşamasına sayaç ekler (profil yoksa hiçbir şey yapmaz)"""
+    profile = getattr(_local, 'profile', None)
+    if profile is not None:
+        profile.add(counter, amount)
+
+
+def _new_entry() -> Dict:
+    entry = dict.fromkeys(COUNTERS, 0)
+    entry['wall_ms'] = 0.0
+    return entry
+
+
+class StageProfile:
+    """Tek analiz (veya ön yükleme) için aşama bazında süre ve sayaçlar"""
+
+    def __init__(self):
+        self.stages: Dict[str, Dict] = {}
+        self.total_ms = 0.0
+        self._stage = None
+
+    def _entry(self, name: str) -> Dict:
+        entry = self.stages.get(name)
+        if entry is None:
+            entry = self.stages[name] = _new_entry()
+        return entry
+
+    def add(self, counter: str, amount: float = 1):
+        # Aşama dışındaki çağrılar 'other' altında toplanır
+        self._entry(self._stage or 'other')[counter] += amount
+
+    @contextmanager
+    def stage(self, name: str):
+        previous, self._stage = self._stage, name
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._entry(name)['wall_ms'] += (time.perf_counter() - started) * 1000
+            self._stage = previous
+
+    def to_dict(self) -> Dict:
+        return {
+            'total_ms': round(self.total_ms, 3),
+            'stages': {name: {key: round(value, 3) for key, value in entry.items()}
+                       for name, entry in self.stages.items()}
+        }
+
+
+@contextmanager
+def profiling(enabled: bool = True, profile: StageProfile = None):
+    """
+    Bu thread'de profil açar ve toplam süreyi ölçer; kapalıysa None verir.
+    Var olan bir profile verilirse ona eklenir (ör. batch'ler boyunca ön yükleme).
+    """
+    if not enabled:
+        yield None
+        return
+    previous = getattr(_local, 'profile', None)
+    profile = profile or StageProfile()
+    _local.profile = profile
+    started = time.perf_counter()
+    try:
+        yield profile
+    finally:
+        profile.total_ms += (time.perf_counter() - started) * 1000
+        _local.profile = previous
+
+
+@contextmanager
+def stage(name: str):
+    """Aktif profilde aşama ölçümü - profil yoksa sadece yield"""
+    profile = getattr(_local, 'profile', None)
+    if profile is None:
+        yield
+        return
+    with profile.stage(name):
+        yield
+
+
+def install_query_counter():
+    """SQLAlchemy sorgularını aktif profile 'db_queries' olarak sayar (süreç başına bir kez)"""
+    global _query_counter_installed
+    if _query_counter_installed:
+        return
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+
+    @event.listens_for(Engine, 'before_cursor_execute')
+    def _count_query(*args, **kwargs):
+        count('db_queries')
+
+    _query_counter_installed = True
+
+
+class StageSummary:
+    """Bir worker döngüsündeki analiz profillerinin aşama bazında özeti"""
+
+    def __init__(self, slowest: int = 5):
+        self.stages: Dict[str, Dict] = {}
+        self.symbols = 0
+        self.total_ms = 0.0
+        self.slowest_count = slowest
+        self._totals: List[tuple] = []
+
+    def add(self, symbol: str, timings: Optional[Dict]):
+        """analyze_symbol sonucundaki 'timings' sözlüğünü ekler"""
+        if not timings:
+            return
+        self.symbols += 1
+        self.total_ms += timings['total_ms']
+        self._totals.append((timings['total_ms'], symbol))
+        self._merge(timings['stages'])
+
+    def add_profile(self, profile: Optional[StageProfile]):
+        """Sembole bağlı olmayan profil (ön yükleme / toplu tahmin) - sembol sayısına girmez"""
+        if profile is not None:
+            self._merge(profile.to_dict()['stages'])
+
+    def _merge(self, stages: Dict):
+        for name, entry in stages.items():
+            aggregate = self.stages.get(name)
+            if aggregate is None:
+                aggregate = self.stages[name] = _new_entry()
+                aggregate.update(calls=0, max_ms=0.0)
+            aggregate['calls'] += 1
+            aggregate['max_ms'] = max(aggregate['max_ms'], entry['wall_ms'])
+            for key in COUNTERS + ('wall_ms',):
+                aggregate[key] += entry.get(key, 0)
+
+    def to_dict(self) -> Dict:
+        stage_total = sum(entry['wall_ms'] for entry in self.stages.values()) or 1.0
+        stages = {}
+        for name, entry in sorted(self.stages.items(), key=lambda item: -item[1]['wall_ms']):
+            stages[name] = {key: round(value, 3) for key, value in entry.items()}
+            stages[name]['mean_ms'] = round(entry['wall_ms'] / entry['calls'], 3)
+            stages[name]['share_pct'] = round(entry['wall_ms'] / stage_total * 100, 1)
+        return {
+            'symbols': self.symbols,
+            'total_ms': round(self.total_ms, 3),
+            'stages': stages,
+            'slowest': [{'symbol': symbol, 'total_ms': round(total, 3)}
+                        for total, symbol in sorted(self._totals, reverse=True)[:self.slowest_count]]
+        }
+
+    def log(self, logger: logging.Logger):
+        summary = self.to_dict()
+        logger.info(f"⏱️ Aşama profili: {summary['symbols']} sembol, {summary['total_ms'] / 1000:.1f}s analiz")
+        for name, entry in summary['stages'].items():
+            logger.info(
+                f"   {name:16s} {entry['wall_ms']:>10.1f} ms (%{entry['share_pct']:.1f}, "
+                f"ort {entry['mean_ms']:.1f} / max {entry['max_ms']:.1f}) | "
+                f"ağ {entry['network_calls']:.0f}, bekleme {entry['rate_limit_wait_ms']:.0f} ms, "
+                f"cache {entry['cache_hits']:.0f}/{entry['cache_hits'] + entry['cache_misses']:.0f}, "
+                f"db {entry['db_queries']:.0f}")
+        if summary['slowest']:
+            slowest = ', '.join(f"{item['symbol']} ({item['total_ms']:.0f} ms)" for item in summary['slowest'])
+            logger.info(f"   En yavaş: {slowest}")
@@ -0,0 +1,50 @@
+"""
+🎫 Alpha Vantage Trading Framework - Paylaşılan API Rate Budget
+Dakika başına çağrı kotası için slot rezervasyonu: her çağrı kilit altında bir
+sonraki boş slotu ayırır ve kilidin dışında bekler. Böylece istekler ağ süresince
+üst üste binebilir, eşzamanlılığı sadece kota sınırlar.
+"""
+
+import threading
+import time
+from typing import Dict
+
+
+class RateBudget:
+    """Thread-safe token bucket (burst=1 -> çağrılar arası sabit aralık)"""
+
+    def __init__(self, calls_per_minute: float, burst: int = 1):
+        self.calls_per_minute = calls_per_minute
+        self.interval = 60.0 / calls_per_minute
+        self.burst = max(1, burst)
+        self.calls = 0
+        self.wait_seconds = 0.0
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Bir çağrı slotu ayırır - beklenmesi gereken süreyi (saniye) döndürür"""
+        with self._lock:
+            now = time.monotonic()
+            # Boşta geçen süre en fazla `burst` çağrılık kredi biriktirir
+            slot = max(self._next_slot, now - (self.burst - 1) * self.interval)
+            self._next_slot = slot + self.interval
+            self.calls += 1
+            wait = max(0.0, slot - now)
+            self.wait_seconds += wait
+        return wait
+
+    def acquire(self) -> float:
+        """Slot ayırır ve zamanı gelene kadar bekler - beklenen süreyi döndürür"""
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {
+                'calls_per_minute': self.calls_per_minute,
+                'calls': self.calls,
+                'wait_seconds': round(self.wait_seconds, 3)
+            }
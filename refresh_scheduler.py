@@ -0,0 +1,194 @@
+"""
+🗓️ Alpha Vantage Trading Framework - Öncelikli Yenileme Zamanlayıcısı
+Her sembolün kendi yenileme aralığı vardır; worker her döngüde vadesi gelmiş
+semboller arasından en değerlilerini seçer (API çağrısı önce onlara harcanır).
+
+- Değer: watchlist sayısı + ATR volatilitesi + sinyal değişim oranı
+- Aralık: base_interval / değer (min/max sınırlı); hata durumunda üstel geri çekilme
+- Öncelik: değer x gecikme oranı (son başarılı güncellemeden beri geçen süre / aralık)
+- Vade sırası heap'te tutulur; döngü başına sadece vadesi gelenler değerlendirilir
+- Piyasa takvimi verilirse kapalı piyasada vade sonraki açılışa ertelenir (kapanıştan
+  sonra post_close_delay bekleyip tek son yenileme yapılır)
+"""
+
+import heapq
+import itertools
+import logging
+import math
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from constants import SCHEDULER_CONFIG, MARKET_CALENDAR_CONFIG
+
+
+class SymbolSchedule:
+    """Tek sembolün zamanlama durumu"""
+
+    def __init__(self, symbol: str, asset_type=None):
+        self.symbol = symbol
+        self.asset_type = asset_type
+        self.watchers = 0
+        self.volatility = 0.0        # ATR / fiyat
+        self.change_rate = 0.0       # Sinyal değişim EWMA'sı (0..1)
+        self.last_signal = None
+        self.last_success = 0.0      # 0 -> hiç güncellenmedi (hemen vadeli)
+        self.last_attempt = 0.0
+        self.failures = 0
+        self.version = 0             # Heap'teki eski girdileri ayırt eder
+
+    @property
+    def value(self) -> float:
+        config = SCHEDULER_CONFIG
+        volatility = min(self.volatility / config['volatility_reference'], config['volatility_cap'])
+        return (1.0
+                + config['watcher_weight'] * math.log1p(self.watchers)
+                + config['volatility_weight'] * volatility
+                + config['signal_change_weight'] * self.change_rate)
+
+    @property
+    def interval(self) -> float:
+        config = SCHEDULER_CONFIG
+        return min(config['max_interval'], max(config['min_interval'], config['base_interval'] / self.value))
+
+    @property
+    def due_time(self) -> float:
+        due = self.last_success + self.interval if self.last_success else 0.0
+        if self.failures:
+            backoff = min(SCHEDULER_CONFIG['max_backoff'], SCHEDULER_CONFIG['min_interval'] * 2 ** self.failures)
+            due = max(due, self.last_attempt + backoff)
+        return due
+
+    def priority(self, now: float) -> float:
+        if not self.last_success:
+            return math.inf  # Hiç verisi olmayan sembol önce
+        return self.value * (now - self.last_success) / self.interval
+
+    def to_dict(self, now: float) -> Dict:
+        return {
+            'symbol': self.symbol,
+            'watchers': self.watchers,
+            'volatility': round(self.volatility, 6),
+            'change_rate': round(self.change_rate, 3),
+            'value': round(self.value, 3),
+            'interval': round(self.interval, 1),
+            'due_in': round(self.due_time - now, 1),
+            'failures': self.failures
+        }
+
+
+class RefreshScheduler:
+    """Vade heap'i + değer bazlı seçim - worker süreci boyunca bellekte yaşar"""
+
+    def __init__(self, calendar=None):
+        self.calendar = calendar     # MarketCalendar - None -> takvim kontrolü yok
+        self.states: Dict[str, SymbolSchedule] = {}
+        self._heap: List[Tuple[float, str, int]] = []
+        self._versions = itertools.count(1)  # Silinip yeniden eklenen sembolde de benzersiz
+        self.logger = logging.getLogger(__name__)
+
+    def _push(self, state: SymbolSchedule, due: float = None):
+        state.version = next(self._versions)
+        heapq.heappush(self._heap, (state.due_time if due is None else due, state.symbol, state.version))
+
+    def _market_due(self, state: SymbolSchedule, now: float) -> float:
+        """
+        Vadesi gelmiş sembolün piyasa takvimine göre gerçek vadesi: açıkken `now`,
+        kapanış sonrası son yenileme yapılmadıysa kapanış + post_close_delay,
+        yapıldıysa sonraki açılış
+        """
+        if self.calendar is None:
+            return now
+        session = self.calendar.for_asset(state.asset_type)
+        if session.is_open(now):
+            return now
+        close = session.previous_close(now)
+        final_refresh = close + MARKET_CALENDAR_CONFIG['post_close_delay'] if close is not None else None
+        if final_refresh is not None and state.last_success < final_refresh:
+            return max(now, final_refresh)
+        return session.next_open(now)
+
+    def sync_universe(self, symbols: Dict[str, object], watchers: Dict[str, int] = None,
+                      seed: Dict[str, Tuple[float, Optional[str]]] = None):
+        """
+        Zamanlanacak sembolleri günceller: {sembol: varlık türü}, watchlist sayıları ve
+        (ilk görülen semboller için) DB'den son başarılı güncelleme zamanı / sinyal
+        """
+        watchers = watchers or {}
+        seed = seed or {}
+        for symbol in list(self.states):
+            if symbol not in symbols:
+                del self.states[symbol]  # Heap girdisi sürümü eşleşmediği için atlanır
+        for symbol, asset_type in symbols.items():
+            state = self.states.get(symbol)
+            if state is None:
+                state = self.states[symbol] = SymbolSchedule(symbol, asset_type)
+                state.last_success, state.last_signal = seed.get(symbol, (0.0, None))
+                state.watchers = watchers.get(symbol, 0)
+                self._push(state)
+                continue
+            state.asset_type = asset_type
+            if state.watchers != watchers.get(symbol, 0):
+                state.watchers = watchers.get(symbol, 0)
+                self._push(state)  # Aralık değişti - vade yeniden hesaplanır
+
+    def select(self, limit: int = None, now: float = None) -> List[Tuple[str, object]]:
+        """
+        Vadesi gelmiş sembollerden öncelik sırasıyla en fazla `limit` tanesi - (sembol, tür).
+        Seçilenler sonuç gelene kadar min_interval boyunca tekrar seçilmez.
+        """
+        now = now or time.time()
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            _, symbol, version = heapq.heappop(self._heap)
+            state = self.states.get(symbol)
+            if state is None or state.version != version:
+                continue
+            market_due = self._market_due(state, now)
+            if market_due > now:
+                self._push(state, due=market_due)  # Piyasa kapalı - açılışa / son yenilemeye ertelenir
+            else:
+                due.append(state)
+
+        due.sort(key=lambda state: state.priority(now), reverse=True)
+        chosen = due[:limit] if limit is not None else due
+        for state in due[len(chosen):]:
+            self._push(state)  # Bu döngüde sığmayanlar vadeli kalır
+        for state in chosen:
+            self._push(state, due=now + SCHEDULER_CONFIG['min_interval'])
+
+        self.logger.info(f"🗓️ Zamanlayıcı: {len(due)}/{len(self.states)} sembol vadeli, {len(chosen)} seçildi")
+        return [(state.symbol, state.asset_type) for state in chosen]
+
+    def record_result(self, symbol: str, analysis: Dict, now: float = None):
+        """Başarılı güncelleme: volatilite ve sinyal değişim oranı güncellenir, yeni vade kurulur"""
+        state = self.states.get(symbol)
+        if state is None:
+            return
+        now = now or time.time()
+        price, atr = analysis.get('current_price'), analysis.get('atr')
+        if price and atr and math.isfinite(atr):
+            state.volatility = float(abs(atr) / price)
+        signal = analysis.get('final_signal')
+        if signal is not None:
+            changed = 1.0 if state.last_signal is not None and signal != state.last_signal else 0.0
+            alpha = SCHEDULER_CONFIG['signal_change_smoothing']
+            state.change_rate = (1 - alpha) * state.change_rate + alpha * changed
+            state.last_signal = signal
+        state.last_success = state.last_attempt = now
+        state.failures = 0
+        self._push(state)
+
+    def record_failure(self, symbol: str, now: float = None):
+        """Başarısız güncelleme: üstel geri çekilme ile yeniden denenir"""
+        state = self.states.get(symbol)
+        if state is None:
+            return
+        state.last_attempt = now or time.time()
+        state.failures += 1
+        self._push(state)
+
+    def snapshot(self, symbols: Iterable[str] = None, now: float = None) -> List[Dict]:
+        """Durum özeti (en değerliden başlayarak) - debug / dashboard için"""
+        now = now or time.time()
+        states = [self.states[s] for s in symbols if s in self.states] if symbols else list(self.states.values())
+        return [state.to_dict(now) for state in sorted(states, key=lambda state: -state.value)]
@@ -0,0 +1,234 @@
+"""
+🔗 Alpha Vantage Trading Framework - Artımlı Kayan Korelasyon
+Her sembol çifti için kayan pencere üzerinde toplamlar tutulur
+(Σx, Σy, Σxy, Σx², Σy², n - sadece iki sembolün de getirisi olan barlar):
+
+- Yeni kapanmış bar satırları toplamlara eklenir, pencereden çıkanlar çıkarılır
+  (satır grubu başına birkaç N×N matris çarpımı - geçmiş yeniden indirilmez)
+- Korelasyon toplamlardan O(N²) vektörel işlemle türetilir (pandas corr ile aynı, çift bazlı)
+- Semboller farklı döngülerde yenilenir: her sembolün en yeni barı oluşmakta sayılır ve
+  satırlar sadece sembollerin son kapanmış barlarının (watermark) en küçüğüne kadar eklenir -
+  geç yenilenen sembolün barları NaN olarak donmaz, kısmi bar kapanmış diye girmez
+- Ufku sadece motor periyodundaki seriler belirler: barları daha seyrek seriler (kripto 1d
+  tabanı) kendi watermark'larında kesilir, değerleri bir sonraki tam hesapta yenilenir
+- Kayan toplamlarda biriken yuvarlama hatası `resync_every` satırda bir pencereden
+  yeniden hesaplanarak sıfırlanır; exact_matrix() istendiğinde tam hesap yapar
+"""
+
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+
+class RollingCorrelation:
+    """
+    Sembol başına getiri serileri üzerinde kayan pencere korelasyon matrisi (thread-safe).
+
+    window: Pencere satır (bar zamanı) sayısı
+    min_periods: Çiftin korelasyonu için gereken minimum ortak bar sayısı (azsa NaN)
+    max_lag: Watermark'ı en yeniden bu kadar geride kalan sembol (kapalı piyasa, uzun süre
+             yenilenmeyen) ekleme ufkunu tutmaz - o sembolün aradaki barları NaN kalır
+    interval: Motorun bar periyodu - bar aralığı bundan büyük seriler ekleme ufkunu tutmaz
+    """
+
+    def __init__(self, window: int, min_periods: int = 2, resync_every: int = None,
+                 max_lag: pd.Timedelta = None, interval: pd.Timedelta = None):
+        self.window = window
+        self.min_periods = max(2, min_periods)
+        self.resync_every = resync_every or window
+        self.max_lag = pd.Timedelta(days=4) if max_lag is None else pd.Timedelta(max_lag)
+        self.interval = pd.Timedelta(minutes=15) if interval is None else pd.Timedelta(interval)
+        self.symbols: List[str] = []
+        self.last_timestamp: Optional[pd.Timestamp] = None
+        self._spacing: Dict[str, pd.Timedelta] = {}  # Sembol başına bar aralığı (en küçük ardışık fark)
+        self._lock = threading.Lock()
+        self._allocate(0)
+
+    def _allocate(self, count: int):
+        self._times = np.empty(self.window, dtype=object)
+        self._rows = np.full((self.window, count), np.nan)  # Halka tampon: getiri satırları
+        self._head = 0      # Sıradaki yazılacak satır
+        self._length = 0
+        self._since_resync = 0
+        self._sum_xy = np.zeros((count, count))
+        self._sum_x = np.zeros((count, count))    # [i, j]: j'nin de olduğu barlarda Σx_i
+        self._sum_xx = np.zeros((count, count))   # [i, j]: j'nin de olduğu barlarda Σx_i²
+        self._count = np.zeros((count, count))
+
+    def __len__(self) -> int:
+        return self._length
+
+    # ---- Toplamlar ----
+
+    def _accumulate(self, rows: np.ndarray, sign: float):
+        """Satır grubunu (k×N, NaN = bar yok) toplamlara ekler (+1) veya çıkarır (-1)"""
+        present = ~np.isnan(rows)
+        values = np.where(present, rows, 0.0)
+        mask = present.astype(float)
+        self._sum_xy += sign * (values.T @ values)
+        self._sum_x += sign * (values.T @ mask)
+        self._sum_xx += sign * ((values * values).T @ mask)
+        self._count += sign * (mask.T @ mask)
+
+    def _window_rows(self) -> np.ndarray:
+        """Penceredeki satırlar (eskiden yeniye)"""
+        if self._length < self.window:
+            return self._rows[:self._length]
+        return np.roll(self._rows, -self._head, axis=0)
+
+    def _resync(self):
+        """Toplamları pencereden baştan hesaplar (biriken yuvarlama hatası sıfırlanır)"""
+        count = len(self.symbols)
+        for name in ('_sum_xy', '_sum_x', '_sum_xx', '_count'):
+            setattr(self, name, np.zeros((count, count)))
+        self._accumulate(self._window_rows(), 1.0)
+        self._since_resync = 0
+
+    def _push(self, times: np.ndarray, rows: np.ndarray):
+        """Zaman sıralı satırları pencereye ekler, taşanları çıkarır"""
+        rows = rows[-self.window:]
+        times = times[-self.window:]
+        count = len(rows)
+        positions = (self._head + np.arange(count)) % self.window
+        overflow = max(0, self._length + count - self.window)
+        if overflow:
+            evicted = (self._head - self._length + np.arange(overflow)) % self.window
+            self._accumulate(self._rows[evicted], -1.0)
+        self._rows[positions] = rows
+        self._times[positions] = times
+        self._accumulate(rows, 1.0)
+        self._head = (self._head + count) % self.window
+        self._length = min(self.window, self._length + count)
+        self._since_resync += count
+        if self._since_resync >= self.resync_every:
+            self._resync()
+
+    # ---- Veri girişi ----
+
+    @staticmethod
+    def _returns(closes: Dict[str, pd.Series]) -> pd.DataFrame:
+        """Sembol başına kendi barları arasındaki getiri, zamanlara hizalı (bar yoksa NaN)"""
+        returns = {symbol: series.pct_change(fill_method=None) for symbol, series in closes.items()}
+        return pd.DataFrame(returns).sort_index()
+
+    def _update_spacing(self, closes: Dict[str, pd.Series]):
+        """Bar aralığı: ardışık barların en küçük farkı (boşluklar aralığı büyütmez, 2 barlık kuyruk yetmez)"""
+        for symbol, series in closes.items():
+            if len(series) > 2:
+                spacing = (series.index[1:] - series.index[:-1]).min()
+                self._spacing[symbol] = min(spacing, self._spacing.get(symbol, spacing))
+
+    def _closed_returns(self, closes: Dict[str, pd.Series]) -> pd.DataFrame:
+        """
+        Kapanmış barların getirileri ve ekleme ufku. Sembolün watermark'ı sondan ikinci
+        barıdır (en yeni bar oluşmakta / son yenilemede kısmi olabilir); watermark sonrası
+        değerler NaN yapılır. Ufuk: motor periyodundaki serilerin max_lag içindeki
+        watermark'larının en küçüğü - sonrası atılır.
+        """
+        closes = {symbol: series for symbol, series in closes.items() if len(series)}
+        self._update_spacing(closes)
+        watermarks = {symbol: series.index[-2] for symbol, series in closes.items() if len(series) > 1}
+        if not watermarks:
+            return pd.DataFrame()
+        paced = {symbol: mark for symbol, mark in watermarks.items()
+                 if self._spacing.get(symbol, self.interval) <= self.interval} or watermarks
+        latest = max(paced.values())
+        horizon = min(mark for mark in paced.values() if latest - mark <= self.max_lag)
+        returns = self._returns(closes)
+        for symbol, mark in watermarks.items():
+            returns.loc[returns.index > mark, symbol] = np.nan
+        return returns[returns.index <= horizon].dropna(how='all')
+
+    def _set_symbols(self, symbols: List[str]):
+        """Sembol kümesini değiştirir - kalan çiftlerin toplamları korunur, yeniler boş başlar"""
+        if symbols == self.symbols:
+            return
+        old = {symbol: index for index, symbol in enumerate(self.symbols)}
+        keep = [old.get(symbol, -1) for symbol in symbols]
+        source = np.array([index for index in keep if index >= 0], dtype=int)
+        target = np.array([position for position, index in enumerate(keep) if index >= 0], dtype=int)
+
+        rows = np.full((self.window, len(symbols)), np.nan)
+        rows[:, target] = self._rows[:, source]
+        self._rows = rows
+        for name in ('_sum_xy', '_sum_x', '_sum_xx', '_count'):
+            matrix = np.zeros((len(symbols), len(symbols)))
+            matrix[np.ix_(target, target)] = getattr(self, name)[np.ix_(source, source)]
+            setattr(self, name, matrix)
+        self.symbols = list(symbols)
+
+    def rebuild(self, closes: Dict[str, pd.Series]):
+        """Tam geçmişten yeniden kurar (günlük tam hesap / ilk yükleme) - ekleme ufkuna kadar"""
+        self._spacing = {}
+        returns = self._closed_returns(closes)
+        with self._lock:
+            self.symbols = list(returns.columns)
+            self._allocate(len(self.symbols))
+            self.last_timestamp = None
+            if not returns.empty:
+                self._push(returns.index.to_numpy(), returns.to_numpy(dtype=float))
+                self.last_timestamp = returns.index[-1]
+
+    def append(self, closes: Dict[str, pd.Series]) -> int:
+        """
+        Son barları (sembol başına kuyruk serisi - last_timestamp'teki ya da ondan önceki son
+        bardan başlar) ekler: last_timestamp'ten sonra, ekleme ufkuna kadar olan satırlar. Ufuktan sonrası (geride kalan sembol henüz yenilenmedi)
+        sonraki çağrılarda eklenir.
+        Pencerede olmayan sembol boş toplamlarla eklenir, `closes`'ta olmayanlar çıkarılır.
+
+        Returns: Eklenen satır sayısı - None: bir serinin kuyruğu last_timestamp'e
+                 ulaşmıyor (aradaki barlar kaçar), motor değiştirilmedi -> rebuild gerekir
+        """
+        if self.last_timestamp is not None and any(
+                len(series) and series.index[0] > self.last_timestamp
+                for symbol, series in closes.items() if symbol in self.symbols):
+            return None
+        returns = self._closed_returns(closes)
+        with self._lock:
+            self._set_symbols(list(closes))
+            if returns.empty:
+                return 0
+            if self.last_timestamp is not None:
+                returns = returns[returns.index > self.last_timestamp]
+            returns = returns.reindex(columns=self.symbols).dropna(how='all')
+            if returns.empty:
+                return 0
+            self._push(returns.index.to_numpy(), returns.to_numpy(dtype=float))
+            self.last_timestamp = returns.index[-1]
+            return len(returns)
+
+    # ---- Çıktı ----
+
+    def matrix(self) -> pd.DataFrame:
+        """Toplamlardan korelasyon matrisi - O(N²)"""
+        with self._lock:
+            count = np.maximum(self._count, 1.0)
+            mean_x = self._sum_x / count
+            mean_y = mean_x.T
+            covariance = self._sum_xy / count - mean_x * mean_y
+            variance_x = self._sum_xx / count - mean_x ** 2
+            variance_y = variance_x.T
+            with np.errstate(invalid='ignore', divide='ignore'):
+                correlation = covariance / np.sqrt(variance_x * variance_y)
+            correlation[(self._count < self.min_periods) | ~np.isfinite(correlation)] = np.nan
+            correlation = np.clip(correlation, -1.0, 1.0)
+            np.fill_diagonal(correlation, np.where(np.diag(self._count) >= self.min_periods, 1.0, np.nan))
+            return pd.DataFrame(correlation, index=self.symbols, columns=self.symbols)
+
+    def exact_matrix(self) -> pd.DataFrame:
+        """Penceredeki satırlardan tam hesap (pandas, çift bazlı) - doğrulama / istek üzerine"""
+        with self._lock:
+            rows = pd.DataFrame(self._window_rows(), columns=self.symbols)
+        return rows.corr(min_periods=self.min_periods)
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {
+                'symbols': len(self.symbols),
+                'window': self.window,
+                'rows': self._length,
+                'last_timestamp': str(self.last_timestamp) if self.last_timestamp is not None else None
+            }
+
@@ -0,0 +1,111 @@
+"""
+📜 Alpha Vantage Trading Framework - Sinyal Geçmişi
+CachedData sadece son durumu tutar; SignalHistory her döngünün sonucunu ekler
+(fiyat, sinyal, sentiment, akıllı skorlar, risk) - böylece sinyal/skor seyri çizilebilir.
+
+- Yazım: persist grubu başına tek executemany INSERT (worker)
+- Okuma: (symbol, ts) indeksi üzerinde aralık sorgusu
+- Retention: `day` parçası üzerinden - full_resolution_days'ten eskisi kova başına
+  son satıra seyreltilir, retention_days'ten eskisi silinir
+"""
+
+import logging
+import time
+from typing import Dict, List
+
+from sqlalchemy import delete, func, select
+
+from constants import SIGNAL_HISTORY_CONFIG
+from web_app import SignalHistory
+
+logger = logging.getLogger(__name__)
+
+# Kompakt kodlar - yeni değerler sona eklenir (mevcut kodlar değişmez)
+SIGNAL_CODES = {'hold': 0, 'buy': 1, 'sell': -1, 'error': -2}
+RISK_CODES = {'low': 0, 'medium': 1, 'high': 2}
+_SIGNALS = {code: name for name, code in SIGNAL_CODES.items()}
+_RISKS = {code: name for name, code in RISK_CODES.items()}
+
+_SCORE_FIELDS = ('sentiment', 'confidence_score', 'technical_strength', 'volume_score', 'momentum_score')
+
+
+def history_rows(records: List[Dict], now: float = None) -> List[Dict]:
+    """Worker kayıtları (CachedData alanları) -> SignalHistory satırları"""
+    ts = int(now or time.time())
+    rows = []
+    for record in records:
+        row = {
+            'symbol': record['symbol'],
+            'ts': ts,
+            'day': ts // 86400,
+            'price': record['price'],
+            'signal': SIGNAL_CODES.get(str(record.get('signal')).lower(), SIGNAL_CODES['hold']),
+            'risk_level': RISK_CODES.get(record.get('risk_level'))
+        }
+        for field in _SCORE_FIELDS:
+            row[field] = record.get(field)
+        rows.append(row)
+    return rows
+
+
+def append_history(session, records: List[Dict], now: float = None) -> int:
+    """Grubu tek executemany ile ekler - commit çağıranın işi. Returns: ifade sayısı"""
+    if not records or not SIGNAL_HISTORY_CONFIG['enabled']:
+        return 0
+    session.execute(SignalHistory.__table__.insert(), history_rows(records, now))
+    return 1
+
+
+def query_history(session, symbol: str, start: float, end: float = None) -> List[Dict]:
+    """Sembolün [start, end] epoch saniye aralığındaki geçmişi (zaman sırasıyla)"""
+    table = SignalHistory.__table__
+    end = end or time.time()
+    result = session.execute(
+        select(table.c.ts, table.c.price, table.c.signal, table.c.risk_level,
+               *(table.c[field] for field in _SCORE_FIELDS))
+        .where(table.c.symbol == symbol, table.c.ts >= int(start), table.c.ts <= int(end))
+        .order_by(table.c.ts)
+    )
+    history = []
+    for row in result:
+        entry = row._asdict()
+        entry['signal'] = _SIGNALS.get(entry['signal'], 'hold')
+        entry['risk_level'] = _RISKS.get(entry['risk_level'])
+        history.append(entry)
+    return history
+
+
+def apply_retention(session, now: float = None) -> Dict:
+    """
+    Tabloyu sınırlı tutar: retention_days'ten eski günleri siler, [retention, full_resolution)
+    aralığında kova başına birden fazla satırı kalan her günü downsample_seconds kovası
+    başına son satıra indirger (worker'ın kapalı kaldığı günler de yakalanır).
+    Gün başına ayrı commit; tekrar çalıştırmak güvenlidir (seyreltilmiş gün atlanır).
+    """
+    config = SIGNAL_HISTORY_CONFIG
+    table = SignalHistory.__table__
+    bucket = table.c.ts // config['downsample_seconds']
+    today = int(now or time.time()) // 86400
+    retention_day = today - config['retention_days']
+    full_day = today - config['full_resolution_days']
+
+    expired = session.execute(delete(table).where(table.c.day < retention_day)).rowcount
+    session.commit()
+
+    pending = session.execute(
+        select(table.c.day)
+        .where(table.c.day >= retention_day, table.c.day < full_day)
+        .group_by(table.c.day, table.c.symbol, bucket)
+        .having(func.count() > 1)
+    ).scalars()
+    thinned = 0
+    days = sorted(set(pending))
+    for day in days:
+        keep = select(func.max(table.c.id)).where(table.c.day == day).group_by(table.c.symbol, bucket)
+        thinned += session.execute(delete(table).where(table.c.day == day, table.c.id.not_in(keep))).rowcount
+        session.commit()
+
+    stats = {'expired_rows': expired, 'downsampled_rows': thinned, 'downsampled_days': len(days)}
+    logger.info(f"📜 Sinyal geçmişi retention: {expired} eski satır silindi, "
+                f"{len(days)} günde {thinned} satır seyreltildi")
+    return stats
@@ -0,0 +1,377 @@
+#!/usr/bin/env python3
+"""
+🎛️ Alpha Vantage Trading Framework - Sinyal Eşiği Parametre Taraması
+TechnicalAnalyzer eşiklerini (SIGNAL_CONFIG: ±0.3 skor, RSI 30/40/60/70)
+geçmiş barlar üzerinde grid / random / Bayesian arama ile dener.
+
+- İndikatörler sembol başına bir kez hesaplanır ve paylaşılan belleğe yazılır;
+  worker process'ler denemeler arasında yeniden hesaplamaz
+- Her deneme: in-sample (eğitim) ve out-of-sample (test) backtest
+- Sonuç: out-of-sample metriklerine göre sıralı kompakt tablo (CSV)
+"""
+
+import argparse
+import itertools
+import logging
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+from typing import Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from backtester import Backtester, CsvBarLoader, load_listing_symbols
+from constants import SIGNAL_CONFIG
+from universal_trading_framework import TechnicalAnalyzer, score_signal_arrays
+
+logger = logging.getLogger(__name__)
+
+# Paylaşılan bellekteki satırlar (sembol başına kolon bloğu)
+ARRAY_COLUMNS = ['High', 'Low', 'Close', 'ATR'] + TechnicalAnalyzer.SIGNAL_INPUTS
+
+# Arama uzayı: parametre -> (alt, üst) sınır
+PARAM_SPACE = {
+    'technical_buy_threshold': (0.1, 1.5),
+    'technical_sell_threshold': (-1.5, -0.1),
+    'rsi_oversold': (15, 40),
+    'rsi_weak_buy': (30, 50),
+    'rsi_weak_sell': (50, 70),
+    'rsi_overbought': (60, 85)
+}
+
+# Grid araması için varsayılan değerler (mevcut SIGNAL_CONFIG değerleri dahil)
+DEFAULT_GRID = {
+    'technical_buy_threshold': [0.2, 0.3, 0.5, 0.8],
+    'technical_sell_threshold': [-0.2, -0.3, -0.5, -0.8],
+    'rsi_oversold': [20, 25, 30, 35],
+    'rsi_weak_buy': [40, 45],
+    'rsi_weak_sell': [55, 60],
+    'rsi_overbought': [65, 70, 75, 80]
+}
+
+PARAM_NAMES = list(PARAM_SPACE)
+
+
+def is_valid_params(params: Dict) -> bool:
+    """RSI bölgeleri sıralı ve SELL eşiği BUY eşiğinin altında olmalı"""
+    return (params['rsi_oversold'] < params['rsi_weak_buy'] <= params['rsi_weak_sell'] < params['rsi_overbought']
+            and params['technical_sell_threshold'] < params['technical_buy_threshold'])
+
+
+def grid_trials(grid: Dict[str, List] = None) -> List[Dict]:
+    """Grid'in geçerli tüm kombinasyonları"""
+    grid = {**DEFAULT_GRID, **(grid or {})}
+    trials = (dict(zip(PARAM_NAMES, values)) for values in itertools.product(*(grid[p] for p in PARAM_NAMES)))
+    return [trial for trial in trials if is_valid_params(trial)]
+
+
+def random_trials(count: int, rng: np.random.Generator, space: Dict = None) -> List[Dict]:
+    """Arama uzayından düzgün dağılımlı geçerli denemeler"""
+    space = space or PARAM_SPACE
+    trials = []
+    attempts = 0
+    while len(trials) < count and attempts < count * 50:
+        attempts += 1
+        trial = {}
+        for name in PARAM_NAMES:
+            low, high = space[name]
+            value = rng.uniform(low, high)
+            trial[name] = round(value, 2) if name.startswith('technical') else round(value, 1)
+        if is_valid_params(trial):
+            trials.append(trial)
+    return trials
+
+
+class SharedIndicatorArrays:
+    """
+    Tüm sembollerin indikatör dizileri tek bir paylaşılan bellek bloğunda:
+    (len(ARRAY_COLUMNS), toplam bar) float64 matris + sembol başına bar aralığı.
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, shape: tuple,
+                 symbols: List[str], offsets: np.ndarray, owner: bool):
+        self.shm = shm
+        self.shape = shape
+        self.symbols = symbols
+        self.offsets = offsets
+        self.owner = owner
+        self.matrix = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+
+    @classmethod
+    def create(cls, blocks: Dict[str, np.ndarray]) -> 'SharedIndicatorArrays':
+        """Sembol bloklarını (kolon x bar) yeni bir paylaşılan belleğe kopyalar"""
+        symbols = list(blocks)
+        lengths = [blocks[s].shape[1] for s in symbols]
+        offsets = np.concatenate(([0], np.cumsum(lengths))).astype(np.int64)
+        shape = (len(ARRAY_COLUMNS), int(offsets[-1]))
+        shm = shared_memory.SharedMemory(create=True, size=max(1, int(np.prod(shape)) * 8))
+        shared = cls(shm, shape, symbols, offsets, owner=True)
+        for i, symbol in enumerate(symbols):
+            shared.matrix[:, offsets[i]:offsets[i + 1]] = blocks[symbol]
+        return shared
+
+    @classmethod
+    def attach(cls, meta: Dict) -> 'SharedIndicatorArrays':
+        """Worker tarafında mevcut belleğe bağlanır (kopya yok)"""
+        shm = shared_memory.SharedMemory(name=meta['name'])
+        return cls(shm, meta['shape'], meta['symbols'], meta['offsets'], owner=False)
+
+    @property
+    def meta(self) -> Dict:
+        return {'name': self.shm.name, 'shape': self.shape, 'symbols': self.symbols, 'offsets': self.offsets}
+
+    def symbol_arrays(self, index: int, start: int = 0, stop: int = None) -> Dict[str, np.ndarray]:
+        """Bir sembolün kolon görünümleri (isteğe bağlı bar aralığı)"""
+        begin = self.offsets[index]
+        end = self.offsets[index + 1]
+        stop = end - begin if stop is None else stop
+        block = self.matrix[:, begin + start:begin + stop]
+        return {column: block[row] for row, column in enumerate(ARRAY_COLUMNS)}
+
+    def close(self):
+        self.matrix = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+def _prepare_symbol(symbol: str, loader: Callable[[str], pd.DataFrame]) -> tuple:
+    """Process pool görevi - sembolün indikatör bloğu (kolon x bar) veya hata"""
+    try:
+        df = loader(symbol)
+        if df is None or df.empty:
+            return symbol, None, 'Veri yok'
+        frame = TechnicalAnalyzer().calculate_indicators(df, outputs=TechnicalAnalyzer.SIGNAL_INPUTS + ['ATR'])
+        block = np.vstack([frame[c].to_numpy(dtype=float) if c in frame.columns else np.full(len(frame), np.nan)
+                           for c in ARRAY_COLUMNS])
+        return symbol, block, None
+    except Exception as e:
+        return symbol, None, str(e)
+
+
+def precompute_indicators(symbols: Iterable[str], loader: Callable[[str], pd.DataFrame],
+                          processes: Optional[int] = None) -> SharedIndicatorArrays:
+    """İndikatörleri sembol başına bir kez (paralel) hesaplayıp paylaşılan belleğe yazar"""
+    symbols = list(symbols)
+    blocks = {}
+    if processes == 1:
+        results = (_prepare_symbol(symbol, loader) for symbol in symbols)
+    else:
+        executor = ProcessPoolExecutor(max_workers=processes)
+        futures = [executor.submit(_prepare_symbol, symbol, loader) for symbol in symbols]
+        results = (future.result() for future in as_completed(futures))
+    try:
+        for symbol, block, error in results:
+            if error:
+                logger.warning(f"{symbol} atlandı: {error}")
+            else:
+                blocks[symbol] = block
+    finally:
+        if processes != 1:
+            executor.shutdown()
+    # Giriş sırasını koru (as_completed sırası değil)
+    return SharedIndicatorArrays.create({s: blocks[s] for s in symbols if s in blocks})
+
+
+# Worker process durumu (pool initializer ile kurulur)
+_shared: Optional[SharedIndicatorArrays] = None
+
+
+def _init_worker(meta: Dict):
+    global _shared
+    _shared = SharedIndicatorArrays.attach(meta)
+
+
+def _segment_metrics(backtester: Backtester, arrays: Dict[str, np.ndarray], signal: np.ndarray) -> Dict:
+    return backtester.simulate({
+        'high': arrays['High'], 'low': arrays['Low'], 'close': arrays['Close'],
+        'atr': arrays['ATR'], 'signal': signal
+    })
+
+
+def evaluate_params(shared: SharedIndicatorArrays, params: Dict, train_fraction: float = 0.7,
+                    options: Dict = None) -> Dict:
+    """Tek parametre setini tüm sembollerde in-sample / out-of-sample backtest eder"""
+    backtester = Backtester(**(options or {}))
+    metrics = {'is': [], 'oos': []}
+    for index in range(len(shared.symbols)):
+        arrays = shared.symbol_arrays(index)
+        signal = score_signal_arrays(arrays, params)['signal']
+        split = int(len(signal) * train_fraction)
+        # İndikatörler nedensel: tüm seri üzerinde hesaplanıp bölünür
+        for segment, start, stop in (('is', 0, split), ('oos', split, len(signal))):
+            if stop - start < 2:
+                continue
+            segment_arrays = {c: v[start:stop] for c, v in arrays.items()}
+            metrics[segment].append(_segment_metrics(backtester, segment_arrays, signal[start:stop]))
+
+    row = dict(params)
+    for segment, results in metrics.items():
+        trades = sum(r['trades'] for r in results)
+        wins = sum(r['wins'] for r in results)
+        row[f'{segment}_return_pct'] = round(float(np.mean([r['return_pct'] for r in results])), 4) if results else 0.0
+        row[f'{segment}_max_drawdown_pct'] = max((r['max_drawdown_pct'] for r in results), default=0.0)
+        row[f'{segment}_hit_rate'] = round(wins / trades, 4) if trades else 0.0
+        row[f'{segment}_trades'] = trades
+    return row
+
+
+def _evaluate_chunk(trials: List[Dict], train_fraction: float, options: Dict) -> List[Dict]:
+    """Process pool görevi - hata denemeyle sınırlı kalır"""
+    rows = []
+    for params in trials:
+        try:
+            rows.append(evaluate_params(_shared, params, train_fraction, options))
+        except Exception as e:
+            rows.append({**params, 'error': str(e)})
+    return rows
+
+
+class SignalOptimizer:
+    """Paylaşılan indikatör dizileri üzerinde paralel parametre taraması"""
+
+    def __init__(self, shared: SharedIndicatorArrays, processes: Optional[int] = None,
+                 train_fraction: float = 0.7, chunk_size: int = 16, objective: str = 'is_return_pct',
+                 **options):
+        self.shared = shared
+        self.processes = processes
+        self.train_fraction = train_fraction
+        self.chunk_size = chunk_size
+        self.objective = objective  # Arama in-sample'ı optimize eder, sıralama out-of-sample ile
+        self.options = options      # Backtester argümanları (initial_balance, fee_rate)
+        self.results: List[Dict] = []
+        self._executor = None
+
+    def __enter__(self):
+        if self.processes != 1:
+            self._executor = ProcessPoolExecutor(max_workers=self.processes, initializer=_init_worker,
+                                                 initargs=(self.shared.meta,))
+        return self
+
+    def __exit__(self, *exc):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def evaluate(self, trials: List[Dict]) -> List[Dict]:
+        """Denemeleri parçalara bölüp worker'lara dağıtır"""
+        chunks = [trials[i:i + self.chunk_size] for i in range(0, len(trials), self.chunk_size)]
+        rows = []
+        if self._executor is None:
+            global _shared
+            _shared = self.shared
+            for chunk in chunks:
+                rows.extend(_evaluate_chunk(chunk, self.train_fraction, self.options))
+        else:
+            futures = [self._executor.submit(_evaluate_chunk, chunk, self.train_fraction, self.options)
+                       for chunk in chunks]
+            for future in as_completed(futures):
+                rows.extend(future.result())
+        self.results.extend(rows)
+        return rows
+
+    def grid_search(self, grid: Dict[str, List] = None) -> pd.DataFrame:
+        self.evaluate(grid_trials(grid))
+        return self.results_table()
+
+    def random_search(self, trials: int = 1000, seed: int = 42) -> pd.DataFrame:
+        self.evaluate(random_trials(trials, np.random.default_rng(seed)))
+        return self.results_table()
+
+    def bayesian_search(self, trials: int = 200, initial: int = 32, batch: int = 16,
+                        candidates: int = 2000, seed: int = 42) -> pd.DataFrame:
+        """
+        Gaussian process + expected improvement; her turda `batch` aday paralel değerlendirilir.
+        scikit-learn gerektirir (requirements.txt'de mevcut).
+        """
+        from scipy.stats import norm
+        from sklearn.gaussian_process import GaussianProcessRegressor
+        from sklearn.gaussian_process.kernels import Matern, WhiteKernel
+
+        rng = np.random.default_rng(seed)
+        lows = np.array([PARAM_SPACE[p][0] for p in PARAM_NAMES], dtype=float)
+        spans = np.array([PARAM_SPACE[p][1] - PARAM_SPACE[p][0] for p in PARAM_NAMES], dtype=float)
+
+        def encode(rows):
+            return (np.array([[row[p] for p in PARAM_NAMES] for row in rows], dtype=float) - lows) / spans
+
+        evaluated = self.evaluate(random_trials(min(initial, trials), rng))
+        while len(evaluated) < trials:
+            scored = [row for row in evaluated if 'error' not in row]
+            if len(scored) < 2:
+                evaluated += self.evaluate(random_trials(batch, rng))
+                continue
+            x = encode(scored)
+            y = np.array([row[self.objective] for row in scored], dtype=float)
+            gp = GaussianProcessRegressor(kernel=Matern(nu=2.5) + WhiteKernel(), normalize_y=True,
+                                          random_state=seed)
+            gp.fit(x, y)
+
+            pool = random_trials(candidates, rng)
+            mean, std = gp.predict(encode(pool), return_std=True)
+            std = np.maximum(std, 1e-9)
+            z = (mean - y.max()) / std
+            improvement = (mean - y.max()) * norm.cdf(z) + std * norm.pdf(z)
+            best = np.argsort(improvement)[::-1][:min(batch, trials - len(evaluated))]
+            evaluated += self.evaluate([pool[i] for i in best])
+        return self.results_table()
+
+    def results_table(self, sort_by: str = 'oos_return_pct') -> pd.DataFrame:
+        """Kompakt sonuç tablosu - out-of-sample metriğine göre sıralı, tekrar eden denemeler tekil"""
+        if not self.results:
+            return pd.DataFrame(columns=PARAM_NAMES)
+        table = pd.DataFrame(self.results).drop_duplicates(subset=PARAM_NAMES)
+        if sort_by in table.columns:
+            table = table.sort_values(sort_by, ascending=False, kind='stable')
+        return table.reset_index(drop=True)
+
+
+def main():
+    """Komut satırından parametre taraması"""
+    parser = argparse.ArgumentParser(description='Sinyal eşiği parametre taraması (grid / random / bayes)')
+    parser.add_argument('--bars-dir', required=True, help='{SYMBOL}.csv OHLCV dosyalarının dizini')
+    parser.add_argument('--symbols', nargs='*', help='Semboller (varsayılan: listing_status.csv)')
+    parser.add_argument('--limit', type=int, default=None, help='En fazla sembol sayısı')
+    parser.add_argument('--mode', choices=['grid', 'random', 'bayes'], default='random')
+    parser.add_argument('--trials', type=int, default=500, help='random/bayes deneme sayısı')
+    parser.add_argument('--train-fraction', type=float, default=0.7)
+    parser.add_argument('--processes', type=int, default=None, help='Process sayısı (varsayılan: CPU)')
+    parser.add_argument('--balance', type=float, default=10000.0)
+    parser.add_argument('--fee-rate', type=float, default=0.0)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', default='signal_sweep.csv', help='Sonuç tablosu (CSV)')
+    parser.add_argument('--top', type=int, default=10, help='Ekrana basılacak en iyi deneme sayısı')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    symbols = args.symbols or load_listing_symbols()
+    if args.limit:
+        symbols = symbols[:args.limit]
+
+    started = time.time()
+    print(f"🎛️ {len(symbols)} sembol için indikatörler hesaplanıyor...")
+    shared = precompute_indicators(symbols, CsvBarLoader(args.bars_dir), args.processes)
+    try:
+        print(f"📦 {len(shared.symbols)} sembol, {shared.shape[1]:,} bar paylaşılan bellekte "
+              f"({time.time() - started:.1f}s)")
+        with SignalOptimizer(shared, processes=args.processes, train_fraction=args.train_fraction,
+                             initial_balance=args.balance, fee_rate=args.fee_rate) as optimizer:
+            if args.mode == 'grid':
+                table = optimizer.grid_search()
+            elif args.mode == 'bayes':
+                table = optimizer.bayesian_search(trials=args.trials, seed=args.seed)
+            else:
+                table = optimizer.random_search(trials=args.trials, seed=args.seed)
+    finally:
+        shared.close()
+
+    table.to_csv(args.output, index=False, float_format='%.6g')
+    defaults = {p: SIGNAL_CONFIG[p] for p in PARAM_NAMES}
+    print(f"\n✅ {len(table)} deneme, {time.time() - started:.1f}s -> {args.output}")
+    print(f"Mevcut SIGNAL_CONFIG: {defaults}")
+    print(table.head(args.top).to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,409 @@
+"""
+⚡ Alpha Vantage Trading Framework - Streaming İndikatörler
+Her yeni bar için O(1) güncellenen, JSON'a serileştirilebilir indikatör durumları.
+
+Formüller `ta` kütüphanesiyle aynıdır (adjust=False EMA, Wilder RSI,
+ddof=0 Bollinger, Wilder ATR); böylece streaming yol ile tam yeniden hesaplama
+aynı değerleri üretir.
+"""
+
+import json
+import logging
+import math
+import os
+from collections import deque
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from constants import STREAMING_CONFIG
+
+NAN = float('nan')
+
+
+def _is_nan(value) -> bool:
+    return value is None or value != value
+
+
+class EMAState:
+    """Üstel hareketli ortalama - pandas `ewm(adjust=False)` ile birebir aynı"""
+
+    def __init__(self, window: int, alpha: float = None, min_periods: int = None):
+        self.window = window
+        self.alpha = alpha if alpha is not None else 2.0 / (window + 1)
+        self.min_periods = window if min_periods is None else min_periods
+        self.raw = NAN  # Maskelenmemiş değer (min_periods'tan önce de ilerler)
+        self.count = 0
+
+    @property
+    def value(self) -> float:
+        return self.raw if self.count >= self.min_periods else NAN
+
+    def update(self, x: float) -> float:
+        if _is_nan(x):
+            return self.value  # Baştaki NaN'lar pandas'ta da atlanır
+        self.count += 1
+        if _is_nan(self.raw):
+            self.raw = x
+        elif self.raw != x:
+            # pandas ewma döngüsüyle aynı sıralama (bit düzeyinde tutarlılık için)
+            old_wt = 1.0 - self.alpha
+            self.raw = (old_wt * self.raw + self.alpha * x) / (old_wt + self.alpha)
+        return self.value
+
+    def to_dict(self) -> Dict:
+        return {'window': self.window, 'alpha': self.alpha, 'min_periods': self.min_periods,
+                'raw': self.raw, 'count': self.count}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'EMAState':
+        state = cls(data['window'], data['alpha'], data['min_periods'])
+        state.raw = data['raw']
+        state.count = data['count']
+        return state
+
+
+class MACDState:
+    """MACD (12/26) ve sinyal hattı (9)"""
+
+    def __init__(self, fast: int = 12, slow: int = 26, signal: int = 9):
+        self.fast = EMAState(fast)
+        self.slow = EMAState(slow)
+        self.signal = EMAState(signal)
+        self.macd = NAN
+
+    def update(self, close: float) -> tuple:
+        fast = self.fast.update(close)
+        slow = self.slow.update(close)
+        self.macd = fast - slow
+        # Sinyal EMA'sı sadece geçerli MACD değerleriyle ilerler (baştaki NaN'lar atlanır)
+        return self.macd, self.signal.update(self.macd)
+
+    def to_dict(self) -> Dict:
+        return {'fast': self.fast.to_dict(), 'slow': self.slow.to_dict(),
+                'signal': self.signal.to_dict(), 'macd': self.macd}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'MACDState':
+        state = cls()
+        state.fast = EMAState.from_dict(data['fast'])
+        state.slow = EMAState.from_dict(data['slow'])
+        state.signal = EMAState.from_dict(data['signal'])
+        state.macd = data['macd']
+        return state
+
+
+class RSIState:
+    """Wilder RSI - `ta.momentum.RSIIndicator` ile aynı"""
+
+    def __init__(self, window: int = 14):
+        self.window = window
+        self.up = EMAState(window, alpha=1.0 / window)
+        self.down = EMAState(window, alpha=1.0 / window)
+        self.prev_close = NAN
+
+    def update(self, close: float) -> float:
+        diff = close - self.prev_close  # İlk barda NaN -> ta'da 0.0 sayılır
+        self.prev_close = close
+        up = self.up.update(diff if diff > 0 else 0.0)
+        down = self.down.update(-diff if diff < 0 else 0.0)
+        if down == 0:
+            return 100.0
+        return 100.0 - (100.0 / (1.0 + up / down))
+
+    def to_dict(self) -> Dict:
+        return {'window': self.window, 'up': self.up.to_dict(), 'down': self.down.to_dict(),
+                'prev_close': self.prev_close}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'RSIState':
+        state = cls(data['window'])
+        state.up = EMAState.from_dict(data['up'])
+        state.down = EMAState.from_dict(data['down'])
+        state.prev_close = data['prev_close']
+        return state
+
+
+class RollingStatsState:
+    """Kayan pencere ortalama/standart sapma (Welford ekle/çıkar, ddof=0)"""
+
+    def __init__(self, window: int = 20):
+        self.window = window
+        self.values = deque(maxlen=window)
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.removals = 0
+
+    def update(self, x: float) -> tuple:
+        if len(self.values) == self.window:
+            self._remove(self.values[0])
+        self.values.append(x)
+        n = len(self.values)
+        delta = x - self.mean
+        self.mean += delta / n
+        self.m2 += delta * (x - self.mean)
+
+        # Kayan toplamlarda birikecek yuvarlama hatasını periyodik olarak sıfırla
+        if self.removals >= self.window:
+            self._recompute()
+
+        if n < self.window:
+            return NAN, NAN
+        return self.mean, math.sqrt(max(self.m2, 0.0) / n)
+
+    def _remove(self, x: float):
+        n = len(self.values) - 1
+        self.removals += 1
+        if n == 0:
+            self.mean = 0.0
+            self.m2 = 0.0
+            return
+        delta = x - self.mean
+        self.mean -= delta / n
+        self.m2 -= delta * (x - self.mean)
+
+    def _recompute(self):
+        values = np.fromiter(self.values, dtype=float)
+        self.mean = float(values.mean())
+        self.m2 = float(((values - self.mean) ** 2).sum())
+        self.removals = 0
+
+    def to_dict(self) -> Dict:
+        return {'window': self.window, 'values': list(self.values)}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'RollingStatsState':
+        state = cls(data['window'])
+        state.values.extend(data['values'])
+        if state.values:
+            state._recompute()
+        return state
+
+
+class ATRState:
+    """Wilder ATR - `ta.volatility.AverageTrueRange` ile aynı (ilk pencere ortalamayla tohumlanır)"""
+
+    def __init__(self, window: int = 14):
+        self.window = window
+        self.prev_close = NAN
+        self.tr_sum = 0.0
+        self.count = 0
+        self.atr = 0.0  # ta ilk window-1 bar için 0 döndürür
+
+    def update(self, high: float, low: float, close: float) -> float:
+        tr = high - low
+        if not _is_nan(self.prev_close):
+            tr = max(tr, abs(high - self.prev_close), abs(low - self.prev_close))
+        self.prev_close = close
+        self.count += 1
+
+        if self.count < self.window:
+            self.tr_sum += tr
+        elif self.count == self.window:
+            self.atr = (self.tr_sum + tr) / self.window
+        else:
+            self.atr = (self.atr * (self.window - 1) + tr) / float(self.window)
+        return self.atr
+
+    def to_dict(self) -> Dict:
+        return {'window': self.window, 'prev_close': self.prev_close, 'tr_sum': self.tr_sum,
+                'count': self.count, 'atr': self.atr}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'ATRState':
+        state = cls(data['window'])
+        state.prev_close = data['prev_close']
+        state.tr_sum = data['tr_sum']
+        state.count = data['count']
+        state.atr = data['atr']
+        return state
+
+
+def _encode_timestamp(ts):
+    if isinstance(ts, (pd.Timestamp, datetime)):
+        return {'ts': pd.Timestamp(ts).isoformat()}
+    if isinstance(ts, np.integer):
+        return int(ts)
+    return ts
+
+
+def _decode_timestamp(value):
+    if isinstance(value, dict) and 'ts' in value:
+        return pd.Timestamp(value['ts'])
+    return value
+
+
+class StreamingIndicators:
+    """
+    Tek bir sembol/periyot için tüm indikatör durumları.
+
+    `TechnicalAnalyzer.calculate_indicators` ile aynı kolonları üretir. Son
+    `history_size` barın çıktıları saklanır; böylece streaming yol da tam bir
+    indikatör frame'i döndürebilir.
+    """
+
+    COLUMNS = ['EMA_5', 'EMA_13', 'EMA_50', 'EMA_200', 'MACD', 'MACD_Signal', 'RSI',
+               'BB_Upper', 'BB_Lower', 'BB_Middle', 'ATR', 'Volume_SMA']
+
+    def __init__(self, history_size: int = None):
+        self.history_size = history_size or STREAMING_CONFIG['history_size']
+        self.emas = {window: EMAState(window) for window in (5, 13, 50, 200)}
+        self.macd = MACDState()
+        self.rsi = RSIState(14)
+        self.bollinger = RollingStatsState(20)
+        self.atr = ATRState(14)
+        self.volume = RollingStatsState(20)
+        self.last_timestamp = None
+        self.last_close = NAN
+        self.bar_count = 0
+        self.history = deque(maxlen=self.history_size)
+
+    def update(self, timestamp, high: float, low: float, close: float,
+               volume: float = None) -> List[float]:
+        """Tek bir yeni barı işler ve o barın indikatör değerlerini döndürür"""
+        ema_values = [self.emas[window].update(close) for window in (5, 13, 50, 200)]
+        macd, macd_signal = self.macd.update(close)
+        rsi = self.rsi.update(close)
+        bb_middle, bb_std = self.bollinger.update(close)
+        atr = self.atr.update(high, low, close)
+        volume_sma = self.volume.update(volume)[0] if not _is_nan(volume) else NAN
+
+        row = ema_values + [
+            macd, macd_signal, rsi,
+            bb_middle + 2 * bb_std, bb_middle - 2 * bb_std, bb_middle,
+            atr, volume_sma
+        ]
+
+        self.last_timestamp = timestamp
+        self.last_close = close
+        self.bar_count += 1
+        self.history.append((timestamp, row))
+        return row
+
+    def update_frame(self, df: pd.DataFrame):
+        """Frame'deki barları sırayla işler (tohumlama ve yeni barlar için)"""
+        highs = df['High'].to_numpy(dtype=float)
+        lows = df['Low'].to_numpy(dtype=float)
+        closes = df['Close'].to_numpy(dtype=float)
+        volumes = df['Volume'].to_numpy(dtype=float) if 'Volume' in df.columns else None
+
+        for i, timestamp in enumerate(df.index):
+            self.update(timestamp, highs[i], lows[i], closes[i],
+                        volumes[i] if volumes is not None else None)
+
+    def find_new_bars(self, df: pd.DataFrame) -> Optional[pd.DataFrame]:
+        """
+        Frame sadece yeni bar eklenmişse o barları döndürür.
+        Boşluk (son bar yok) veya geriye dönük düzeltme varsa None -> tam hesaplama.
+        """
+        if self.last_timestamp is None or df.empty:
+            return None
+        if not df.index.is_monotonic_increasing:
+            return None
+
+        position = df.index.get_indexer([self.last_timestamp])[0]
+        if position < 0:
+            return None  # Boşluk veya backfill
+        if df['Close'].iloc[position] != self.last_close:
+            return None  # Son bar revize edilmiş
+        return df.iloc[position + 1:]
+
+    def to_frame(self, index: pd.Index) -> pd.DataFrame:
+        """Saklanan çıktıları verilen index'e hizalar (geçmişte olmayan barlar NaN)"""
+        timestamps = pd.Index([timestamp for timestamp, _ in self.history])
+        values = np.array([row for _, row in self.history], dtype=float).reshape(-1, len(self.COLUMNS))
+
+        positions = timestamps.get_indexer(index)
+        aligned = np.full((len(index), len(self.COLUMNS)), np.nan)
+        found = positions >= 0
+        aligned[found] = values[positions[found]]
+        return pd.DataFrame(aligned, index=index, columns=self.COLUMNS)
+
+    def to_dict(self) -> Dict:
+        return {
+            'history_size': self.history_size,
+            'emas': {str(window): state.to_dict() for window, state in self.emas.items()},
+            'macd': self.macd.to_dict(),
+            'rsi': self.rsi.to_dict(),
+            'bollinger': self.bollinger.to_dict(),
+            'atr': self.atr.to_dict(),
+            'volume': self.volume.to_dict(),
+            'last_timestamp': _encode_timestamp(self.last_timestamp),
+            'last_close': self.last_close,
+            'bar_count': self.bar_count,
+            'history': [[_encode_timestamp(timestamp), row] for timestamp, row in self.history]
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'StreamingIndicators':
+        state = cls(data['history_size'])
+        state.emas = {int(window): EMAState.from_dict(ema) for window, ema in data['emas'].items()}
+        state.macd = MACDState.from_dict(data['macd'])
+        state.rsi = RSIState.from_dict(data['rsi'])
+        state.bollinger = RollingStatsState.from_dict(data['bollinger'])
+        state.atr = ATRState.from_dict(data['atr'])
+        state.volume = RollingStatsState.from_dict(data['volume'])
+        state.last_timestamp = _decode_timestamp(data['last_timestamp'])
+        state.last_close = data['last_close']
+        state.bar_count = data['bar_count']
+        state.history.extend((_decode_timestamp(timestamp), row) for timestamp, row in data['history'])
+        return state
+
+
+class IndicatorStateStore:
+    """Sembol/periyot anahtarına göre streaming durumları - worker restart'larında diske yazılır"""
+
+    def __init__(self, history_size: int = None):
+        self.history_size = history_size
+        self.states: Dict[str, StreamingIndicators] = {}
+        self.logger = logging.getLogger(__name__)
+
+    def get(self, key: str) -> Optional[StreamingIndicators]:
+        return self.states.get(key)
+
+    def seed(self, key: str, df: pd.DataFrame) -> StreamingIndicators:
+        """Durumu sıfırdan kurar (boşluk/backfill sonrası tam hesaplamada kullanılır)"""
+        state = StreamingIndicators(self.history_size)
+        state.update_frame(df)
+        self.states[key] = state
+        return state
+
+    def discard(self, key: str):
+        self.states.pop(key, None)
+
+    def to_dict(self) -> Dict:
+        return {key: state.to_dict() for key, state in self.states.items()}
+
+    def save(self, path: str = None):
+        """Durumları atomik olarak JSON dosyasına yazar"""
+        path = path or STREAMING_CONFIG['state_path']
+        try:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"  # Aynı dosyayı yazan süreçler birbirinin tmp'sini ezmez
+            with open(tmp_path, 'w') as f:
+                json.dump(self.to_dict(), f)
+            os.replace(tmp_path, path)
+            self.logger.debug(f"💾 {len(self.states)} indikatör durumu kaydedildi: {path}")
+        except Exception as e:
+            self.logger.warning(f"⚠️ İndikatör durumu kaydedilemedi: {e}")
+
+    @classmethod
+    def load(cls, path: str = None, history_size: int = None) -> 'IndicatorStateStore':
+        """Kaydedilmiş durumları yükler; dosya yoksa veya bozuksa boş store döndürür"""
+        path = path or STREAMING_CONFIG['state_path']
+        store = cls(history_size)
+        if not os.path.exists(path):
+            return store
+        try:
+            with open(path) as f:
+                data = json.load(f)
+            store.states = {key: StreamingIndicators.from_dict(state) for key, state in data.items()}
+            store.logger.info(f"📂 {len(store.states)} indikatör durumu yüklendi: {path}")
+        except Exception as e:
+            store.logger.warning(f"⚠️ İndikatör durumu okunamadı, sıfırdan başlanacak: {e}")
+            store.states = {}
+        return store
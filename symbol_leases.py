@@ -0,0 +1,215 @@
+"""
+🧩 Alpha Vantage Trading Framework - Worker Sharding (DB Sembol Lease'leri)
+Birden fazla `worker: python worker.py` süreci / dyno'su aynı veritabanını paylaşır.
+Her sembol tek worker'da işlenir - API çağrıları ve yazımlar tekrarlanmaz:
+
+- Heartbeat: her worker döngü başında worker_leases satırını yeniler (expires_at);
+  süresi geçmemiş satırlar canlı worker kümesidir
+- Atama: canlı worker'lar üzerinde sanal düğümlü tutarlı hash halkası - worker eklenince /
+  düşünce sadece ~1/N sembol yer değiştirir
+- Lease: worker halkada kendisine düşen sembolleri symbol_leases tablosunda koşullu
+  upsert ile alır (sahipsiz, süresi geçmiş ya da zaten kendisinin). Halkada başkasına geçen
+  sembolleri hemen bırakır; ölen worker'ın lease'leri süre dolunca devralınır.
+  Halka görüşleri geçici olarak farklı olsa da bir sembolü aynı anda iki worker işlemez.
+- Lider: canlı worker'ların en küçük kimliklisi - tekil işler (korelasyon, retention,
+  briefing) sadece onda çalışır. Uzun işler renew() ile heartbeat'i iş boyunca tutar;
+  işlerin son çalışma zamanı worker_jobs tablosundadır (yeni lider işi tekrarlamaz)
+
+Worker kimliği WORKER_ID, yoksa DYNO (Heroku: worker.1, worker.2 - restart'ta aynı
+kalır, lease'ler beklemeden geri alınır), yoksa host-pid.
+"""
+
+import bisect
+import hashlib
+import logging
+import os
+import socket
+import time
+from typing import Dict, Iterable, List, Set
+
+from sqlalchemy import delete, or_, select, update
+from sqlalchemy.exc import IntegrityError
+
+from bulk_upsert import MAX_PARAMETERS, dialect_insert, upsert_rows
+from constants import SHARDING_CONFIG
+from web_app import SymbolLease, WorkerJob, WorkerLease
+
+logger = logging.getLogger(__name__)
+
+
+def default_worker_id() -> str:
+    return os.getenv('WORKER_ID') or os.getenv('DYNO') or f"{socket.gethostname()}-{os.getpid()}"
+
+
+def _hash(key: str) -> int:
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), 'big')
+
+
+class HashRing:
+    """Sanal düğümlü tutarlı hash halkası - anahtar saat yönündeki ilk düğümün worker'ına düşer"""
+
+    def __init__(self, workers: Iterable[str], virtual_nodes: int = 64):
+        points = sorted((_hash(f"{worker}#{replica}"), worker)
+                        for worker in set(workers) for replica in range(virtual_nodes))
+        self._positions = [position for position, _ in points]
+        self._workers = [worker for _, worker in points]
+
+    def owner(self, key: str) -> str:
+        if not self._positions:
+            return None
+        index = bisect.bisect(self._positions, _hash(key)) % len(self._positions)
+        return self._workers[index]
+
+
+class ShardCoordinator:
+    """
+    Tek worker sürecinin shard durumu: heartbeat, halka ve sembol lease'leri.
+    claim() döngü başına bir kez çağrılır (5-6 ifade, tek commit).
+    """
+
+    def __init__(self, worker_id: str = None, lease_seconds: int = None, virtual_nodes: int = None):
+        self.worker_id = worker_id or default_worker_id()
+        self.lease_seconds = lease_seconds or SHARDING_CONFIG['lease_seconds']
+        self.virtual_nodes = virtual_nodes or SHARDING_CONFIG['virtual_nodes']
+        self.started_at = int(time.time())
+        self.workers: List[str] = [self.worker_id]
+        self.owned: Set[str] = set()
+        self.released = 0
+        self.heartbeat_at = 0.0
+
+    @property
+    def is_leader(self) -> bool:
+        return bool(self.workers) and self.workers[0] == self.worker_id
+
+    def heartbeat(self, session, now: float = None) -> List[str]:
+        """worker_leases satırını yeniler, uzun süredir ölü satırları siler. Returns: canlı worker'lar (sıralı)"""
+        now = int(now or time.time())
+        table = WorkerLease.__table__
+        row = {'worker_id': self.worker_id, 'hostname': socket.gethostname(), 'started_at': self.started_at,
+               'expires_at': now + self.lease_seconds, 'symbol_count': len(self.owned)}
+        upsert_rows(session, table, [row], key='worker_id')
+        self.heartbeat_at = now
+        session.execute(delete(table).where(table.c.expires_at < now - self.lease_seconds))
+        self.workers = sorted(session.execute(select(table.c.worker_id)
+                                              .where(table.c.expires_at >= now)).scalars())
+        if self.worker_id not in self.workers:
+            self.workers = sorted(self.workers + [self.worker_id])
+        return self.workers
+
+    def renew(self, session, now: float = None) -> List[str]:
+        """
+        Uzun tekil işin ortasında: heartbeat + bu worker'ın geçerli sembol lease'leri uzatılır
+        (liderlik ve semboller iş sürerken el değiştirmez). Commit dahil.
+        """
+        now = int(now or time.time())
+        table = SymbolLease.__table__
+        try:
+            self.heartbeat(session, now)
+            session.execute(update(table).where(table.c.worker_id == self.worker_id, table.c.expires_at > now)
+                            .values(expires_at=now + self.lease_seconds))
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        return self.workers
+
+    def claim(self, session, symbols: Iterable[str], now: float = None) -> Set[str]:
+        """
+        Heartbeat + halkadaki payın lease'lerini alır / yeniler, başkasına geçenleri bırakır.
+        Returns: Bu döngüde bu worker'ın işleyeceği semboller (lease'i alınabilenler)
+        """
+        now = int(now or time.time())
+        symbols = set(symbols)
+        try:
+            self.heartbeat(session, now)
+            ring = HashRing(self.workers, self.virtual_nodes)
+            mine = sorted(symbol for symbol in symbols if ring.owner(symbol) == self.worker_id)
+            table = SymbolLease.__table__
+
+            # Halkada başkasına geçen (ya da evrenden çıkan) semboller: yeni sahip beklemeden alabilsin
+            self.released = session.execute(
+                update(table)
+                .where(table.c.worker_id == self.worker_id, table.c.expires_at >= now, table.c.symbol.not_in(mine))
+                .values(expires_at=now - 1)).rowcount
+
+            self._acquire(session, table, mine, now)
+            owned = session.execute(select(table.c.symbol).where(
+                table.c.worker_id == self.worker_id, table.c.expires_at > now)).scalars()
+            self.owned = set(owned) & symbols
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+
+        waiting = len(mine) - len(self.owned)
+        logger.info(f"🧩 Shard {self.worker_id}: {len(self.workers)} canlı worker, {len(self.owned)}/{len(symbols)} "
+                    f"sembol{f', {waiting} devir bekliyor' if waiting else ''}{' (lider)' if self.is_leader else ''}")
+        return self.owned
+
+    def _acquire(self, session, table, symbols: List[str], now: int):
+        """Sahipsiz, süresi geçmiş ya da zaten bu worker'ın olan lease'leri alır / uzatır"""
+        if not symbols:
+            return
+        expires_at = now + self.lease_seconds
+        claimable = or_(table.c.worker_id == self.worker_id, table.c.expires_at < now)
+        insert = dialect_insert(session, table)
+        if insert is None:
+            # ON CONFLICT yok: koşullu UPDATE + olmayanlara INSERT (yarışta kaybeden sonraki döngüde dener)
+            session.execute(update(table).where(table.c.symbol.in_(symbols), claimable)
+                            .values(worker_id=self.worker_id, expires_at=expires_at))
+            existing = set(session.execute(select(table.c.symbol).where(table.c.symbol.in_(symbols))).scalars())
+            missing = [{'symbol': symbol, 'worker_id': self.worker_id, 'expires_at': expires_at}
+                       for symbol in symbols if symbol not in existing]
+            if missing:
+                try:
+                    with session.begin_nested():
+                        session.execute(table.insert(), missing)
+                except IntegrityError:
+                    logger.debug("🧩 Lease ekleme yarışı - sonraki döngüde yeniden denenecek")
+            return
+        chunk = MAX_PARAMETERS // 3
+        for start in range(0, len(symbols), chunk):
+            stmt = insert.values([{'symbol': symbol, 'worker_id': self.worker_id, 'expires_at': expires_at}
+                                  for symbol in symbols[start:start + chunk]])
+            session.execute(stmt.on_conflict_do_update(
+                index_elements=['symbol'],
+                set_={'worker_id': stmt.excluded.worker_id, 'expires_at': stmt.excluded.expires_at},
+                where=claimable))
+
+    def release(self, session, now: float = None):
+        """Kapanışta: heartbeat satırı silinir, lease'ler hemen devralınabilir olur"""
+        now = int(now or time.time())
+        try:
+            session.execute(update(SymbolLease.__table__)
+                            .where(SymbolLease.__table__.c.worker_id == self.worker_id)
+                            .values(expires_at=now - 1))
+            session.execute(delete(WorkerLease.__table__).where(WorkerLease.__table__.c.worker_id == self.worker_id))
+            session.commit()
+            logger.info(f"🧩 Shard {self.worker_id}: lease'ler bırakıldı")
+        except Exception as e:
+            session.rollback()
+            logger.warning(f"⚠️ Lease bırakma hatası: {e}")
+        self.owned = set()
+
+    def get_stats(self) -> Dict:
+        return {
+            'worker_id': self.worker_id,
+            'workers': len(self.workers),
+            'leader': self.is_leader,
+            'owned_symbols': len(self.owned),
+            'released_last_cycle': self.released
+        }
+
+
+def job_last_run(session, name: str) -> int:
+    """Tekil işin son çalışma zamanı (epoch saniye, hiç çalışmadıysa 0)"""
+    table = WorkerJob.__table__
+    return session.execute(select(table.c.last_run).where(table.c.name == name)).scalar() or 0
+
+
+def record_job_run(session, name: str, last_run: float, worker_id: str = None):
+    """Tekil işin son çalışma zamanını yazar (başarısız iş için ileri tarihli yeniden deneme de olabilir)"""
+    upsert_rows(session, WorkerJob.__table__,
+                [{'name': name, 'last_run': int(last_run), 'worker_id': worker_id or default_worker_id()}],
+                key='name')
+    session.commit()
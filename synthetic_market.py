@@ -0,0 +1,261 @@
+"""
+🧪 Alpha Vantage Trading Framework - Sentetik Piyasa Simülatörü
+API'siz test ve ölçek denemeleri için vektörel, deterministik çoklu varlık piyasası.
+
+- Fiyatlar: faktör modelli korelasyonlu GBM (faktör korelasyonu Cholesky ile),
+  isteğe bağlı iki durumlu volatilite rejimi
+- Sembol başına deterministik tohum: bir sembolün verisi evrendeki diğer
+  sembollerden bağımsızdır; seri blok blok üretildiği için uzatınca geçmiş değişmez
+- Tutarlı emir defteri (son fiyat etrafında) ve son getirilere bağlı sentetik haber sentiment'i
+- Son fiyat sembol başına kümülatif getiriden devam eder: çağrı başına sadece yeni barlar üretilir
+"""
+
+import logging
+import zlib
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from order_book import OrderBook
+
+# Periyot -> (pandas frekansı, yıllık bar sayısı)
+TIMEFRAMES = {
+    '1m': ('1min', 252 * 390),
+    '5m': ('5min', 252 * 78),
+    '15m': ('15min', 252 * 26),
+    '1h': ('1h', 252 * 7),
+    '1d': ('1D', 252)
+}
+
+# Bar başına normal şok sayısı: getiri, high, low, hacim
+_SHOCKS_PER_BAR = 4
+
+logger = logging.getLogger(__name__)
+
+
+def _stable_hash(text: str) -> int:
+    """Süreçler arası sabit hash (Python hash() PYTHONHASHSEED'e bağlıdır)"""
+    return zlib.crc32(text.encode('utf-8'))
+
+
+class SyntheticMarket:
+    """
+    Korelasyonlu sentetik piyasa
+
+    Getiri: r_i = σ_i · (b_i · F + s_i · ε_i) · rejim; F ~ N(0, C) faktörler (C = L Lᵀ),
+    b_i sembolün faktör yüklemeleri, s_i birim varyansı tamamlayan özgün ölçek.
+    """
+
+    BLOCK = 4096  # Şok üretim bloğu (bar)
+
+    def __init__(self, seed: int = 42, n_factors: int = 4, factor_correlation: np.ndarray = None,
+                 regime_switch_prob: float = 0.0, high_vol_multiplier: float = 2.5,
+                 start: str = '2024-01-01', history_bars: int = 5000):
+        self.seed = seed
+        self.n_factors = n_factors
+        if factor_correlation is None:
+            # Varsayılan: faktörler arası 0.3 korelasyon
+            factor_correlation = np.full((n_factors, n_factors), 0.3)
+            np.fill_diagonal(factor_correlation, 1.0)
+        self.factor_correlation = np.asarray(factor_correlation, dtype=float)
+        self.factor_cholesky = np.linalg.cholesky(self.factor_correlation)
+        self.regime_switch_prob = regime_switch_prob
+        self.high_vol_multiplier = high_vol_multiplier
+        self.start = pd.Timestamp(start)
+        self.history_bars = history_bars
+        self.clock = 0  # advance() ile ilerleyen canlı bar sayısı
+        self._profiles: Dict[str, Dict] = {}
+        self._factor_cache: Dict[str, Tuple[int, np.ndarray, np.ndarray]] = {}  # periyot -> (blok, F, rejim)
+        self._price_state: Dict[str, Tuple[int, float]] = {}  # sembol -> (1m bar sayısı, kümülatif log getiri)
+        self._short_history: set = set()  # Uyarısı verilmiş (periyot, limit) istekleri
+
+    # ------------------------------------------------------------------ profil
+    def profile(self, symbol: str) -> Dict:
+        """Sembolün sabit parametreleri (fiyat seviyesi, volatilite, faktör yüklemeleri, hacim)"""
+        profile = self._profiles.get(symbol)
+        if profile is None:
+            rng = np.random.default_rng([self.seed, _stable_hash(symbol)])
+            loadings = np.zeros(self.n_factors)
+            loadings[0] = rng.uniform(0.3, 0.8)                       # Piyasa faktörü
+            if self.n_factors > 1:
+                loadings[1 + _stable_hash(symbol) % (self.n_factors - 1)] = rng.uniform(0.2, 0.5)  # Sektör
+            factor_variance = float(loadings @ self.factor_correlation @ loadings)
+            profile = {
+                'base_price': float(np.exp(rng.uniform(np.log(5), np.log(50000)))),
+                'annual_vol': float(rng.uniform(0.15, 0.8)),
+                'loadings': loadings,
+                'idio_scale': float(np.sqrt(max(1.0 - factor_variance, 0.05))),
+                'volume_scale': float(np.exp(rng.uniform(np.log(1e3), np.log(1e6)))),
+                'spread_bps': float(rng.uniform(1, 20))
+            }
+            self._profiles[symbol] = profile
+        return profile
+
+    # ------------------------------------------------------------------ şoklar
+    def _block_rng(self, *key) -> np.random.Generator:
+        return np.random.default_rng([self.seed, *key])
+
+    def _factors(self, timeframe: str, stop: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Korelasyonlu faktör getirileri (n_factors x stop) ve rejim vol çarpanı (stop,)"""
+        code = _stable_hash(timeframe)
+        blocks = -(-stop // self.BLOCK)
+        cached = self._factor_cache.get(timeframe)
+        if cached is None or cached[0] < blocks:
+            shocks = np.concatenate([
+                self._block_rng(0, code, block).standard_normal((self.n_factors, self.BLOCK))
+                for block in range(blocks)], axis=1)
+            factors = self.factor_cholesky @ shocks
+            regime = np.ones(shocks.shape[1])
+            if self.regime_switch_prob > 0:
+                # Simetrik iki durumlu Markov zinciri: her barda p olasılıkla rejim değişir
+                switches = np.concatenate([self._block_rng(4, code, block).random(self.BLOCK)
+                                           for block in range(blocks)]) < self.regime_switch_prob
+                regime = np.where(np.cumsum(switches) % 2 == 1, self.high_vol_multiplier, 1.0)
+            cached = (blocks, factors, regime)
+            self._factor_cache[timeframe] = cached
+        return cached[1][:, :stop], cached[2][:stop]
+
+    def _symbol_shocks(self, symbol: str, timeframe: str, stop: int, start: int = 0) -> np.ndarray:
+        """Sembolün [start, stop) barlarının özgün şokları (_SHOCKS_PER_BAR x bar) - sadece aralığın blokları üretilir"""
+        symbol_code = _stable_hash(symbol)
+        code = _stable_hash(timeframe)
+        first = start // self.BLOCK
+        blocks = -(-stop // self.BLOCK)
+        offset = first * self.BLOCK
+        return np.concatenate([
+            self._block_rng(1, symbol_code, code, block).standard_normal((_SHOCKS_PER_BAR, self.BLOCK))
+            for block in range(first, blocks)], axis=1)[:, start - offset:stop - offset]
+
+    # ------------------------------------------------------------------ barlar
+    def _stop(self) -> int:
+        return self.history_bars + self.clock
+
+    def bars(self, symbols: List[str], timeframe: str = '1m', limit: int = None,
+             chunk_size: int = 256) -> Dict[str, np.ndarray]:
+        """
+        Toplu OHLCV: (sembol x bar) diziler + 'index'. Tüm semboller aynı son bara hizalıdır.
+        limit -> son `limit` bar (mevcut geçmişle sınırlı). Bellek için semboller parça parça üretilir.
+        """
+        freq, bars_per_year = TIMEFRAMES.get(timeframe, TIMEFRAMES['1m'])
+        stop = self._stop()
+        length = stop if limit is None else min(limit, stop)
+        if limit is not None and limit > stop and (timeframe, limit) not in self._short_history:
+            self._short_history.add((timeframe, limit))
+            logger.warning(f"⚠️ Sentetik geçmiş yetersiz: {timeframe} {limit} bar istendi, {stop} bar var "
+                           f"(history_bars'ı artırın)")
+        factors, regime = self._factors(timeframe, stop)
+
+        chunks = [self._bars_chunk(symbols[i:i + chunk_size], timeframe, bars_per_year, stop, length,
+                                   factors, regime)
+                  for i in range(0, len(symbols), chunk_size)]
+        result = {name: np.concatenate([chunk[name] for chunk in chunks]) if chunks
+                  else np.zeros((0, length)) for name in ('open', 'high', 'low', 'close', 'volume', 'returns')}
+        result['index'] = pd.date_range(self.start, periods=stop, freq=freq)[stop - length:]
+        return result
+
+    def _bars_chunk(self, symbols: List[str], timeframe: str, bars_per_year: int, stop: int, length: int,
+                    factors: np.ndarray, regime: np.ndarray) -> Dict[str, np.ndarray]:
+        profiles = [self.profile(symbol) for symbol in symbols]
+        loadings = np.array([p['loadings'] for p in profiles])
+        idio = np.array([p['idio_scale'] for p in profiles])[:, None]
+        bar_vol = (np.array([p['annual_vol'] for p in profiles]) / np.sqrt(bars_per_year))[:, None]
+        base = np.array([p['base_price'] for p in profiles])[:, None]
+        volume_scale = np.array([p['volume_scale'] for p in profiles])[:, None]
+
+        shocks = np.stack([self._symbol_shocks(symbol, timeframe, stop) for symbol in symbols], axis=1)
+        sigma = bar_vol * regime[None, :]
+        log_returns = sigma * (loadings @ factors + idio * shocks[0]) - 0.5 * sigma ** 2
+
+        # Fiyat seviyesi geçmişin tamamından kümülatif; sadece istenen son kısım döner
+        window = slice(stop - length, stop)
+        log_close = (np.log(base) + np.cumsum(log_returns, axis=1))[:, window]
+        returns = log_returns[:, window]
+        close = np.exp(log_close)
+        open_ = np.exp(log_close - returns)
+        sigma = sigma[:, window]
+        high = np.maximum(open_, close) * np.exp(np.abs(shocks[1][:, window]) * sigma * 0.5)
+        low = np.minimum(open_, close) * np.exp(-np.abs(shocks[2][:, window]) * sigma * 0.5)
+        # Hacim: log-normal, büyük hareketlerde artar
+        volume = np.round(volume_scale * np.exp(0.3 * shocks[3][:, window])
+                          * (1 + np.abs(returns) / bar_vol)).astype(np.int64)
+        return {'open': open_, 'high': high, 'low': low, 'close': close, 'volume': volume, 'returns': returns}
+
+    def frame(self, symbol: str, timeframe: str = '1m', limit: int = None) -> pd.DataFrame:
+        """Tek sembol OHLCV frame'i (provider formatı, DatetimeIndex)"""
+        data = self.bars([symbol], timeframe, limit)
+        return pd.DataFrame({
+            'Open': data['open'][0],
+            'High': data['high'][0],
+            'Low': data['low'][0],
+            'Close': data['close'][0],
+            'Volume': data['volume'][0]
+        }, index=data['index'])
+
+    def advance(self, bars: int = 1):
+        """Canlı akış simülasyonu - tüm periyotlarda `bars` yeni bar (geçmiş değişmez)"""
+        self.clock += bars
+
+    def current_price(self, symbol: str) -> float:
+        """
+        Son 1m kapanış (bars() ile aynı değer). Önceki çağrının kümülatif log getirisinden devam
+        eder - geçmiş her çağrıda baştan üretilmez, sadece yeni barların blokları üretilir.
+        """
+        profile = self.profile(symbol)
+        stop = self._stop()
+        position, cumulative = self._price_state.get(symbol, (0, 0.0))
+        if position < stop:
+            factors, regime = self._factors('1m', stop)
+            shocks = self._symbol_shocks(symbol, '1m', stop, position)
+            bar_vol = np.array([profile['annual_vol']]) / np.sqrt(TIMEFRAMES['1m'][1])
+            sigma = bar_vol[:, None] * regime[None, position:stop]
+            log_returns = sigma * (profile['loadings'][None, :] @ factors[:, position:stop]
+                                   + profile['idio_scale'] * shocks[0][None, :]) - 0.5 * sigma ** 2
+            # Sıralı toplam: bars()'taki cumsum ile bit düzeyinde aynı
+            cumulative = float(np.cumsum(np.concatenate(([cumulative], log_returns[0])))[-1])
+            self._price_state[symbol] = (stop, cumulative)
+        return float(np.exp(np.log(profile['base_price']) + cumulative))
+
+    # ------------------------------------------------------------------ defter
+    def order_book(self, symbol: str, levels: int = 20) -> OrderBook:
+        """
+        Son fiyat etrafında L2 defter: spread sembol profilinden, seviye miktarları
+        derinlikle artar; dengesizlik son barların yönüyle tutarlıdır
+        """
+        profile = self.profile(symbol)
+        data = self.bars([symbol], '1m', 20)
+        price = float(data['close'][0, -1])
+        momentum = float(np.tanh(data['returns'][0].sum() / (profile['annual_vol'] / np.sqrt(252 * 390) * 4.5)))
+        rng = self._block_rng(2, _stable_hash(symbol), self._stop())
+
+        tick = price * profile['spread_bps'] / 10000
+        steps = np.arange(levels)
+        base_size = profile['volume_scale'] / 100 * (1 + 0.1 * steps) * rng.uniform(0.5, 1.5, (2, levels))
+        return OrderBook(
+            price - tick / 2 - steps * tick, base_size[0] * (1 + 0.3 * momentum),
+            price + tick / 2 + steps * tick, base_size[1] * (1 - 0.3 * momentum)
+        )
+
+    # ------------------------------------------------------------------ haber
+    def news_sentiment(self, symbols: Optional[List[str]] = None, limit: int = 50) -> Dict:
+        """AlphaVantageProvider.get_news_sentiment ile aynı formatta sentetik sentiment"""
+        symbols = symbols or []
+        if symbols:
+            data = self.bars(symbols, '1m', 60)
+            vol = np.array([self.profile(s)['annual_vol'] for s in symbols]) / np.sqrt(252 * 390)
+            z = data['returns'].sum(axis=1) / (vol * np.sqrt(60))
+        else:
+            z = np.zeros(1)
+        rng = self._block_rng(3, _stable_hash(','.join(sorted(symbols))), self._stop())
+        news_count = int(rng.integers(0, min(limit, 50) + 1))
+        scores = np.clip(0.35 * np.tanh(z.mean() / 2) + rng.normal(0, 0.15, news_count), -1, 1)
+        labels = np.where(scores > 0.15, 'bullish', np.where(scores < -0.15, 'bearish', 'neutral'))
+        return {
+            'overall_sentiment': float(scores.mean()) if news_count else 0.0,
+            'news_count': news_count,
+            'sentiment_breakdown': {label: int((labels == label).sum()) for label in ('bullish', 'bearish', 'neutral')},
+            'top_news': [],
+            'last_updated': datetime.now().isoformat()
+        }
+
@@ -3,12 +3,22 @@
 import pandas as pd
 import numpy as np
 import logging
+import math
+import threading
 from abc import ABC, abstractmethod
 from datetime import datetime, timedelta
-import ta
-from typing import Dict, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Iterator, List, Optional, Tuple
 from enum import Enum
 
+from indicator_cache import IndicatorCache
+from frame_views import overlay_frame
+from order_book import OrderBook
+from synthetic_market import SyntheticMarket
+from indicator_graph import IndicatorGraph, DEFAULT_INDICATOR_GRAPH
+from profiling import StageProfile, profiling, stage
+from constants import SIGNAL_CONFIG
+
 class AssetType(Enum):
     CRYPTO = "crypto"
     FOREX = "forex" 
@@ -42,49 +52,85 @@ class DataProvider(ABC):
 class TechnicalAnalyzer:
     """Teknik analiz motoru - orijinal koddan esinlenildi"""
     
-    def __init__(self):
+    # calculate_indicators(outputs=None) ile hesaplanan standart kolonlar
+    DEFAULT_OUTPUTS = ['EMA_5', 'EMA_13', 'EMA_50', 'EMA_200', 'MACD', 'MACD_Signal', 'RSI',
+                       'BB_Upper', 'BB_Lower', 'BB_Middle', 'ATR', 'Volume_SMA']
+    
+    # generate_signal'ın okuduğu kolonlar
+    SIGNAL_INPUTS = ['EMA_5', 'EMA_13', 'EMA_50', 'MACD', 'MACD_Signal', 'RSI',
+                     'BB_Upper', 'BB_Lower', 'BB_Middle']
+    
+    # generate_signal eşikleri (varsayılanlar SIGNAL_CONFIG'ten)
+    SIGNAL_PARAMS = ['technical_buy_threshold', 'technical_sell_threshold', 'rsi_oversold',
+                     'rsi_weak_buy', 'rsi_weak_sell', 'rsi_overbought']
+    
+    def __init__(self, state_store=None, graph: IndicatorGraph = None, params: Dict = None):
         self.logger = logging.getLogger(__name__)
+        self.params = {name: SIGNAL_CONFIG[name] for name in self.SIGNAL_PARAMS}
+        self.params.update(params or {})
+        # Streaming indikatör durumları (opsiyonel) - key verilen çağrılarda kullanılır
+        self.state_store = state_store
+        # İndikatör düğümleri - sadece istenen çıktılar ve girdileri hesaplanır
+        self.graph = graph or DEFAULT_INDICATOR_GRAPH
+    
+    def calculate_indicators(self, df: pd.DataFrame, key: str = None,
+                             outputs: List[str] = None) -> pd.DataFrame:
+        """
+        Temel teknik indikatörleri hesaplar
+        
+        outputs verilirse sadece o kolonlar (ve bağımlılıkları) hesaplanır; frame'de
+        zaten bulunan kolonlar yeniden hesaplanmaz. Varsayılan DEFAULT_OUTPUTS.
+        
+        key (ör. 'AAPL:1m') verilirse ve frame'e sadece yeni bar eklenmişse
+        streaming durum O(1)/bar güncellenir; boşluk veya backfill varsa tam hesaplama yapılır.
+        Girdi frame (ör. provider cache'i) değiştirilmez; indikatörler ayrı bir katman
+        olarak tabanın üstüne eklenir (overlay_frame).
+        """
+        outputs = list(outputs) if outputs is not None else self.DEFAULT_OUTPUTS
+        use_streaming = key is not None and self.state_store is not None
+        
+        streamed = self._calculate_streaming(df, key) if use_streaming else None
+        if streamed is not None:
+            df = streamed
+        
+        missing = [column for column in outputs if column not in df.columns]
+        indicators = self.graph.compute(df, missing) if missing else {}
+        self.logger.debug(f"Teknik indikatörler hesaplandı: {list(indicators)}")
+        
+        # Streaming durumu tam hesaplamayla aynı barlardan yeniden tohumla
+        if use_streaming and streamed is None:
+            try:
+                self.state_store.seed(key, df)
+            except Exception as e:
+                self.logger.warning(f"{key} streaming durumu kurulamadı: {e}")
+                self.state_store.discard(key)
+        
+        return overlay_frame(df, indicators)
     
-    def calculate_indicators(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Temel teknik indikatörleri hesaplar"""
+    def _calculate_streaming(self, df: pd.DataFrame, key: str) -> Optional[pd.DataFrame]:
+        """Sadece yeni eklenen barları işler - uygun değilse None (tam hesaplama)"""
         try:
-            # Hareketli ortalamalar
-            df['EMA_5'] = ta.trend.EMAIndicator(close=df['Close'], window=5).ema_indicator()
-            df['EMA_13'] = ta.trend.EMAIndicator(close=df['Close'], window=13).ema_indicator()
-            df['EMA_50'] = ta.trend.EMAIndicator(close=df['Close'], window=50).ema_indicator()
-            df['EMA_200'] = ta.trend.EMAIndicator(close=df['Close'], window=200).ema_indicator()
-            
-            # MACD
-            df['MACD'] = ta.trend.MACD(close=df['Close']).macd()
-            df['MACD_Signal'] = ta.trend.MACD(close=df['Close']).macd_signal()
-            
-            # RSI
-            df['RSI'] = ta.momentum.RSIIndicator(close=df['Close'], window=14).rsi()
-            
-            # Bollinger Bantları
-            bb = ta.volatility.BollingerBands(close=df['Close'])
-            df['BB_Upper'] = bb.bollinger_hband()
-            df['BB_Lower'] = bb.bollinger_lband()
-            df['BB_Middle'] = bb.bollinger_mavg()
+            state = self.state_store.get(key)
+            if state is None:
+                return None
             
-            # ATR (Average True Range) - YENİ EKLEME
-            df['ATR'] = ta.volatility.AverageTrueRange(
-                high=df['High'], 
-                low=df['Low'], 
-                close=df['Close'], 
-                window=14
-            ).average_true_range()
+            new_bars = state.find_new_bars(df)
+            if new_bars is None:
+                self.logger.debug(f"{key}: Boşluk/backfill tespit edildi, tam hesaplama yapılıyor")
+                return None
             
-            # Volume indikatörleri
-            if 'Volume' in df.columns:
-                df['Volume_SMA'] = df['Volume'].rolling(window=20).mean()
+            state.update_frame(new_bars)
+            indicators = state.to_frame(df.index)
+            if 'Volume' not in df.columns:
+                indicators = indicators.drop(columns=['Volume_SMA'])
             
-            self.logger.debug("Teknik indikatörler hesaplandı")
-            return df
+            self.logger.debug(f"{key}: {len(new_bars)} yeni bar streaming ile işlendi")
+            return overlay_frame(df, indicators)
             
         except Exception as e:
-            self.logger.error(f"İndikatör hesaplama hatası: {e}")
-            return df
+            self.logger.warning(f"{key} streaming indikatör hatası, tam hesaplamaya geçiliyor: {e}")
+            self.state_store.discard(key)
+            return None
     
     def generate_signal(self, df: pd.DataFrame) -> Signal:
         """Teknik analiz sinyali üretir - İyileştirilmiş threshold'lar"""
@@ -136,13 +182,13 @@ class TechnicalAnalyzer:
         # RSI sinyali - Güvenli ve daha hassas
         try:
             if pd.notna(latest['RSI']):
-                if latest['RSI'] < 30:
+                if latest['RSI'] < self.params['rsi_oversold']:
                     signals.append(1)  # Aşırı satım - güçlü alım
-                elif latest['RSI'] > 70:
+                elif latest['RSI'] > self.params['rsi_overbought']:
                     signals.append(-1)  # Aşırı alım - güçlü satım
-                elif latest['RSI'] < 40:
+                elif latest['RSI'] < self.params['rsi_weak_buy']:
                     signals.append(0.5)  # Zayıf alım bölgesi
-                elif latest['RSI'] > 60:
+                elif latest['RSI'] > self.params['rsi_weak_sell']:
                     signals.append(-0.5)  # Zayıf satım bölgesi
                 else:
                     signals.append(0)  # Nötr bölge
@@ -174,42 +220,132 @@ class TechnicalAnalyzer:
         total_signal = sum(signals)
         
         # Çok hassas sinyal üretimi - gerçek trading için optimize edildi
-        if total_signal >= 0.3:  # 0.8'den 0.3'e düşürdük - çok daha kolay BUY
+        if total_signal >= self.params['technical_buy_threshold']:  # 0.8'den 0.3'e düşürdük - çok daha kolay BUY
             return Signal.BUY
-        elif total_signal <= -0.3:  # -0.8'den -0.3'e düşürdük - çok daha kolay SELL
+        elif total_signal <= self.params['technical_sell_threshold']:  # -0.8'den -0.3'e düşürdük - çok daha kolay SELL
             return Signal.SELL
         else:
             return Signal.HOLD
 
+    def generate_signal_series(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Tüm barlar için vektörel sinyal serisi (backtest / doğruluk takibi için)
+        
+        generate_signal ile aynı oylar ve eşikler; son bar için skor bit düzeyinde aynıdır.
+        Kolonlar: EMA_Vote, MACD_Vote, RSI_Vote, BB_Vote, Score, Signal
+        (Signal: 1=BUY, -1=SELL, 0=HOLD; ilk 49 bar generate_signal gibi HOLD)
+        """
+        n = len(df)
+        arrays = {}
+        for name in ['Close'] + self.SIGNAL_INPUTS:
+            if name in df.columns:
+                arrays[name] = df[name].to_numpy(dtype=float)
+            else:
+                arrays[name] = np.full(n, np.nan)  # Eksik kolon -> nötr oy (skaler yoldaki KeyError gibi)
+        
+        votes = score_signal_arrays(arrays, self.params)
+        return pd.DataFrame({
+            'EMA_Vote': votes['ema_vote'],
+            'MACD_Vote': votes['macd_vote'],
+            'RSI_Vote': votes['rsi_vote'],
+            'BB_Vote': votes['bb_vote'],
+            'Score': votes['score'],
+            'Signal': votes['signal']
+        }, index=df.index)
+
+
+def score_signal_arrays(arrays: Dict[str, np.ndarray], params: Dict) -> Dict[str, np.ndarray]:
+    """
+    generate_signal'ın vektörel çekirdeği - DataFrame olmadan NumPy dizileri üzerinde
+    (parametre taraması paylaşılan bellekteki dizilerle doğrudan çağırır)
+    """
+    close = arrays['Close']
+    ema_5, ema_13, ema_50 = arrays['EMA_5'], arrays['EMA_13'], arrays['EMA_50']
+    macd, macd_signal = arrays['MACD'], arrays['MACD_Signal']
+    rsi = arrays['RSI']
+    bb_upper, bb_lower, bb_middle = arrays['BB_Upper'], arrays['BB_Lower'], arrays['BB_Middle']
+    n = len(close)
+    
+    # Bir önceki barın MACD değerleri (ilk bar için NaN)
+    prev_macd = np.concatenate(([np.nan], macd[:-1])) if n else macd
+    prev_macd_signal = np.concatenate(([np.nan], macd_signal[:-1])) if n else macd_signal
+    
+    with np.errstate(invalid='ignore'):
+        # EMA trend oyu
+        ema_valid = ~(np.isnan(ema_5) | np.isnan(ema_13) | np.isnan(ema_50))
+        ema_vote = np.select(
+            [ema_valid & (ema_5 > ema_13) & (ema_13 > ema_50),
+             ema_valid & (ema_5 < ema_13) & (ema_13 < ema_50),
+             ema_valid & (ema_5 > ema_13),
+             ema_valid & (ema_5 < ema_13)],
+            [1.0, -1.0, 0.5, -0.5], default=0.0)
+        
+        # MACD oyu (cross için önceki bar gerekir)
+        macd_valid = ~(np.isnan(macd) | np.isnan(macd_signal) |
+                       np.isnan(prev_macd) | np.isnan(prev_macd_signal))
+        macd_vote = np.select(
+            [macd_valid & (macd > macd_signal) & (prev_macd <= prev_macd_signal),
+             macd_valid & (macd < macd_signal) & (prev_macd >= prev_macd_signal),
+             macd_valid & (macd > macd_signal),
+             macd_valid & (macd < macd_signal)],
+            [1.0, -1.0, 0.3, -0.3], default=0.0)
+        
+        # RSI oyu (NaN karşılaştırmaları False -> nötr)
+        rsi_vote = np.select(
+            [rsi < params['rsi_oversold'], rsi > params['rsi_overbought'],
+             rsi < params['rsi_weak_buy'], rsi > params['rsi_weak_sell']],
+            [1.0, -1.0, 0.5, -0.5], default=0.0)
+        
+        # Bollinger oyu
+        bb_valid = ~(np.isnan(close) | np.isnan(bb_lower) | np.isnan(bb_upper) | np.isnan(bb_middle))
+        bb_vote = np.select(
+            [bb_valid & (close < bb_lower),
+             bb_valid & (close > bb_upper),
+             bb_valid & (close < bb_middle),
+             bb_valid & (close > bb_middle)],
+            [1.0, -1.0, 0.2, -0.2], default=0.0)
+    
+    # Skaler yoldaki sum() ile aynı toplama sırası
+    score = ((ema_vote + macd_vote) + rsi_vote) + bb_vote
+    signal = np.where(score >= params['technical_buy_threshold'], 1,
+                      np.where(score <= params['technical_sell_threshold'], -1, 0)).astype(np.int8)
+    signal[:min(49, n)] = 0  # generate_signal: 50 bardan az veri -> HOLD
+    
+    return {
+        'ema_vote': ema_vote,
+        'macd_vote': macd_vote,
+        'rsi_vote': rsi_vote,
+        'bb_vote': bb_vote,
+        'score': score,
+        'signal': signal
+    }
+
 class MarketDepthAnalyzer:
-    """Market derinliği analizi - orijinal OrderBookAnalyzer'den esinlenildi"""
+    """Market derinliği analizi - orijinal OrderBookAnalyzer'den esinlenildi (NumPy L2 defter üstünde)"""
+    
+    LEVELS = 20  # Sinyalde kullanılan seviye sayısı
     
     def __init__(self):
         self.logger = logging.getLogger(__name__)
     
-    def analyze_depth(self, depth_data: Dict, threshold: float = 5.0) -> Signal:
-        """Market derinliği analizini yapar"""
+    def analyze_depth(self, depth_data, threshold: float = 5.0) -> Signal:
+        """Market derinliği analizini yapar - {'bids', 'asks'} sözlüğü veya OrderBook"""
         try:
-            if not depth_data or 'bids' not in depth_data or 'asks' not in depth_data:
-                return Signal.HOLD
-            
-            bids = depth_data['bids']
-            asks = depth_data['asks']
+            if isinstance(depth_data, OrderBook):
+                book = depth_data
+            else:
+                if not depth_data or 'bids' not in depth_data or 'asks' not in depth_data:
+                    return Signal.HOLD
+                book = OrderBook.from_depth(depth_data)
             
-            if not bids or not asks:
+            if not book.is_valid:
                 return Signal.HOLD
             
-            # Toplam bid ve ask hacimlerini hesapla
-            total_bids = sum([float(bid[1]) for bid in bids[:20]])  # İlk 20 seviye
-            total_asks = sum([float(ask[1]) for ask in asks[:20]])
-            
-            if total_asks == 0:
+            # İlk 20 seviyede bid/ask hacim yüzde farkı
+            percentage_diff = book.percentage_diff(self.LEVELS)
+            if not np.isfinite(percentage_diff):
                 return Signal.HOLD
             
-            # Yüzde farkı hesapla
-            difference = total_bids - total_asks
-            percentage_diff = (difference / total_asks) * 100
-            
             self.logger.debug(f"Market derinliği analizi: %{percentage_diff:.2f}")
             
             if percentage_diff > threshold:
@@ -222,42 +358,152 @@ class MarketDepthAnalyzer:
         except Exception as e:
             self.logger.error(f"Market derinliği analiz hatası: {e}")
             return Signal.HOLD
+    
+    def depth_metrics(self, depth_data, levels: int = None) -> Dict:
+        """Dengesizlik, ağırlıklı orta fiyat, mesafeye göre derinlik ve eğim"""
+        book = depth_data if isinstance(depth_data, OrderBook) else OrderBook.from_depth(depth_data or {})
+        return book.metrics(levels or self.LEVELS)
 
 class PredictionEngine:
-    """Tahmin motoru - basit trend analizi (ML modeli olmadan)"""
+    """
+    Tahmin motoru - basit trend analizi (ML modeli olmadan)
     
-    def __init__(self):
+    Sabit x (0..window-1) üzerinde en küçük kareler eğimi kapalı formdadır:
+    x momentleri pencere başına bir kez hesaplanır, eğim/kesişim/R² tüm
+    (sembol x bar) dizisi için tek vektörel işlemle çıkar.
+    
+    İsteğe bağlı online model (OnlineModelStore): anahtar verilirse sembolün RLS
+    modeli yeni barlarla güncellenir ve ısındıktan sonra tahmini o üretir.
+    """
+    
+    # Fiyat değişimi eşiği (%) - tahmin sinyali
+    SIGNAL_THRESHOLD_PCT = 0.5
+    
+    def __init__(self, online_models=None):
         self.logger = logging.getLogger(__name__)
+        self.online_models = online_models
+        self._x_moments: Dict[int, Tuple[np.ndarray, float]] = {}
     
-    def predict_price(self, df: pd.DataFrame, periods: int = 1) -> Tuple[float, Signal]:
-        """Basit trend analizi ile fiyat tahmini"""
-        if len(df) < 10:
-            current_price = df['Close'].iloc[-1]
-            return current_price, Signal.HOLD
+    def _moments(self, window: int) -> Tuple[np.ndarray, float]:
+        """Merkezlenmiş x ve Σ(x - x̄)² - pencere başına bir kez"""
+        if window not in self._x_moments:
+            x = np.arange(window, dtype=float)
+            centered = x - x.mean()
+            self._x_moments[window] = (centered, float(centered @ centered))
+        return self._x_moments[window]
+    
+    def rolling_regression(self, closes: np.ndarray, window: int = 10) -> Dict[str, np.ndarray]:
+        """
+        Her bar için son `window` kapanışın doğrusal regresyonu
+        
+        closes: (sembol x bar) veya tek boyutlu dizi. Dönen diziler aynı şekildedir;
+        ilk window-1 bar ve NaN içeren pencereler NaN'dır. Kesişim, pencerenin ilk barında x=0'a göredir.
+        """
+        closes = np.asarray(closes, dtype=float)
+        result = {name: np.full(closes.shape, np.nan) for name in ('slope', 'intercept', 'r2')}
+        if closes.shape[-1] < window:
+            return result
         
-        # Son 10 periyottan trend çıkar
-        recent_prices = df['Close'].tail(10).values
+        centered_x, sxx = self._moments(window)
+        windows = np.lib.stride_tricks.sliding_window_view(closes, window, axis=-1)
+        mean_y = windows.mean(axis=-1)
+        sxy = windows @ centered_x
+        syy = ((windows - mean_y[..., None]) ** 2).sum(axis=-1)
         
-        # Linear regression benzeri basit trend hesabı
-        x = np.arange(len(recent_prices))
-        slope = np.polyfit(x, recent_prices, 1)[0]
+        slope = sxy / sxx
+        with np.errstate(invalid='ignore', divide='ignore'):
+            r2 = np.where(syy > 0, sxy * sxy / (sxx * syy), 0.0)
+        result['slope'][..., window - 1:] = slope
+        result['intercept'][..., window - 1:] = mean_y - slope * (window - 1) / 2
+        result['r2'][..., window - 1:] = np.where(np.isnan(slope), np.nan, r2)
+        return result
+    
+    def predict_batch(self, closes: np.ndarray, windows: Tuple[int, ...] = (10,),
+                      horizons: Tuple[int, ...] = (1,)) -> Dict[Tuple[int, int], Dict[str, np.ndarray]]:
+        """
+        Tüm semboller için son bar trend tahmini - (pencere, ufuk) başına tek geçiş
         
-        current_price = df['Close'].iloc[-1]
-        predicted_price = current_price + (slope * periods)
+        closes: (sembol x bar), kısa seriler solda NaN ile doldurulmuş (bkz. stack_closes).
+        Dönen: {(window, horizon): {'predicted', 'change_pct', 'slope', 'r2', 'signal'}}
+        signal: 1=BUY, -1=SELL, 0=HOLD (yetersiz veri -> HOLD)
+        """
+        closes = np.atleast_2d(np.asarray(closes, dtype=float))
+        current = closes[:, -1]
+        results = {}
+        for window in windows:
+            # Sadece son pencere gerekir
+            fit = self.rolling_regression(closes[:, -window:], window)
+            slope, r2 = fit['slope'][:, -1], fit['r2'][:, -1]
+            for horizon in horizons:
+                predicted = current + slope * horizon
+                with np.errstate(invalid='ignore', divide='ignore'):
+                    change_pct = (predicted - current) / current * 100
+                signal = np.where(change_pct > self.SIGNAL_THRESHOLD_PCT, 1,
+                                  np.where(change_pct < -self.SIGNAL_THRESHOLD_PCT, -1, 0)).astype(np.int8)
+                results[(window, horizon)] = {
+                    'predicted': np.where(np.isnan(slope), current, predicted),
+                    'change_pct': change_pct,
+                    'slope': slope,
+                    'r2': r2,
+                    'signal': signal
+                }
+        return results
+    
+    @staticmethod
+    def stack_closes(series: List[np.ndarray], length: int) -> np.ndarray:
+        """Kapanış serilerini sağa hizalı (sembol x length) diziye dizer, eksik barlar NaN"""
+        stacked = np.full((len(series), length), np.nan)
+        for row, values in enumerate(series):
+            values = np.asarray(values, dtype=float)[-length:]
+            if len(values):
+                stacked[row, length - len(values):] = values
+        return stacked
+    
+    def predict_price(self, df: pd.DataFrame, periods: int = 1, key: str = None) -> Tuple[float, Signal]:
+        """Basit trend analizi (veya anahtar verilirse online model) ile fiyat tahmini"""
+        predicted_price, signal, _ = self.predict_with_confidence(df, periods, key)
+        return predicted_price, signal
+    
+    def predict_with_confidence(self, df: pd.DataFrame, periods: int = 1,
+                                key: str = None) -> Tuple[float, Signal, float]:
+        """
+        (tahmini fiyat, sinyal, güven 0..1)
+        Online model: güven = |beklenen getiri| / hata std. Trend: güven = 10 barlık R².
+        """
+        if key is not None and self.online_models is not None and len(df):
+            model = self.online_models.get(key)
+            model.sync(df)
+            if model.ready:
+                predicted_price, confidence = model.predict(periods)
+                price_change_pct = (predicted_price - model.last_close) / model.last_close * 100
+                signal = self.to_signal(int(price_change_pct > self.SIGNAL_THRESHOLD_PCT) -
+                                        int(price_change_pct < -self.SIGNAL_THRESHOLD_PCT))
+                self.logger.debug(f"Online tahmin: {predicted_price:.4f}, Değişim: %{price_change_pct:.2f}, "
+                                  f"Güven: {confidence:.2f}")
+                return predicted_price, signal, confidence
         
-        # Sinyal üret
-        price_change_pct = ((predicted_price - current_price) / current_price) * 100
+        return self._predict_trend(df, periods)
+    
+    def _predict_trend(self, df: pd.DataFrame, periods: int) -> Tuple[float, Signal, float]:
+        if len(df) < 10:
+            current_price = df['Close'].iloc[-1]
+            return current_price, Signal.HOLD, 0.0
         
-        if price_change_pct > 0.5:
-            signal = Signal.BUY
-        elif price_change_pct < -0.5:
-            signal = Signal.SELL
-        else:
-            signal = Signal.HOLD
+        # Son 10 periyottan trend çıkar (kapalı form eğim)
+        prediction = self.predict_batch(df['Close'].to_numpy(dtype=float)[-10:], windows=(10,),
+                                        horizons=(periods,))[(10, periods)]
+        predicted_price = float(prediction['predicted'][0])
+        price_change_pct = float(prediction['change_pct'][0])
+        signal = self.to_signal(prediction['signal'][0])
+        r2 = float(prediction['r2'][0])
         
         self.logger.debug(f"Fiyat tahmini: {predicted_price:.4f}, Değişim: %{price_change_pct:.2f}")
         
-        return predicted_price, signal
+        return predicted_price, signal, r2 if math.isfinite(r2) else 0.0
+    
+    @staticmethod
+    def to_signal(value: int) -> Signal:
+        return Signal.BUY if value > 0 else Signal.SELL if value < 0 else Signal.HOLD
 
 class RiskManager:
     """Risk yönetimi - orijinal TradeManager'den esinlenildi"""
@@ -299,13 +545,24 @@ class RiskManager:
 class UniversalTradingBot:
     """Ana trading bot sınıfı - tüm bileşenleri birleştirir"""
     
-    def __init__(self, data_provider: DataProvider, asset_type: AssetType):
+    # analyze_symbol'ın istediği (periyot, bar) geçmişleri - toplu ön yükleme için
+    PREFETCH_HISTORY = [('1m', 500), ('15m', 200), ('1m', 100)]
+    
+    def __init__(self, data_provider: DataProvider, asset_type: AssetType, indicator_state=None,
+                 indicator_cache: IndicatorCache = None, prediction_state=None, profile: bool = False):
         self.data_provider = data_provider
         self.asset_type = asset_type
-        self.technical_analyzer = TechnicalAnalyzer()
+        self.technical_analyzer = TechnicalAnalyzer(state_store=indicator_state)
+        # Worker birden fazla bot arasında paylaşılan cache verebilir
+        self.indicator_cache = indicator_cache if indicator_cache is not None else IndicatorCache()
         self.depth_analyzer = MarketDepthAnalyzer()
-        self.prediction_engine = PredictionEngine()
+        self.prediction_engine = PredictionEngine(online_models=prediction_state)
+        self._batch_predictions: Dict[str, Tuple[tuple, Signal]] = {}  # sembol -> (veri anahtarı, sinyal)
+        self._batch_lock = threading.Lock()  # predict_many (ön yükleme / fetch thread'leri) ve analiz thread'leri
         self.risk_manager = RiskManager()
+        # Profil modu: analiz sonucuna 'timings' eklenir, ön yükleme ayrı profilde toplanır
+        self.profile = profile
+        self.prefetch_profile = StageProfile() if profile else None
         
         self.logger = logging.getLogger(__name__)
         # self.logger.info(f"UniversalTradingBot başlatıldı - Varlık türü: {asset_type.value}")  # Disabled for Railway
@@ -314,27 +571,44 @@ class UniversalTradingBot:
         """
         Ana analiz fonksiyonu - tüm sinyalleri birleştirir
         None döndürme durumları net şekilde raporlar
+        
+        Profil modunda sonuca 'timings' eklenir: aşama başına süre (ms), ağ çağrısı,
+        rate limit beklemesi, cache isabet/ıskası ve DB sorgu sayısı.
         """
+        if not self.profile:
+            return self._analyze_symbol(symbol, timeframe)
+        with profiling() as profile:
+            result = self._analyze_symbol(symbol, timeframe)
+        result['timings'] = profile.to_dict()
+        return result
+    
+    def _analyze_symbol(self, symbol: str, timeframe: str) -> Dict:
         try:
-            current_price = self.data_provider.get_current_price(symbol)
+            with stage('price'):
+                current_price = self.data_provider.get_current_price(symbol)
             
             # 1. Teknik analiz sinyalleri
-            tech_signal_short = self._get_technical_signal(symbol, '1m')
-            tech_signal_long = self._get_technical_signal(symbol, '15m')
+            with stage('technical_short'):
+                tech_signal_short = self._get_technical_signal(symbol, '1m')
+            with stage('technical_long'):
+                tech_signal_long = self._get_technical_signal(symbol, '15m')
             
             # 2. Basit trend tahmini
-            prediction_signal = self._get_prediction_signal(symbol)
+            with stage('prediction'):
+                prediction_signal = self._get_prediction_signal(symbol)
             
             # 3. Market derinliği analizi
-            depth_signal = self._get_market_depth_signal(symbol)
+            with stage('depth'):
+                depth_signal = self._get_market_depth_signal(symbol)
             
             # 4. Korelasyon analizi (eğer provider destekliyorsa)
             correlation_signal = Signal.HOLD
             if hasattr(self.data_provider, 'get_correlation_signal'):
-                try:
-                    correlation_signal = self.data_provider.get_correlation_signal(symbol, tech_signal_long)
-                except:
-                    correlation_signal = Signal.HOLD
+                with stage('correlation'):
+                    try:
+                        correlation_signal = self.data_provider.get_correlation_signal(symbol, tech_signal_long)
+                    except:
+                        correlation_signal = Signal.HOLD
                     
             # 5. Final karar - artık None dönebilir
             final_signal = self._combine_signals(
@@ -364,8 +638,9 @@ class UniversalTradingBot:
                 }
             
             # Risk yönetimi
-            atr = self._calculate_atr(symbol)
-            stop_loss, take_profit = self._calculate_risk_levels(current_price, final_signal, atr)
+            with stage('risk'):
+                atr = self._calculate_atr(symbol)
+                stop_loss, take_profit = self._calculate_risk_levels(current_price, final_signal, atr)
             
             return {
                 'symbol': symbol,
@@ -391,6 +666,86 @@ class UniversalTradingBot:
                 'timestamp': datetime.now().isoformat()
             }
 
+    def analyze_many(self, symbols: List[str], timeframe: str = '1m', max_workers: int = 4,
+                     prefetch_batch: int = 10) -> Iterator[Dict]:
+        """
+        Çoklu sembol analizi - sonuçlar her sembol bittiğinde akış olarak döner
+        
+        Semboller `prefetch_batch`'lik gruplar halinde toplu ön yüklenir (fiyat, bar,
+        sentiment) ve grubun regresyon tahmini dağıtımdan önce tek vektörel geçişte yapılır;
+        analiz aşamaları thread havuzunda cache'ten çalışır, bu sırada sonraki grubun verisi
+        çekilir. Thread'ler sadece I/O'yu (API / DB beklemesi) örtüştürür - CPU'ya bağlı indikatör
+        ve regresyon adımları GIL nedeniyle sıralı çalışır, max_workers onları hızlandırmaz. Her sonuç analyze_symbol'ın döndürdüğü sözlüktür
+        (hatalar sembolle sınırlı, aynı 'error' / 'error_type' formatında). Sıra garanti değildir.
+        Profil modunda ön yükleme ve toplu tahmin süreleri `prefetch_profile`'da birikir.
+        """
+        symbols = list(dict.fromkeys(symbols))  # Tekrarları at, sırayı koru
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            pending = set()
+            for start in range(0, len(symbols), prefetch_batch):
+                batch = symbols[start:start + prefetch_batch]
+                # Generator thread'inde: profil yield'ler arasında açık kalmaz
+                with profiling(self.profile, self.prefetch_profile):
+                    with stage('prefetch'):
+                        self.prefetch(batch)
+                    with stage('batch_prediction'):
+                        self.predict_many(batch)
+                pending.update(executor.submit(self.analyze_symbol, symbol, timeframe) for symbol in batch)
+                
+                # Ön yükleme sırasında biten analizleri hemen ver
+                done = {future for future in pending if future.done()}
+                pending -= done
+                for future in done:
+                    yield future.result()
+            
+            for future in as_completed(pending):
+                yield future.result()
+    
+    def predict_many(self, symbols: List[str]) -> Dict[str, Signal]:
+        """
+        Sembol grubunun trend tahmini tek vektörel geçişte - _get_prediction_signal bunları kullanır
+        Verisi alınamayan semboller atlanır (analyze_symbol kendi hatasını raporlar).
+        Online model kullanılıyorsa tahmin sembol başına modelden gelir, toplu yol atlanır.
+        """
+        if self.prediction_engine.online_models is not None:
+            return {}
+        
+        frames = {}
+        for symbol in symbols:
+            try:
+                df = self.data_provider.get_historical_data(symbol, '1m', 100)
+                if len(df) >= 10:
+                    frames[symbol] = df
+            except Exception as e:
+                self.logger.debug(f"{symbol} toplu tahmin dışı: {e}")
+        if not frames:
+            return {}
+        
+        closes = PredictionEngine.stack_closes([df['Close'].to_numpy() for df in frames.values()], 10)
+        signals = self.prediction_engine.predict_batch(closes)[(10, 1)]['signal']
+        predictions = {}
+        for symbol, df, value in zip(frames, frames.values(), signals):
+            predictions[symbol] = PredictionEngine.to_signal(value)
+        with self._batch_lock:
+            for symbol, df in frames.items():
+                self._batch_predictions[symbol] = (self._prediction_key(df), predictions[symbol])
+        return predictions
+    
+    @staticmethod
+    def _prediction_key(df: pd.DataFrame) -> tuple:
+        return (len(df), df.index[-1], float(df['Close'].iloc[-1]))
+    
+    def prefetch(self, symbols: List[str]) -> Dict[str, str]:
+        """Provider destekliyorsa analyze_symbol verisini toplu ön yükler - {sembol: hata} döner"""
+        if not hasattr(self.data_provider, 'prefetch'):
+            return {}
+        try:
+            return self.data_provider.prefetch(symbols, history=self.PREFETCH_HISTORY)
+        except Exception as e:
+            # Ön yükleme sadece hızlandırır; analiz her sembolü kendisi çeker
+            self.logger.warning(f"⚠️ Ön yükleme hatası: {e}")
+            return {}
+
     def _combine_signals(self, tech_short: Signal, tech_long: Signal, 
                         pred: Signal, depth: Signal, correlation: Signal = Signal.HOLD) -> Signal:
         """
@@ -420,7 +775,7 @@ class UniversalTradingBot:
         sell_count = valid_signals.count(Signal.SELL)
         
         # Korelasyon ağırlıklandırması (varsa)
-        correlation_weight = 0.5
+        correlation_weight = SIGNAL_CONFIG['correlation_weight']
         if correlation == Signal.BUY:
             buy_count += correlation_weight
         elif correlation == Signal.SELL:
@@ -437,17 +792,40 @@ class UniversalTradingBot:
         else:
             return Signal.HOLD
     
+    def _get_indicator_frame(self, symbol: str, timeframe: str, limit: int,
+                             outputs: List[str] = None) -> pd.DataFrame:
+        """
+        İndikatörlü frame döndürür - (sembol, periyot, son bar, bar sayısı) değişmediyse cache'ten
+        
+        Sadece `outputs` kolonları garanti edilir; cache'teki frame'de eksik olanlar
+        onun üstüne hesaplanır. Dönen frame salt okunurdur; boş veri boş frame olarak döner.
+        """
+        df = self.data_provider.get_historical_data(symbol, timeframe, limit)
+        if df.empty:
+            return df
+        
+        outputs = outputs or TechnicalAnalyzer.DEFAULT_OUTPUTS
+        cache_key = self.indicator_cache.make_key(symbol, timeframe, df)
+        cached = self.indicator_cache.get(cache_key)
+        if cached is not None:
+            if all(column in cached.columns for column in outputs):
+                return cached
+            df = cached  # Hesaplanmış kolonlar paylaşılır, sadece eksikler eklenir
+        
+        df = self.technical_analyzer.calculate_indicators(df, key=f"{symbol}:{timeframe}", outputs=outputs)
+        return self.indicator_cache.put(cache_key, df)
+    
     def _get_technical_signal(self, symbol: str, timeframe: str) -> Signal:
         """Teknik analiz sinyali üretir"""
         try:
             limit = 500 if timeframe == '1m' else 200
-            df = self.data_provider.get_historical_data(symbol, timeframe, limit)
+            df = self._get_indicator_frame(symbol, timeframe, limit,
+                                           outputs=TechnicalAnalyzer.SIGNAL_INPUTS)
             
             if df.empty:
                 self.logger.warning(f"⚠️ {symbol} {timeframe} - Veri boş")
                 return None  # HOLD değil None döndür
                 
-            df = self.technical_analyzer.calculate_indicators(df)
             return self.technical_analyzer.generate_signal(df)
             
         except Exception as e:
@@ -461,8 +839,14 @@ class UniversalTradingBot:
             if df.empty:
                 self.logger.warning(f"⚠️ {symbol} - Tahmin için veri boş")
                 return None
+            
+            # analyze_many toplu tahmini aynı veri için hazırsa tekrar hesaplanmaz
+            with self._batch_lock:
+                batch = self._batch_predictions.pop(symbol, None)
+            if batch is not None and batch[0] == self._prediction_key(df):
+                return batch[1]
                 
-            predicted_price, pred_signal = self.prediction_engine.predict_price(df)
+            predicted_price, pred_signal = self.prediction_engine.predict_price(df, key=f"{symbol}:1m")
             return pred_signal
             
         except Exception as e:
@@ -482,11 +866,10 @@ class UniversalTradingBot:
     def _calculate_atr(self, symbol: str) -> float:
         """ATR hesaplar"""
         try:
-            df = self.data_provider.get_historical_data(symbol, '1m', 100)
+            df = self._get_indicator_frame(symbol, '1m', 100, outputs=['ATR'])
             if df.empty or len(df) < 14:
                 return self.data_provider.get_current_price(symbol) * 0.02  # %2 fallback
                 
-            df = self.technical_analyzer.calculate_indicators(df)
             return df['ATR'].iloc[-1] if 'ATR' in df.columns else df['Close'].iloc[-1] * 0.02
             
         except Exception as e:
@@ -529,56 +912,23 @@ class UniversalTradingBot:
 
 # Örnek veri sağlayıcı implementasyonu
 class MockDataProvider(DataProvider):
-    """Test için sahte veri sağlayıcı"""
+    """
+    Test için sahte veri sağlayıcı - vektörel sentetik piyasa üstünde (bkz. synthetic_market)
+    Sembol başına deterministik, semboller arası korelasyonlu; advance() ile yeni bar akar.
+    """
+    
+    def __init__(self, market: SyntheticMarket = None):
+        self.market = market or SyntheticMarket()
     
     def get_historical_data(self, symbol: str, timeframe: str, limit: int) -> pd.DataFrame:
-        # Sahte veri üret
-        dates = pd.date_range(start='2024-01-01', periods=limit, freq='1min')
-        np.random.seed(42)
-        
-        price = 50000  # Başlangıç fiyatı
-        data = []
-        
-        for i, date in enumerate(dates):
-            # Daha gerçekçi volatilite - %1-2 arası
-            change = np.random.normal(0, 0.015)  # %1.5 volatilite (0.002'den 0.015'e)
-            price *= (1 + change)
-            
-            # Daha gerçekçi high/low spread
-            high_change = abs(np.random.normal(0, 0.008))  # %0.8 high spread
-            low_change = abs(np.random.normal(0, 0.008))   # %0.8 low spread
-            
-            high = price * (1 + high_change)
-            low = price * (1 - low_change)
-            volume = np.random.randint(1000, 10000)  # Daha yüksek volume
-            
-            data.append({
-                'Open': price,
-                'High': high,
-                'Low': low, 
-                'Close': price,
-                'Volume': volume,
-                'Timestamp': date
-            })
-        
-        return pd.DataFrame(data)
+        return self.market.frame(symbol, timeframe, limit)
     
     def get_current_price(self, symbol: str) -> float:
-        return 50000 + np.random.normal(0, 100)
+        return self.market.current_price(symbol)
     
     def get_market_depth(self, symbol: str) -> Dict:
-        # Sahte market derinliği
-        current_price = self.get_current_price(symbol)
-        
-        bids = []
-        asks = []
-        
-        for i in range(20):
-            bid_price = current_price - (i + 1) * 0.01
-            ask_price = current_price + (i + 1) * 0.01
-            volume = np.random.uniform(0.1, 5.0)
-            
-            bids.append([bid_price, volume])
-            asks.append([ask_price, volume])
-        
-        return {"bids": bids, "asks": asks} 
\ No newline at end of file
+        # Son fiyatla tutarlı 20 seviyeli defter ((N, 2) dizi formatı)
+        return self.market.order_book(symbol).to_depth()
+    
+    def get_news_sentiment(self, symbols: List[str] = None, limit: int = 50) -> Dict:
+        return self.market.news_sentiment(symbols, limit)
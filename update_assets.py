@@ -13,7 +13,7 @@ Listing_status.csv'den kaliteli varlıkları filtreler ve database'e kaydeder.
 import pandas as pd
 import os
 from datetime import datetime, timedelta
-from web_app import app, db, User, Watchlist, CachedData, CorrelationCache, Asset
+from web_app import app, db, User, Watchlist, CachedData, Asset
 
 def load_and_filter_assets():
     """listing_status.csv'den kaliteli varlıkları filtreler"""
@@ -99,19 +99,34 @@ class CachedData(db.Model):
             'error': self.error_message
         }
 
-class CorrelationCache(db.Model):
-    """Dinamik olarak hesaplanan korelasyon katsayılarını saklar"""
+class CorrelationSnapshot(db.Model):
+    """
+    Korelasyon matrisinin sürümlü ikili kopyası: float32 N×N matris + sembol dizini (npz).
+    Her hesaplama tek satır ekler; okuyucular en yüksek sürümü süreç başına bir kez yükler.
+    """
+    __tablename__ = 'correlation_snapshots'
+    
     id = db.Column(db.Integer, primary_key=True)
-    symbol_1 = db.Column(db.String(20), nullable=False, index=True)
-    symbol_2 = db.Column(db.String(20), nullable=False, index=True)
-    correlation_value = db.Column(db.Float, nullable=False)
-    last_updated = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    version = db.Column(db.Integer, unique=True, nullable=False, index=True)
+    symbol_count = db.Column(db.Integer, nullable=False)
+    data = db.Column(db.LargeBinary, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<CorrelationSnapshot v{self.version}: {self.symbol_count} sembol>'
 
-    # İki sembol çiftinin benzersiz olmasını sağlar
-    __table_args__ = (db.UniqueConstraint('symbol_1', 'symbol_2', name='_symbol_pair_uc'),)
+class CorrelationBar(db.Model):
+    """
+    Kayan korelasyon motorunun paylaşılan bar kuyrukları (15m kapanış) - her worker kendi
+    sembollerini yazar, lider motoru buradan besler. Son birkaç günün barları tutulur.
+    """
+    __tablename__ = 'correlation_bars'
 
-    def __repr__(self):
-        return f'<CorrelationCache {self.symbol_1}-{self.symbol_2}: {self.correlation_value:.3f}>'
+    symbol = db.Column(db.String(20), primary_key=True)
+    ts = db.Column(db.Integer, primary_key=True)           # Bar başlangıcı, epoch saniye
+    close = db.Column(db.Float, nullable=False)
+
+    __table_args__ = (db.Index('ix_correlation_bars_ts', 'ts'),)
 
 class Asset(db.Model):
     """Filtrelenmiş yüksek kaliteli varlık listesi"""
@@ -186,6 +201,67 @@ class DailyBriefing(db.Model):
             'timestamp': self.updated_at.isoformat() if self.updated_at else None
         }
 
+class SignalHistory(db.Model):
+    """
+    Append-only sinyal geçmişi - worker her döngüde sembol başına bir satır ekler.
+    Kompakt düzen: epoch saniye, sinyal/risk küçük tamsayı kodu (signal_history modülü çözer);
+    `day` (epoch gün) parçası retention / seyreltme silmelerini gün aralığına indirger.
+    """
+    __tablename__ = 'signal_history'
+    
+    id = db.Column(db.BigInteger().with_variant(db.Integer, 'sqlite'), primary_key=True)
+    symbol = db.Column(db.String(20), nullable=False)
+    ts = db.Column(db.Integer, nullable=False)          # Epoch saniye (UTC)
+    day = db.Column(db.Integer, nullable=False)         # ts // 86400
+    price = db.Column(db.Float, nullable=False)
+    signal = db.Column(db.SmallInteger, nullable=False)
+    sentiment = db.Column(db.REAL, nullable=True)
+    confidence_score = db.Column(db.REAL)
+    technical_strength = db.Column(db.REAL)
+    volume_score = db.Column(db.REAL)
+    momentum_score = db.Column(db.REAL)
+    risk_level = db.Column(db.SmallInteger)
+    
+    __table_args__ = (
+        db.Index('ix_signal_history_symbol_ts', 'symbol', 'ts'),
+        db.Index('ix_signal_history_day', 'day'),
+    )
+
+class WorkerLease(db.Model):
+    """
+    Canlı worker süreçleri - her döngüde expires_at ileri alınır (heartbeat).
+    Süresi geçen worker ölü sayılır; sembolleri hash halkasında kalan worker'lara dağılır.
+    """
+    __tablename__ = 'worker_leases'
+
+    worker_id = db.Column(db.String(100), primary_key=True)
+    hostname = db.Column(db.String(100))
+    started_at = db.Column(db.Integer, nullable=False)   # Epoch saniye (UTC)
+    expires_at = db.Column(db.Integer, nullable=False, index=True)
+    symbol_count = db.Column(db.Integer, default=0)
+
+class WorkerJob(db.Model):
+    """
+    Tekil worker işlerinin (korelasyon, retention) son çalışma zamanı - süreç değişkeni değil:
+    liderlik başka worker'a geçince iş vadesi gelmeden yeniden çalışmaz.
+    """
+    __tablename__ = 'worker_jobs'
+
+    name = db.Column(db.String(50), primary_key=True)
+    last_run = db.Column(db.Integer, nullable=False)      # Epoch saniye (UTC)
+    worker_id = db.Column(db.String(100))
+
+class SymbolLease(db.Model):
+    """
+    Sembol başına işleyen worker - süresi dolmamış lease'i başka worker devralamaz.
+    Sahip döngü başına lease'i yeniler; halkada sembol başka worker'a geçince bırakır.
+    """
+    __tablename__ = 'symbol_leases'
+
+    symbol = db.Column(db.String(20), primary_key=True)
+    worker_id = db.Column(db.String(100), nullable=False, index=True)
+    expires_at = db.Column(db.Integer, nullable=False)
+
 @login_manager.user_loader
 def load_user(user_id):
     return db.session.get(User, int(user_id))
@@ -665,6 +741,22 @@ def get_symbol_news(symbol):
         logging.error(f"Unexpected error in get_symbol_news for {symbol}: {e}")
         return jsonify({'error': f'Beklenmeyen hata: {str(e)}'}), 500
 
+@app.route('/api/signal-history/<symbol>')
+@login_required
+def get_signal_history(symbol):
+    """Sembolün sinyal / skor geçmişi (grafik için) - ?days=30"""
+    try:
+        import time
+        from signal_history import query_history
+        
+        days = min(max(request.args.get('days', 30, type=int), 1), 366)
+        end = time.time()
+        rows = query_history(db.session, symbol.upper(), end - days * 86400, end)
+        return jsonify({'symbol': symbol.upper(), 'days': days, 'count': len(rows), 'history': rows})
+    except Exception as e:
+        logging.error(f"Signal history error for {symbol}: {e}")
+        return jsonify({'error': f'Beklenmeyen hata: {str(e)}'}), 500
+
 # Initialize database
 def init_db():
     """Database'i başlat"""
@@ -6,25 +6,185 @@ Arka planda sürekli çalışarak veri güncelleme sistemi
 
 import time
 import os
+import re
+import signal as process_signal
 import logging
+from collections import Counter
 from datetime import datetime
 
 # Flask app ve modellerini import et
-from web_app import app, db, User, Watchlist, CachedData, CorrelationCache, Asset, DailyBriefing
+from web_app import app, db, User, Watchlist, CachedData, Asset, DailyBriefing
 from alphavantage_provider import AlphaVantageProvider
 from universal_trading_framework import UniversalTradingBot, AssetType
+from streaming_indicators import IndicatorStateStore
+from online_predictor import OnlineModelStore
+from indicator_cache import IndicatorCache
+from profiling import StageSummary, install_query_counter
+from worker_pipeline import WorkerPipeline, log_metrics
+from bulk_upsert import upsert_rows, update_rows
+from signal_history import append_history, apply_retention
+from rolling_correlation import RollingCorrelation
+from correlation_bars import save_bars, load_bars, prune_bars
+from bar_pyramid import TIMEFRAME_SECONDS
+from correlation_store import CorrelationMatrix, save_snapshot
+from blocked_correlation import blocked_correlation
+from refresh_scheduler import RefreshScheduler
+from market_calendar import get_market_calendar
+from symbol_leases import ShardCoordinator, job_last_run, record_job_run
 
 # Import configurations
-from constants import CORRELATION_CONFIG, API_CONFIG
+from constants import (CORRELATION_CONFIG, API_CONFIG, STREAMING_CONFIG, PREDICTION_CONFIG, PROFILING_CONFIG,
+                       SCHEDULER_CONFIG, MARKET_CALENDAR_CONFIG, SIGNAL_HISTORY_CONFIG, SHARDING_CONFIG)
 
 # Additional imports for correlation calculation
 import pandas as pd
-from sqlalchemy import text
+from sqlalchemy import text, update
 
 # Loglama kurulumu
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Streaming indikatör durumları - döngüler arasında bellekte, restart'larda diskte saklanır
+_indicator_state = None
+
+# Online tahmin modelleri (RLS) - indikatör durumlarıyla aynı yaşam döngüsü
+_prediction_state = None
+
+# Hesaplanmış indikatör frame'leri - değişmemiş veri döngüler arasında yeniden hesaplanmaz
+_indicator_cache = IndicatorCache()
+
+# Sistem provider'ı - bar piramitleri, cache ve rate budget döngüler arasında korunur
+_provider = None
+
+# Kayan korelasyon motoru - günlük tam hesapla kurulur, her döngüde yeni barlarla güncellenir
+_correlation_engine = RollingCorrelation(window=96 * CORRELATION_CONFIG['historical_days'],
+                                         min_periods=CORRELATION_CONFIG['min_data_points'],
+                                         max_lag=pd.Timedelta(hours=CORRELATION_CONFIG['rolling_max_lag_hours']),
+                                         interval=pd.Timedelta(seconds=TIMEFRAME_SECONDS[CORRELATION_CONFIG['timeframe']]))
+
+# Sembol başına yenileme aralıkları ve öncelikler (kapalı piyasadaki semboller seçilmez)
+_scheduler = RefreshScheduler(calendar=get_market_calendar() if MARKET_CALENDAR_CONFIG['enabled'] else None)
+
+# Son döngüde sembol başına ölçülen API çağrısı (zamanlayıcı bütçesi için)
+_calls_per_symbol = None
+
+# Çok worker'lı çalışmada bu sürecin sembol payı ve liderlik durumu (DB lease'leri)
+_shard = ShardCoordinator() if SHARDING_CONFIG['enabled'] else None
+
+def worker_state_path(path):
+    """
+    Sharding'de worker başına durum dosyası (instance/indicator_state.json ->
+    instance/indicator_state.worker.1.json) - aynı host'taki worker'lar birbirinin durumunu ezmez
+    """
+    if _shard is None:
+        return path
+    root, extension = os.path.splitext(path)
+    return f"{root}.{re.sub(r'[^A-Za-z0-9._-]', '_', _shard.worker_id)}{extension}"
+
+def get_indicator_state():
+    """Worker süreci için paylaşılan indikatör durum store'u (ilk çağrıda diskten yüklenir)"""
+    global _indicator_state
+    if _indicator_state is None:
+        _indicator_state = IndicatorStateStore.load(worker_state_path(STREAMING_CONFIG['state_path']))
+    return _indicator_state
+
+def get_prediction_state():
+    """
+    Worker süreci için paylaşılan online tahmin modeli store'u (ilk çağrıda diskten yüklenir)
+    online_enabled kapalıysa None - botlar toplu regresyon tahminini (predict_many) kullanır
+    """
+    global _prediction_state
+    if not PREDICTION_CONFIG['online_enabled']:
+        return None
+    if _prediction_state is None:
+        _prediction_state = OnlineModelStore.load(worker_state_path(PREDICTION_CONFIG['state_path']))
+    return _prediction_state
+
+def get_system_provider():
+    """Sistem API key'iyle süreç boyunca tek AlphaVantageProvider - key yoksa None"""
+    global _provider
+    if _provider is None:
+        # Merkezi sistem API key kullan (fallback to ALPHA_VANTAGE_KEY)
+        system_api_key = os.getenv('SYSTEM_ALPHA_VANTAGE_KEY') or os.getenv('ALPHA_VANTAGE_KEY')
+        if not system_api_key:
+            logger.error("❌ API anahtarı bulunamadı! (SYSTEM_ALPHA_VANTAGE_KEY veya ALPHA_VANTAGE_KEY)")
+            return None
+        _provider = AlphaVantageProvider(api_key=system_api_key, is_premium=True)
+        logger.info(f"🔑 Sistem API key kullanılıyor: {system_api_key[:8]}... (Premium: Real-time data)")
+    return _provider
+
+def refresh_shard():
+    """Heartbeat'i yeniler - tekil işlerden önce canlı worker kümesi (lider) güncel olsun"""
+    if _shard is None:
+        return
+    with app.app_context():
+        try:
+            _shard.heartbeat(db.session)
+            db.session.commit()
+        except Exception as e:
+            logger.error(f"❌ Worker heartbeat hatası: {e}")
+            db.session.rollback()
+
+def keep_shard_alive():
+    """
+    Uzun tekil işlerin içinden çağrılır: lease_seconds/3'te bir heartbeat + sembol lease'leri
+    yenilenir - iş lease süresini aşsa da liderlik ortasında başka worker'a geçmez
+    """
+    if _shard is None or time.time() - _shard.heartbeat_at < _shard.lease_seconds / 3:
+        return
+    with app.app_context():
+        try:
+            _shard.renew(db.session)
+        except Exception as e:
+            logger.error(f"❌ Worker heartbeat hatası: {e}")
+
+def job_due(name, interval):
+    """Tekil iş vadesi geldi mi - son çalışma DB'de (liderlik değişse de iş tekrarlanmaz)"""
+    with app.app_context():
+        return time.time() - job_last_run(db.session, name) > interval
+
+def record_job(name, last_run):
+    with app.app_context():
+        try:
+            record_job_run(db.session, name, last_run, _shard.worker_id if _shard is not None else None)
+        except Exception as e:
+            logger.error(f"❌ {name} iş zamanı kaydedilemedi: {e}")
+            db.session.rollback()
+
+def is_leader():
+    """Tekil işler (korelasyon, retention, briefing) sadece lider worker'da - sharding kapalıysa her zaman"""
+    return _shard is None or _shard.is_leader
+
+def release_shard():
+    """Kapanışta lease'leri bırak - sembolleri diğer worker'lar beklemeden devralır"""
+    if _shard is not None:
+        with app.app_context():
+            _shard.release(db.session)
+
+def schedule_cycle(provider, symbols_by_type, watcher_counts):
+    """
+    Zamanlayıcıdan bu döngünün sembolleri - öncelik sırasıyla (sembol, tür) listesi
+    Döngü başına sembol sayısı rate budget'ın cycle_seconds içinde izin verdiği kadardır.
+    """
+    symbols = {symbol: asset_type for asset_type, items in symbols_by_type.items() for symbol in items}
+    
+    # İlk kez görülen semboller: son başarılı güncelleme DB'den (restart sonrası hepsi birden yenilenmez)
+    new_symbols = [symbol for symbol in symbols if symbol not in _scheduler.states]
+    seed = {}
+    if new_symbols:
+        rows = CachedData.query.filter(CachedData.symbol.in_(new_symbols),
+                                       CachedData.error_message.is_(None)).all()
+        seed = {row.symbol: (row.last_updated.timestamp() if row.last_updated else 0.0, row.signal)
+                for row in rows}
+    _scheduler.sync_universe(symbols, watcher_counts, seed)
+    
+    limit = None
+    budget = getattr(provider, 'rate_budget', None)
+    if budget is not None:
+        calls_per_symbol = _calls_per_symbol or SCHEDULER_CONFIG['default_calls_per_symbol']
+        limit = max(1, int(budget.calls_per_minute * SCHEDULER_CONFIG['cycle_seconds'] / 60 / calls_per_symbol))
+    return _scheduler.select(limit)
+
 def get_asset_type(symbol, available_assets):
     """Sembol için doğru asset type'ı bul"""
     for asset_type, symbols in available_assets.items():
@@ -155,8 +315,26 @@ def get_active_symbols_from_db():
             from constants import AVAILABLE_ASSETS
             return AVAILABLE_ASSETS
 
+def compute_correlation_matrix(price_data, engine=None):
+    """
+    Kapanış serilerinden getiri korelasyon matrisi (DB'siz, benchmark edilebilir).
+    Verilen kayan motor bu serilerle yeniden kurulur (tam hesap); yoksa geçici motor kullanılır.
+    """
+    if engine is None:
+        engine = RollingCorrelation(window=max(len(series) for series in price_data.values()),
+                                    min_periods=CORRELATION_CONFIG['min_data_points'])
+    engine.rebuild(price_data)
+    return engine.matrix()
+
+def store_correlations(correlation_matrix):
+    """Matrisi (DataFrame / CorrelationMatrix) tek sürümlü ikili snapshot olarak yazar (evren boyutundan bağımsız tek INSERT)"""
+    return save_snapshot(db.session, correlation_matrix)
+
 def calculate_and_store_correlations(provider):
-    """Tüm varlıklar için korelasyon matrisini hesaplar ve veritabanına kaydeder"""
+    """
+    Tüm varlıklar için korelasyon matrisini tam geçmişten hesaplar (kayan motoru yeniden kurar)
+    ve veritabanına kaydeder - döngüler arasında motor update_rolling_correlations ile güncellenir
+    """
     logger.info("📈 Dinamik korelasyon hesaplaması başlıyor...")
     
     # Tüm sembolleri database'den al
@@ -170,25 +348,20 @@ def calculate_and_store_correlations(provider):
     logger.info(f"📊 Tarihsel veri çekiliyor ({len(all_symbols)} varlık)...")
     
     for symbol in all_symbols:
+        keep_shard_alive()  # Büyük evrende indirme lease süresini aşabilir
         try:
-            # 90 günlük veri al (daha stabil korelasyon için)
-            days_back = CORRELATION_CONFIG['historical_days']
-            # 15dk periyotlarla günlük data: 96 periyot/gün * 90 gün = 8640 periyot
-            data_points = 96 * days_back
-            
             df = provider.get_historical_data(symbol, 
                                             CORRELATION_CONFIG['timeframe'], 
-                                            data_points)
+                                            correlation_window())
             
             if not df.empty and len(df) >= CORRELATION_CONFIG['min_data_points']:
                 # Close fiyatları al
-                price_data[symbol] = df['Close'].ffill(limit=10).dropna()
+                price_data[symbol] = df['Close'].dropna()
                 logger.info(f"✅ {symbol}: {len(price_data[symbol])} veri noktası")
             else:
                 logger.warning(f"⚠️ {symbol}: Yetersiz veri ({len(df) if not df.empty else 0} nokta)")
             
-            # Rate limiting
-            time.sleep(1.5)
+            # Rate limiting provider'da: 15m barlar bar piramidinden gelir, taze seri için API çağrısı yapılmaz
             
         except Exception as e:
             logger.warning(f"❌ {symbol} korelasyon verisi alınamadı: {e}")
@@ -197,46 +370,28 @@ def calculate_and_store_correlations(provider):
         logger.error("❌ Korelasyon için yeterli veri toplanamadı.")
         return False
 
+    keep_shard_alive()
     try:
-        # Yüzdesel değişime göre korelasyon hesapla (daha stabil)
-        full_df = pd.DataFrame(price_data).pct_change(fill_method=None).dropna()
-        correlation_matrix = full_df.corr()
+        if len(price_data) > CORRELATION_CONFIG['blocked_min_symbols']:
+            # Büyük evren: bellek sınırlı bloklu hesap, bloklar doğrudan komşu indeksine yazılır.
+            # N×N kayan toplamlar bu boyutta tutulmaz - sonraki tam hesaba kadar snapshot sabit kalır.
+            result = blocked_correlation(price_data)
+            correlation_matrix = CorrelationMatrix(result['symbols'], result['matrix'], neighbors=result['neighbors'])
+            _correlation_engine.rebuild({})
+        else:
+            correlation_matrix = compute_correlation_matrix(price_data, _correlation_engine)
         
         logger.info("✅ Korelasyon matrisi hesaplandı. Veritabanına kaydediliyor...")
         
         # Flask app context içinde database işlemleri
         with app.app_context():
-            # Veritabenına kaydet
-            valid_correlations = 0
-            
-            # Önceki verileri temizle
-            CorrelationCache.query.delete()
-            
-            # Yeni verileri ekle
-            for symbol_1 in correlation_matrix.columns:
-                for symbol_2 in correlation_matrix.columns:
-                    if symbol_1 >= symbol_2:  # Tekrarlı çiftleri önle
-                        continue
-                    
-                    corr_value = correlation_matrix.loc[symbol_1, symbol_2]
-                    
-                    # NaN olmayan ve anlamlı korelasyonları kaydet
-                    if pd.notna(corr_value) and abs(corr_value) >= CORRELATION_CONFIG['correlation_threshold']:
-                        new_corr = CorrelationCache(
-                            symbol_1=symbol_1,
-                            symbol_2=symbol_2,
-                            correlation_value=float(corr_value)
-                        )
-                        db.session.add(new_corr)
-                        valid_correlations += 1
-            
-            db.session.commit()
-            logger.info(f"✅ {valid_correlations} anlamlı korelasyon veritabanına kaydedildi")
+            snapshot = store_correlations(correlation_matrix)
+            logger.info(f"✅ Korelasyon snapshot v{snapshot.version} kaydedildi: {len(snapshot)} sembol, "
+                        f"{snapshot.significant_pairs()} anlamlı korelasyon")
             
             # Örnek korelasyonları logla
-            sample_corrs = CorrelationCache.query.order_by(CorrelationCache.correlation_value.desc()).limit(5).all()
-            for corr in sample_corrs:
-                logger.info(f"📊 En yüksek korelasyon: {corr.symbol_1} ↔ {corr.symbol_2}: {corr.correlation_value:.3f}")
+            for symbol_1, symbol_2, value in snapshot.top_pairs(5):
+                logger.info(f"📊 En yüksek korelasyon: {symbol_1} ↔ {symbol_2}: {value:.3f}")
                 
         return True
         
@@ -246,20 +401,155 @@ def calculate_and_store_correlations(provider):
             db.session.rollback()
         return False
 
-def update_data_for_all_users():
-    """Tüm kullanıcıların watchlist'leri için veri güncelle"""
+def correlation_window():
+    """Pencere bar sayısı: 15dk periyotlarla günde 96 bar * historical_days (90 gün = 8640)"""
+    return 96 * CORRELATION_CONFIG['historical_days']
+
+def publish_correlation_bars(provider, symbols):
+    """
+    Döngüde işlenen sembollerin 15m kapanışları paylaşılan bar tablosuna (commit çağıranda) -
+    lider kayan motoru buradan besler. 15m türetilemeyen seriler (kripto 1d tabanı) yazılmaz.
+    """
+    timeframe = CORRELATION_CONFIG['timeframe']
+    pyramids = getattr(provider, 'pyramids', {})
+    closes = {}
+    for symbol in symbols:
+        pyramid = pyramids.get(symbol)
+        if pyramid is not None and len(pyramid) and pyramid.can_derive(timeframe):
+            closes[symbol] = pyramid.frame(timeframe)['Close']
+    return save_bars(db.session, closes, pd.Timedelta(hours=CORRELATION_CONFIG['bar_store_hours']))
+
+def update_rolling_correlations(provider):
+    """
+    Döngü başına: yeni kapanan barlar paylaşılan bar tablosundan (tüm worker'ların sembolleri,
+    API çağrısı yok) kayan motora eklenir; matris değiştiyse veritabanına yazılır.
+    Motor henüz kurulmadıysa (günlük tam hesap çalışmadı) bir şey yapmaz.
+    
+    Kuyruk motorun son satırından okunur (kısa boşluk tam hesaba düşmez); tabloda olmayan
+    seriler (kripto 1d tabanı) motorda tam hesaptaki değerleriyle kalır.
+    Kuyruk son işlenen bara ulaşmıyorsa (worker'lar uzun süre durdu) tam hesap yapılır.
+    
+    Returns: Eklenen bar satırı sayısı
+    """
+    if not _correlation_engine.symbols:
+        return 0
+    since = _correlation_engine.last_timestamp
+    if since is None:
+        return 0
+    with app.app_context():
+        closes = load_bars(db.session, _correlation_engine.symbols, since)
+        prune_bars(db.session, since - pd.Timedelta(hours=CORRELATION_CONFIG['bar_store_hours']))
+    
+    added = _correlation_engine.append(closes)
+    if added is None:
+        logger.info("🔗 Kayan korelasyon: bar boşluğu - tam hesap yapılıyor")
+        calculate_and_store_correlations(provider)
+        return 0
+    if added:
+        with app.app_context():
+            snapshot = store_correlations(_correlation_engine.matrix())
+        logger.info(f"🔗 Kayan korelasyon: {added} yeni bar, snapshot v{snapshot.version} kaydedildi")
+    return added
+
+def build_bots(provider, asset_types, profile=False):
+    """Varlık türü başına tek bot - indikatör durumu, frame cache'i ve tahmin modelleri paylaşılır"""
+    return {
+        asset_type: UniversalTradingBot(provider, asset_type,
+                                        indicator_state=get_indicator_state(),
+                                        indicator_cache=_indicator_cache,
+                                        prediction_state=get_prediction_state(),
+                                        profile=profile)
+        for asset_type in asset_types
+    }
+
+def score_analysis(provider, item):
+    """Pipeline score aşaması: fiyat + sentiment (ön yüklemeden cache'te) ve akıllı skorlar -> item['record']"""
+    symbol, analysis = item['symbol'], item['analysis']
+    price = provider.get_current_price(symbol)
+    
+    # Sentiment (sadece stocks için)
+    sentiment_score = None
+    if item['asset_type'] == AssetType.STOCKS:
+        try:
+            sentiment_data = provider.get_news_sentiment([symbol], limit=3)
+            sentiment_score = sentiment_data.get('overall_sentiment', 0)
+        except:
+            sentiment_score = 0
+    
+    # 🧠 Akıllı skorları hesapla
+    smart_scores = calculate_smart_scores(analysis, symbol)
+    item['record'] = {
+        'symbol': symbol,
+        'price': price,
+        'signal': analysis.get('final_signal', 'hold') if 'error' not in analysis else 'error',
+        'sentiment': sentiment_score,
+        **smart_scores
+    }
+
+def persist_items(items, data_type):
+    """
+    Pipeline persist aşaması: bir grup sonucu toplu yazar - başarılı kayıtlar tek upsert
+    (+ sinyal geçmişine tek INSERT), hata mesajları tek executemany, otomatik pasifleştirme
+    tek UPDATE; grup başına tek commit
+    
+    Returns: DB yazma ifadesi sayısı (commit dahil)
+    """
+    now = datetime.now()
+    rows, errors, deactivate = [], [], []
+    for item in items:
+        symbol = item['symbol']
+        record = item.get('record')
+        if record is None:
+            error_message = item.get('error', 'Analiz tamamlanamadı')
+            logger.error(f"❌ {symbol} için veri çekilemedi: {error_message}")
+            errors.append({'symbol': symbol, 'error_message': error_message, 'last_updated': now})
+            # AKILLI AUTO-DEACTIVATION: "Invalid API call" hatası varsa varlığı pasif yap
+            if "Invalid API call" in error_message:
+                deactivate.append(symbol)
+            continue
+        rows.append(dict(record, last_updated=now, error_message=None))
+        logger.info(f"✅ {symbol}: ${record['price']} | {record['signal']} ({data_type})")
+    
+    try:
+        writes = upsert_rows(db.session, CachedData.__table__, rows)
+        writes += append_history(db.session, [item['record'] for item in items if item.get('record')])
+        # Hata durumunda sadece mevcut satıra error kaydedilir (son iyi veri korunur)
+        writes += update_rows(db.session, CachedData.__table__, errors)
+        if deactivate:
+            db.session.execute(update(Asset).where(Asset.symbol.in_(deactivate)).values(is_active=False))
+            writes += 1
+            logger.info(f"🔧 {', '.join(deactivate)} otomatik pasif yapıldı (Invalid API call nedeniyle)")
+        db.session.commit()
+        logger.debug(f"📊 Batch upsert: {len(rows)} güncelleme, {len(errors)} hata, {writes + 1} DB ifadesi")
+        return writes + 1
+    except Exception:
+        db.session.rollback()  # Pipeline hatayı loglar, sonraki grup temiz session'la devam eder
+        raise
+
+def update_data_for_all_users(provider=None, profile=None, scheduled=None):
+    """
+    Tüm kullanıcıların watchlist'leri için veri güncelle
+    provider verilmezse sistem API key'iyle AlphaVantageProvider kurulur (benchmark sahte provider verir)
+    profile (varsayılan PROFILING_CONFIG['enabled']): aşama profili toplanır, loglanır ve 'profile' altında döner
+    scheduled (varsayılan SCHEDULER_CONFIG['enabled']): sadece vadesi gelen semboller öncelik sırasıyla;
+    False ise tüm semboller işlenir
+    
+    Returns: Pipeline metrikleri (sembol/dakika, aşama dolulukları) - döngü başlamadıysa boş sözlük
+    """
+    global _calls_per_symbol
     logger.info("🚀 Background Worker: Veri güncelleme döngüsü başladı...")
+    profile = PROFILING_CONFIG['enabled'] if profile is None else profile
+    scheduled = SCHEDULER_CONFIG['enabled'] if scheduled is None else scheduled
+    summary = StageSummary(PROFILING_CONFIG['slowest_symbols']) if profile else None
+    metrics = {}
+    if summary is not None:
+        install_query_counter()
     
     with app.app_context():
         try:
-            # Merkezi sistem API key kullan (fallback to ALPHA_VANTAGE_KEY)
-            system_api_key = os.getenv('SYSTEM_ALPHA_VANTAGE_KEY') or os.getenv('ALPHA_VANTAGE_KEY')
-            if not system_api_key:
-                logger.error("❌ API anahtarı bulunamadı! (SYSTEM_ALPHA_VANTAGE_KEY veya ALPHA_VANTAGE_KEY)")
-                return
-                
-            provider = AlphaVantageProvider(api_key=system_api_key, is_premium=True)
-            logger.info(f"🔑 Sistem API key kullanılıyor: {system_api_key[:8]}... (Premium: Real-time data)")
+            provider = provider or get_system_provider()
+            if provider is None:
+                return metrics
 
             # Veritabanından aktif varlıkları çek (database-driven dynamic assets)
             available_assets = get_active_symbols_from_db()
@@ -271,7 +561,8 @@ def update_data_for_all_users():
             
             # Kullanıcı watchlist'lerinden sembolleri al
             all_watchlist_items = Watchlist.query.all()
-            watchlist_symbols = {item.symbol for item in all_watchlist_items}
+            watcher_counts = Counter(item.symbol for item in all_watchlist_items)
+            watchlist_symbols = set(watcher_counts)
             
             # Kullanıcı watchlist'i + temel varlıklar (minimum coverage için)
             # Eğer watchlist boşsa, en azından major assets'ler analiz edilsin
@@ -296,131 +587,137 @@ def update_data_for_all_users():
                 all_assets = Asset.query.filter(Asset.symbol.in_(unique_symbols), Asset.is_active == True).all()
                 asset_info_cache = {asset.symbol: asset for asset in all_assets}
             
+            # Filtreleme önce: analiz edilecek semboller varlık türüne göre gruplanır
+            symbols_by_type = {}
             for symbol in unique_symbols:
-                try:
-                    logger.info(f"🔄 {symbol} verisi güncelleniyor...")
-                    
-                    # AKILLI FİLTRELEME: Asset type kontrolü (Cache'den al)
-                    asset_info = asset_info_cache.get(symbol)
-                    
-                    # Eğer varlık veritabanında yok veya desteklenmeyen türde ise, atla
-                    if not asset_info:
-                        logger.warning(f"⚠️ {symbol} veritabanında bulunamadı veya pasif. Analiz atlanıyor.")
-                        continue
-                    
-                    # ETF'leri atla (News API desteklemiyor)
-                    if asset_info.asset_type.lower() in ['etf', 'fund']:
-                        logger.warning(f"⚠️ {symbol} bir ETF/Fund. News API desteklemiyor, analiz atlanıyor.")
-                        continue
-                    
-                    # TWTR gibi delisted stocks için ek kontrol
-                    if symbol in ['TWTR', 'FB']:  # Bilinen delisted/renamed stocks
-                        logger.warning(f"⚠️ {symbol} delisted/renamed stock. Analiz atlanıyor.")
-                        continue
-                    
-                    # Current price al
-                    price = provider.get_current_price(symbol)
-                    
-                    # Asset type belirle (database-driven)
-                    asset_type = get_asset_type(symbol, available_assets)
-                    
-                    # Framework ile analiz yap
-                    framework = UniversalTradingBot(provider, asset_type)
-                    analysis = framework.analyze_symbol(symbol)
-                    
-                    # Sentiment (sadece stocks için)
-                    sentiment_score = None
-                    if asset_type == AssetType.STOCKS:
-                        try:
-                            sentiment_data = provider.get_news_sentiment([symbol], limit=3)
-                            sentiment_score = sentiment_data.get('overall_sentiment', 0)
-                        except:
-                            sentiment_score = 0
-
-                    # 🧠 Akıllı skorları hesapla
-                    smart_scores = calculate_smart_scores(analysis, symbol)
-
-                    # Database cache'e kaydet (Batch operation için prepare)
-                    cached_data = CachedData.query.filter_by(symbol=symbol).first()
-                    if cached_data:
-                        # Mevcut kayıt varsa güncelle
-                        cached_data.price = price
-                        cached_data.signal = analysis.get('final_signal', 'hold') if 'error' not in analysis else 'error' 
-                        cached_data.sentiment = sentiment_score
-                        cached_data.confidence_score = smart_scores['confidence_score']
-                        cached_data.technical_strength = smart_scores['technical_strength']
-                        cached_data.volume_score = smart_scores['volume_score']
-                        cached_data.momentum_score = smart_scores['momentum_score']
-                        cached_data.risk_level = smart_scores['risk_level']
-                        cached_data.last_updated = datetime.now()
-                        cached_data.error_message = None
-                    else:
-                        # Yeni kayıt oluştur
-                        cached_data = CachedData(
-                            symbol=symbol,
-                            price=price,
-                            signal=analysis.get('final_signal', 'hold') if 'error' not in analysis else 'error',
-                            sentiment=sentiment_score,
-                            confidence_score=smart_scores['confidence_score'],
-                            technical_strength=smart_scores['technical_strength'],
-                            volume_score=smart_scores['volume_score'],
-                            momentum_score=smart_scores['momentum_score'],
-                            risk_level=smart_scores['risk_level'],
-                            last_updated=datetime.now(),
-                            error_message=None
-                        )
-                        db.session.add(cached_data)
-                    
-                    # Log with data type info
-                    data_type = "real-time" if provider.is_premium else "delayed"
-                    logger.info(f"✅ {symbol}: ${price} | {analysis.get('final_signal', 'N/A')} ({data_type})")
+                # AKILLI FİLTRELEME: Asset type kontrolü (Cache'den al)
+                asset_info = asset_info_cache.get(symbol)
+                
+                # Eğer varlık veritabanında yok veya desteklenmeyen türde ise, atla
+                if not asset_info:
+                    logger.warning(f"⚠️ {symbol} veritabanında bulunamadı veya pasif. Analiz atlanıyor.")
+                    continue
+                
+                # ETF'leri atla (News API desteklemiyor)
+                if asset_info.asset_type.lower() in ['etf', 'fund']:
+                    logger.warning(f"⚠️ {symbol} bir ETF/Fund. News API desteklemiyor, analiz atlanıyor.")
+                    continue
+                
+                # TWTR gibi delisted stocks için ek kontrol
+                if symbol in ['TWTR', 'FB']:  # Bilinen delisted/renamed stocks
+                    logger.warning(f"⚠️ {symbol} delisted/renamed stock. Analiz atlanıyor.")
+                    continue
+                
+                # Asset type belirle (database-driven)
+                symbols_by_type.setdefault(get_asset_type(symbol, available_assets), []).append(symbol)
+            
+            # Çok worker: sadece hash halkasında bu worker'a düşen ve lease'i alınabilen semboller
+            if _shard is not None:
+                owned = _shard.claim(db.session, [symbol for items in symbols_by_type.values() for symbol in items])
+                symbols_by_type = {asset_type: [symbol for symbol in items if symbol in owned]
+                                   for asset_type, items in symbols_by_type.items()}
+            
+            # fetch -> analyze -> score -> persist: aşamalar sınırlı kuyruklarla eşzamanlı çalışır
+            data_type = "real-time" if getattr(provider, 'is_premium', False) else "delayed"
+            bots = build_bots(provider, symbols_by_type, profile=summary is not None)
+            pipeline = WorkerPipeline(
+                provider, bots,
+                score=lambda item: score_analysis(provider, item),
+                persist=lambda items: persist_items(items, data_type)
+            )
+            
+            def on_item(item):
+                nonlocal successful_updates
+                analysis = item.get('analysis') or {}
+                if item.get('record') is not None and 'error' not in analysis:
                     successful_updates += 1
-                    
-                    # OPTIMIZASYON: Batch commit (configurable size)
-                    if successful_updates % API_CONFIG['batch_commit_size'] == 0:
-                        db.session.commit()
-                        logger.debug(f"📊 Batch commit: {successful_updates} güncelleme")
-                    
-                    # Rate limiting (configurable)
-                    time.sleep(API_CONFIG['rate_limit_sleep'])
-                    
-                except Exception as e:
-                    error_message = str(e)
-                    logger.error(f"❌ {symbol} için veri çekilemedi: {error_message}")
-                    
-                    # AKILLI AUTO-DEACTIVATION: "Invalid API call" hatası varsa varlığı pasif yap
-                    if "Invalid API call" in error_message:
-                        try:
-                            with app.app_context():
-                                asset_to_deactivate = Asset.query.filter_by(symbol=symbol).first()
-                                if asset_to_deactivate:
-                                    asset_to_deactivate.is_active = False
-                                    db.session.commit()
-                                    logger.info(f"🔧 {symbol} otomatik pasif yapıldı (Invalid API call nedeniyle)")
-                        except Exception as deactivate_error:
-                            logger.error(f"❌ {symbol} pasif yapılamadı: {deactivate_error}")
-                    
-                    # Hata durumunda database'e error kaydet
-                    try:
-                        cached_data = CachedData.query.filter_by(symbol=symbol).first()
-                        if cached_data:
-                            cached_data.error_message = error_message
-                            cached_data.last_updated = datetime.now()
-                            db.session.commit()
-                    except Exception as db_error:
-                        logger.error(f"❌ Database error for {symbol}: {db_error}")
-                        db.session.rollback()
-
-            # Final commit for remaining records
-            if successful_updates > 0:
+                    _scheduler.record_result(item['symbol'], analysis)
+                else:
+                    _scheduler.record_failure(item['symbol'])
+                if summary is not None:
+                    summary.add(item['symbol'], item.get('analysis', {}).get('timings'))
+                    summary.add_profile(item.get('fetch_profile'))
+            
+            if scheduled:
+                symbols = schedule_cycle(provider, symbols_by_type, watcher_counts)
+            else:
+                symbols = [(symbol, asset_type) for asset_type, items in symbols_by_type.items() for symbol in items]
+            
+            metrics = pipeline.run(symbols, on_item=on_item)
+            log_metrics(logger, metrics)
+            
+            # Kayan korelasyon için kapanışlar paylaşılan tabloya - lider tüm shard'ların barlarını görür
+            try:
+                publish_correlation_bars(provider, [symbol for symbol, _ in symbols])
                 db.session.commit()
-                logger.debug("📊 Final commit completed")
+            except Exception as e:
+                logger.error(f"❌ Korelasyon barları yazılamadı: {e}")
+                db.session.rollback()
+            if metrics.get('api_calls') and metrics['symbols']:
+                _calls_per_symbol = metrics['api_calls'] / metrics['symbols']
+            
+            # Streaming indikatör durumunu restart'lara karşı diske yaz
+            get_indicator_state().save(worker_state_path(STREAMING_CONFIG['state_path']))
+            if get_prediction_state() is not None:
+                get_prediction_state().save(worker_state_path(PREDICTION_CONFIG['state_path']))
+            logger.debug(f"🧮 İndikatör cache: {_indicator_cache.get_stats()}")
             
-            logger.info(f"✅ Veri güncelleme tamamlandı: {successful_updates}/{len(unique_symbols)} başarılı")
+            logger.info(f"✅ Veri güncelleme tamamlandı: {successful_updates}/{len(symbols)} başarılı "
+                        f"({len(unique_symbols)} sembolden)")
             
         except Exception as e:
             logger.error(f"❌ Genel güncelleme hatası: {e}")
             db.session.rollback()  # Rollback on error
+    
+    if summary is not None:
+        summary.log(logger)
+        metrics['profile'] = summary.to_dict()
+    return metrics
+
+def run_correlation_job():
+    """
+    Tam korelasyon hesabı (update_interval_hours'ta bir) - kayan motor da yeniden kurulur.
+    Son çalışma worker_jobs'ta; başarısızsa 1 saat sonra yeniden denenir.
+    """
+    correlation_interval = CORRELATION_CONFIG['update_interval_hours'] * 3600  # Hours to seconds
+    if not job_due('correlation', correlation_interval):
+        return
+    
+    logger.info("🔄 Korelasyon güncelleme zamanı geldi...")
+    provider = get_system_provider()
+    if provider is None:
+        logger.error("❌ API anahtarı bulunamadı - korelasyon güncellenemiyor (SYSTEM_ALPHA_VANTAGE_KEY veya ALPHA_VANTAGE_KEY)")
+        return
+    
+    if calculate_and_store_correlations(provider):
+        logger.info("✅ Korelasyon güncelleme tamamlandı")
+        record_job('correlation', time.time())
+    else:
+        logger.error("❌ Korelasyon güncelleme başarısız - 1 saat sonra yeniden denenecek")
+        record_job('correlation', time.time() - correlation_interval + 3600)  # Retry in 1 hour
+
+def run_history_retention():
+    """Sinyal geçmişi retention / seyreltme (retention_interval_hours'ta bir, son çalışma worker_jobs'ta)"""
+    interval = SIGNAL_HISTORY_CONFIG['retention_interval_hours'] * 3600
+    if not SIGNAL_HISTORY_CONFIG['enabled'] or not job_due('history_retention', interval):
+        return
+    with app.app_context():
+        try:
+            apply_retention(db.session)
+        except Exception as e:
+            logger.error(f"❌ Sinyal geçmişi retention hatası: {e}")
+            db.session.rollback()
+    record_job('history_retention', time.time())
+
+def run_rolling_correlations():
+    """Döngü sonu: yeni kapanan barlar kayan korelasyon motoruna (tam geçmiş yeniden indirilmez)"""
+    provider = get_system_provider()
+    if provider is None:
+        return
+    try:
+        update_rolling_correlations(provider)
+    except Exception as e:
+        logger.error(f"❌ Kayan korelasyon güncelleme hatası: {e}")
 
 def main():
     """Ana worker döngüsü"""
@@ -433,38 +730,29 @@ def main():
         db.create_all()
         logger.info("✅ Database tables ready!")
     
-    # Korelasyon hesaplama zamanlaması
-    last_correlation_update = 0
-    correlation_interval = CORRELATION_CONFIG['update_interval_hours'] * 3600  # Hours to seconds
-    
     while True:
         try:
-            # Korelasyon güncellemesi kontrolü (günde bir kez)
-            if time.time() - last_correlation_update > correlation_interval:
-                logger.info("🔄 Korelasyon güncelleme zamanı geldi...")
-                system_api_key = os.getenv('SYSTEM_ALPHA_VANTAGE_KEY') or os.getenv('ALPHA_VANTAGE_KEY')
-                
-                if system_api_key:
-                    provider = AlphaVantageProvider(api_key=system_api_key, is_premium=True)
-                    correlation_success = calculate_and_store_correlations(provider)
-                    
-                    if correlation_success:
-                        last_correlation_update = time.time()
-                        logger.info("✅ Korelasyon güncelleme tamamlandı")
-                    else:
-                        logger.error("❌ Korelasyon güncelleme başarısız - 1 saat sonra yeniden denenecek")
-                        last_correlation_update = time.time() - correlation_interval + 3600  # Retry in 1 hour
-                else:
-                    logger.error("❌ API anahtarı bulunamadı - korelasyon güncellenemiyor (SYSTEM_ALPHA_VANTAGE_KEY veya ALPHA_VANTAGE_KEY)")
+            refresh_shard()
+            leader = is_leader()
+            
+            # Tekil işler (son çalışma zamanları DB'de): geçmiş retention + günlük tam korelasyon
+            if leader:
+                run_history_retention()
+                run_correlation_job()
             
             # Normal veri güncelleme (configurable interval)
             update_data_for_all_users()
+            
+            # Yeni kapanan barlar kayan korelasyon motoruna (tam geçmiş yeniden indirilmez)
+            if leader:
+                run_rolling_correlations()
             sleep_minutes = API_CONFIG['worker_sleep_interval'] // 60
             logger.info(f"🕒 Sonraki güncelleme için {sleep_minutes} dakika bekleniyor...")
             time.sleep(API_CONFIG['worker_sleep_interval'])
             
         except KeyboardInterrupt:
             logger.info("👋 Background Worker durduruluyor...")
+            release_shard()
             break
         except Exception as e:
             logger.error(f"❌ Worker döngüsü hatası: {e}")
@@ -732,7 +1020,7 @@ def _generate_recommendation_reason(cached_item):
 def enhanced_worker_main():
     """🚀 Gelişmiş Worker - Saatlik briefing ile"""
     logger.info("🚀 Gelişmiş Background Worker başlatılıyor...")
-    logger.info("📊 Özellikler: Veri güncelleme + Saatlik briefing")
+    logger.info("📊 Özellikler: Veri güncelleme + Saatlik briefing + Korelasyon")
     
     last_briefing_hour = -1  # İlk çalışmada briefing yap
     
@@ -740,16 +1028,25 @@ def enhanced_worker_main():
         try:
             current_hour = datetime.now().hour
             
-            # Saatlik briefing kontrolü
-            if current_hour != last_briefing_hour:
+            # Tekil işler (çok worker'da sadece lider): saatlik briefing, geçmiş retention, günlük tam korelasyon
+            refresh_shard()
+            leader = is_leader()
+            if current_hour != last_briefing_hour and leader:
                 logger.info(f"🎯 Saatlik briefing zamanı: {current_hour}:00")
                 generate_daily_briefing()
                 last_briefing_hour = current_hour
+            if leader:
+                run_history_retention()
+                run_correlation_job()
             
             # Normal veri güncelleme
             logger.info("🔄 Veri güncelleme başlıyor...")
             update_data_for_all_users()
             
+            # Korelasyonlar her döngü taze: yeni kapanan barlar kayan motora
+            if leader:
+                run_rolling_correlations()
+            
             # Bekleme
             sleep_minutes = API_CONFIG['worker_sleep_interval'] // 60
             logger.info(f"🕒 Sonraki güncelleme için {sleep_minutes} dakika bekleniyor...")
@@ -757,12 +1054,18 @@ def enhanced_worker_main():
             
         except KeyboardInterrupt:
             logger.info("👋 Gelişmiş Background Worker durduruluyor...")
+            release_shard()
             break
         except Exception as e:
             logger.error(f"❌ Gelişmiş worker döngüsü hatası: {e}")
             logger.info("🔄 30 saniye sonra yeniden denenecek...")
             time.sleep(30)
 
+def _stop_on_sigterm(signum, frame):
+    """Dyno yeniden başlatma / ölçek küçültme SIGTERM'i: döngü KeyboardInterrupt ile kapanır, lease'ler bırakılır"""
+    raise KeyboardInterrupt
+
 if __name__ == '__main__':
+    process_signal.signal(process_signal.SIGTERM, _stop_on_sigterm)
     # Gelişmiş worker'ı başlat
     enhanced_worker_main() 
\ No newline at end of file
@@ -0,0 +1,226 @@
+"""
+🏭 Alpha Vantage Trading Framework - Worker Pipeline
+Veri güncelleme döngüsü dört aşamalı boru hattı olarak çalışır; aşamalar sınırlı
+kuyruklarla bağlıdır ve aynı anda ilerler (yavaş aşama öncekini kuyruk dolunca durdurur).
+
+- fetch: Sembol başına ön yükleme - eşzamanlılığı sadece paylaşılan rate budget sınırlar
+- analyze: analyze_symbol thread havuzu (cache'ten, CPU)
+- score: Fiyat / sentiment (cache'ten) + akıllı skorlar
+- persist: Çağıranın thread'inde toplu yazım (Flask app context ve DB session orada);
+  persist callable'ı yazma ifadesi sayısını döndürürse 'db_writes' metriğinde toplanır
+
+Metrik: sembol/dakika ve rate budget'ın izin verdiği teorik maksimuma oranı.
+"""
+
+import logging
+import queue
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Tuple
+
+from constants import API_CONFIG
+from profiling import profiling, stage
+
+# Aşama sonu işareti - son thread bir sonraki aşamanın her thread'ine bir tane bırakır
+_DONE = object()
+
+
+class _Stage:
+    """Aynı fonksiyonu çalıştıran thread grubu: inbox -> func(item) -> outbox"""
+
+    def __init__(self, name: str, func: Callable[[Dict], None], workers: int,
+                 inbox: queue.Queue, outbox: queue.Queue, downstream_workers: int):
+        self.name = name
+        self.func = func
+        self.workers = max(1, workers)
+        self.inbox = inbox
+        self.outbox = outbox
+        self.downstream_workers = downstream_workers
+        self.items = 0
+        self.busy_seconds = 0.0
+        self._alive = self.workers
+        self._lock = threading.Lock()
+        self.logger = logging.getLogger(__name__)
+
+    def start(self):
+        for index in range(self.workers):
+            threading.Thread(target=self._loop, name=f"pipeline-{self.name}-{index}", daemon=True).start()
+
+    def _loop(self):
+        while True:
+            item = self.inbox.get()
+            if item is _DONE:
+                break
+            started = time.perf_counter()
+            try:
+                self.func(item)
+            except Exception as e:
+                # Hata sembolle sınırlı: öğe yine de ilerler, persist hatayı kaydeder
+                self.logger.error(f"❌ {item['symbol']} {self.name} aşaması hatası: {e}")
+                item.setdefault('error', str(e))
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self.items += 1
+                self.busy_seconds += elapsed
+            self.outbox.put(item)
+
+        with self._lock:
+            self._alive -= 1
+            last = self._alive == 0
+        if last:
+            for _ in range(self.downstream_workers):
+                self.outbox.put(_DONE)
+
+    def get_stats(self, elapsed: float) -> Dict:
+        return {
+            'workers': self.workers,
+            'items': self.items,
+            'busy_seconds': round(self.busy_seconds, 3),
+            # Ortalama thread doluluğu - 100'e yakın aşama darboğazdır
+            'utilization_pct': round(self.busy_seconds / (elapsed * self.workers) * 100, 1) if elapsed else 0.0
+        }
+
+
+class WorkerPipeline:
+    """
+    fetch -> analyze -> score -> persist boru hattı.
+
+    bots: Varlık türü -> UniversalTradingBot (prefetch ve analyze_symbol)
+    score: item -> item['record'] doldurur (item: symbol, asset_type, analysis)
+    persist: Kayıt listesini yazar - çağıranın thread'inde `persist_batch`'lik gruplarla
+             (dönüş değeri: DB yazma ifadesi sayısı ya da None)
+    """
+
+    def __init__(self, provider, bots: Dict, score: Callable[[Dict], None],
+                 persist: Callable[[List[Dict]], None], fetch_workers: int = None,
+                 analysis_workers: int = None, queue_size: int = None, persist_batch: int = None):
+        self.provider = provider
+        self.bots = bots
+        self.score = score
+        self.persist = persist
+        self.fetch_workers = fetch_workers or API_CONFIG['fetch_workers']
+        self.analysis_workers = analysis_workers or API_CONFIG['analysis_workers']
+        self.queue_size = queue_size or API_CONFIG['pipeline_queue_size']
+        self.persist_batch = persist_batch or API_CONFIG['batch_commit_size']
+        self.logger = logging.getLogger(__name__)
+
+    def _fetch(self, item: Dict):
+        # Ön yükleme + regresyon tahmini (online model kapalıyken) - analyze cache'ten okur
+        bot = self.bots[item['asset_type']]
+        if not bot.profile:
+            bot.prefetch([item['symbol']])
+            bot.predict_many([item['symbol']])
+            return
+        with profiling() as profile:
+            with stage('prefetch'):
+                bot.prefetch([item['symbol']])
+            with stage('batch_prediction'):
+                bot.predict_many([item['symbol']])
+        item['fetch_profile'] = profile
+
+    def _analyze(self, item: Dict):
+        if 'error' in item:
+            return
+        item['analysis'] = self.bots[item['asset_type']].analyze_symbol(item['symbol'])
+
+    def _score(self, item: Dict):
+        if 'error' in item:
+            return
+        self.score(item)
+
+    def run(self, symbols: Iterable[Tuple[str, object]],
+            on_item: Callable[[Dict], None] = None) -> Dict:
+        """
+        (sembol, varlık türü) çiftlerini verilen sırayla işler (fetch sırası = öncelik)
+        ve metrikleri döndürür. on_item her öğe persist kuyruğundan çıktığında
+        (çağıranın thread'inde) çağrılır.
+        """
+        symbols = list(dict.fromkeys(symbols))
+        budget = getattr(self.provider, 'rate_budget', None)
+        calls_before = budget.get_stats()['calls'] if budget else 0
+
+        inbox = queue.Queue()
+        analyze_queue = queue.Queue(maxsize=self.queue_size)
+        score_queue = queue.Queue(maxsize=self.queue_size)
+        persist_queue = queue.Queue(maxsize=self.queue_size)
+        stages = [
+            _Stage('fetch', self._fetch, self.fetch_workers, inbox, analyze_queue, self.analysis_workers),
+            _Stage('analyze', self._analyze, self.analysis_workers, analyze_queue, score_queue, 1),
+            _Stage('score', self._score, 1, score_queue, persist_queue, 1)
+        ]
+        for symbol, asset_type in symbols:
+            inbox.put({'symbol': symbol, 'asset_type': asset_type})
+        for _ in range(stages[0].workers):
+            inbox.put(_DONE)
+
+        started = time.perf_counter()
+        for pipeline_stage in stages:
+            pipeline_stage.start()
+
+        batch, persisted, persist_seconds, writes = [], 0, 0.0, 0
+        while True:
+            item = persist_queue.get()
+            if item is not _DONE:
+                if on_item is not None:
+                    on_item(item)
+                batch.append(item)
+            if batch and (item is _DONE or len(batch) >= self.persist_batch):
+                persist_started = time.perf_counter()
+                try:
+                    writes += self.persist(batch) or 0
+                except Exception as e:
+                    # Akış durmaz: üst aşamalar kuyruk boşalmadan bekler
+                    self.logger.error(f"❌ Persist hatası ({len(batch)} kayıt): {e}")
+                persist_seconds += time.perf_counter() - persist_started
+                persisted += len(batch)
+                batch = []
+            if item is _DONE:
+                break
+
+        elapsed = time.perf_counter() - started
+        stats = {pipeline_stage.name: pipeline_stage.get_stats(elapsed) for pipeline_stage in stages}
+        stats['persist'] = {
+            'workers': 1,
+            'items': persisted,
+            'writes': writes,
+            'busy_seconds': round(persist_seconds, 3),
+            'utilization_pct': round(persist_seconds / elapsed * 100, 1) if elapsed else 0.0
+        }
+        metrics = self._metrics(len(symbols), elapsed, stats, budget, calls_before)
+        metrics['db_writes'] = writes
+        return metrics
+
+    @staticmethod
+    def _metrics(symbol_count: int, elapsed: float, stages: Dict,
+                 budget, calls_before: int) -> Dict:
+        symbols_per_minute = symbol_count / elapsed * 60 if elapsed else 0.0
+        metrics = {
+            'symbols': symbol_count,
+            'elapsed_seconds': round(elapsed, 3),
+            'symbols_per_minute': round(symbols_per_minute, 1),
+            'stages': stages
+        }
+        if budget is not None:
+            calls = budget.get_stats()['calls'] - calls_before
+            metrics['api_calls'] = calls
+            if calls and symbol_count:
+                # Kota tek sınır olsaydı: dakikalık çağrı hakkı / sembol başına çağrı
+                theoretical = budget.calls_per_minute / (calls / symbol_count)
+                metrics['theoretical_symbols_per_minute'] = round(theoretical, 1)
+                metrics['budget_efficiency_pct'] = round(symbols_per_minute / theoretical * 100, 1)
+        return metrics
+
+
+def log_metrics(logger: logging.Logger, metrics: Dict):
+    """Döngü sonu özet satırları"""
+    line = f"🏭 Pipeline: {metrics['symbols']} sembol, {metrics['elapsed_seconds']:.1f}s, " \
+           f"{metrics['symbols_per_minute']:.1f} sembol/dk"
+    if 'theoretical_symbols_per_minute' in metrics:
+        line += f" (teorik maks {metrics['theoretical_symbols_per_minute']:.1f}, " \
+                f"%{metrics['budget_efficiency_pct']:.0f}, {metrics['api_calls']} API çağrısı)"
+    if 'db_writes' in metrics:
+        line += f", {metrics['db_writes']} DB yazma ifadesi"
+    logger.info(line)
+    for name, stats in metrics['stages'].items():
+        logger.info(f"   {name:8s} {stats['items']:>5} öğe, {stats['workers']} thread, "
+                    f"doluluk %{stats['utilization_pct']:.0f}")